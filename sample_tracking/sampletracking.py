@@ -1,17 +1,41 @@
 import os
 import sys
+import argparse
 import pyodbc
+import numpy as np
 import pandas as pd
+import openpyxl
+from pandas.io.parsers import TextParser
 import customtkinter as ctk
 from tkinter import ttk, filedialog, messagebox
 import traceback
+import time
+import threading
+import queue
+import json
+import csv
+import re
+import difflib
+import hashlib
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
 import tkinter as tk
 import tkinter.font as tkFont
 import datetime
+import getpass
+import platform
 from tkcalendar import Calendar, DateEntry
 import calendar
 import calendar as pycal
 
+try:
+    import msvcrt
+except ImportError:
+    # Not Windows: journal locks use flock instead
+    msvcrt = None
+    import fcntl
+
 
 def get_file_path(filename):
     """Get the absolute path to a file based on whether the app is frozen or not."""
@@ -22,6 +46,51 @@ def get_file_path(filename):
     return os.path.join(application_path, filename)
 
 
+DATABASE_PASSWORD = "x"
+
+
+def get_local_data_path(filename):
+    """
+    Path to a per-user file on this machine: %LOCALAPPDATA%\\SampleTracker on Windows,
+    ~/.sample_tracker elsewhere. For state that must not be shared through the network folder
+    the app and database live in.
+    """
+    if os.environ.get("LOCALAPPDATA"):
+        folder = os.path.join(os.environ["LOCALAPPDATA"], "SampleTracker")
+    else:
+        folder = os.path.join(os.path.expanduser("~"), ".sample_tracker")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+def machine_user_tag():
+    """'<machine>_<user>' with anything unsafe in a file name replaced."""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return re.sub(r"[^\w.-]+", "_", f"{platform.node() or 'host'}_{user}")
+
+
+def lock_file_exclusive(path):
+    """
+    Take an exclusive, non-blocking OS lock on `path` (created if needed). Returns the open
+    file, which holds the lock until closed, or None if another process has it. The OS drops
+    the lock if the process dies, so a crash never leaves a stale lock behind.
+    """
+    f = open(path, "a+")
+    try:
+        if msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
 def get_database_path():
     """Get the path to the Access database."""
     # Define potential database locations in order of preference
@@ -57,12 +126,3180 @@ def get_database_path():
         return db_path
 
 
+# Measurement tables checked for existing data, keyed by the short names used in data_table_mapping
+MEASUREMENT_TABLES = {
+    "NPOC": "WRRC NPOC Data",
+    "NO3_Cd": "WRRC NO3_Cd Data",
+    "Cation": "WRRC Cation Data",
+    "Anion": "WRRC Anion Data",
+    "PO4": "WRRC PO4 Data",
+    "SiO2": "WRRC SiO2 data",  # Note lowercase 'data'
+    "TDN": "WRRC TDN Data",
+    "TP": "WRRC TP Data",
+    "NH4": "WRRC NH4 Data",
+    "DIC": "WRRC DIC Data"
+}
+
+
+def connect_to_database(db_path, password):
+    """Open a pyodbc connection to the Access database with the app's encoding settings."""
+    conn_str = (
+        r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+        f"DBQ={db_path};"
+        f"PWD={password};"
+        "Extended Properties='Excel 8.0;IMEX=1;'"
+    )
+
+    conn = pyodbc.connect(conn_str, autocommit=True)
+    conn.setdecoding(pyodbc.SQL_CHAR, encoding='latin1')
+    conn.setdecoding(pyodbc.SQL_WCHAR, encoding='latin1')
+    conn.setencoding(encoding='latin1')
+    return conn
+
+
+def build_record_bundle_query(include_flags=True):
+    """
+    Build the single query that returns the analysis-requested row for one UNH# plus a
+    record count per measurement table. Anchored on sample info so the flags come back
+    even when the sample has no analysis-requested row yet.
+    """
+    probes = []
+    if include_flags:
+        for i, (key, full_table_name) in enumerate(MEASUREMENT_TABLES.items()):
+            probes.append(
+                f"(SELECT COUNT(*) FROM [{full_table_name}] AS m{i} WHERE m{i}.[UNH#] = s.[UNH#]) AS [__has_{key}]"
+            )
+
+    return (
+        f"SELECT {', '.join(['a.*'] + probes)} "
+        "FROM [WRRC sample info] AS s "
+        "LEFT JOIN [WRRC sample analysis requested] AS a ON s.[UNH#] = a.[UNH#] "
+        "WHERE s.[UNH#] = ?"
+    )
+
+
+def query_record_bundle(conn, unh_id, include_flags=True):
+    """
+    Run the combined record query on `conn`.
+    Returns (analysis_dict or None, related_data dict), or None if the sample info row is missing.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(build_record_bundle_query(include_flags), (unh_id,))
+        columns = [column[0] for column in cursor.description]
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if row is None:
+        return None
+
+    analysis_dict = {}
+    related_data = {}
+    for col, value in zip(columns, row):
+        if col.startswith("__has_"):
+            related_data[col[len("__has_"):]] = bool(value)
+        else:
+            analysis_dict[col] = value
+
+    # LEFT JOIN gives an all-NULL analysis part when no row exists
+    if analysis_dict.get("UNH#") is None:
+        analysis_dict = None
+
+    return analysis_dict, related_data
+
+
+def find_existing_analysis_ids(cursor, unh_ids, chunk_size=200):
+    """Return the subset of unh_ids that already have an analysis-requested row (chunked IN queries)."""
+    existing = set()
+    for chunk in chunked(unh_ids, chunk_size):
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor.execute(
+            f"SELECT [UNH#] FROM [WRRC sample analysis requested] WHERE [UNH#] IN ({placeholders})",
+            chunk
+        )
+        existing.update(normalize_unh(row[0]) for row in cursor.fetchall())
+    return existing
+
+
+def run_batch_update(conn, unh_ids, updates, chunk_size=200, commit_every=None, progress=None,
+                     cancel_event=None):
+    """
+    Set-based batch update of [WRRC sample analysis requested].
+    `updates` maps column name -> value and is applied to every UNH# in `unh_ids`:
+    chunked IN (...) lookups find the existing rows, then executemany UPDATE/INSERT statements
+    write them. Samples are processed in slices of `chunk_size` so progress can be reported.
+
+    commit_every=None keeps everything in a single transaction (cancelling rolls it all back).
+    commit_every=N commits after every N samples so a huge update doesn't hold one long Access
+    transaction; cancelling then rolls back only the uncommitted slice.
+
+    progress(done, total) is called after each slice; cancel_event is a threading.Event.
+    Returns a dict with 'updated', 'inserted', 'committed_ids', 'cancelled' and per-phase
+    'timings' (seconds).
+    """
+    unh_ids = list(dict.fromkeys(normalize_unh(u) for u in unh_ids if normalize_unh(u)))
+    columns = list(updates.keys())
+    values = [updates[col] for col in columns]
+    timings = {"lookup": 0.0, "update": 0.0, "insert": 0.0, "commit": 0.0}
+    total = len(unh_ids)
+
+    set_clause = ", ".join(f"[{col}] = ?" for col in columns)
+    update_sql = f"UPDATE [WRRC sample analysis requested] SET {set_clause} WHERE [UNH#] = ?"
+    column_list = ", ".join(["[UNH#]"] + [f"[{col}]" for col in columns])
+    placeholders = ", ".join(["?"] * (len(columns) + 1))
+    insert_sql = f"INSERT INTO [WRRC sample analysis requested] ({column_list}) VALUES ({placeholders})"
+
+    updated = inserted = 0
+    pending_updated = pending_inserted = 0
+    committed_ids = []
+    pending_ids = []
+    cancelled = False
+
+    def commit():
+        nonlocal updated, inserted, pending_updated, pending_inserted, pending_ids
+        start = time.perf_counter()
+        conn.commit()
+        timings["commit"] += time.perf_counter() - start
+        updated += pending_updated
+        inserted += pending_inserted
+        committed_ids.extend(pending_ids)
+        pending_updated = pending_inserted = 0
+        pending_ids = []
+
+    cursor = conn.cursor()
+    conn.autocommit = False
+    try:
+        offset = 0
+        while offset < total:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                break
+
+            # Slices never straddle a commit boundary
+            end = offset + chunk_size
+            if commit_every:
+                end = min(end, offset + commit_every - len(pending_ids))
+            batch = unh_ids[offset:end]
+
+            start = time.perf_counter()
+            existing = find_existing_analysis_ids(cursor, batch, chunk_size)
+            to_update = [u for u in batch if u in existing]
+            to_insert = [u for u in batch if u not in existing]
+            timings["lookup"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if to_update:
+                cursor.executemany(update_sql, [values + [unh_id] for unh_id in to_update])
+            timings["update"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            if to_insert:
+                cursor.executemany(insert_sql, [[unh_id] + values for unh_id in to_insert])
+            timings["insert"] += time.perf_counter() - start
+
+            pending_updated += len(to_update)
+            pending_inserted += len(to_insert)
+            pending_ids.extend(batch)
+
+            offset += len(batch)
+            done = offset
+            if commit_every and (len(pending_ids) >= commit_every or done == total):
+                commit()
+
+            if progress is not None:
+                progress(done, total)
+
+        if cancelled:
+            conn.rollback()
+            pending_ids = []
+        elif pending_ids:
+            commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    status = "cancelled" if cancelled else "completed"
+    print(f"Batch update {status}: {updated} updated, {inserted} inserted "
+          f"({len(committed_ids)} of {total} committed); timings "
+          + ", ".join(f"{phase}={seconds * 1000:.1f} ms" for phase, seconds in timings.items()))
+    return {"updated": updated, "inserted": inserted, "committed_ids": committed_ids,
+            "cancelled": cancelled, "timings": timings}
+
+
+# Batch edit targets and the sample-info fields whose empty value is stored as NULL
+BATCH_EDIT_TABLES = {
+    "sample": "WRRC sample info",
+    "analysis": "WRRC sample analysis requested"
+}
+SAMPLE_INFO_NULLABLE_FIELDS = ('Collection_Date', 'Collection_Time', 'pH', 'Cond', 'Spec_Cond',
+                               'DO_Conc', 'DO%', 'Temperature', 'Salinity')
+
+
+def compile_batch_edit(row_changes, chunk_size=200):
+    """
+    Compile per-sample changes into a minimal list of grouped UPDATE statements.
+    `row_changes` maps UNH# -> {"sample": {column: value}, "analysis": {column: value}}.
+    Samples with an identical change set for a table share one
+    UPDATE ... WHERE [UNH#] IN (...) statement (chunked for Access).
+    Returns a list of (table_key, sql, params, unh_ids).
+    """
+    groups = OrderedDict()
+    for unh_id, per_table in row_changes.items():
+        for table_key, changes in per_table.items():
+            if not changes:
+                continue
+            signature = (table_key, tuple(sorted(changes.items(), key=lambda item: item[0])))
+            groups.setdefault(signature, []).append(unh_id)
+
+    statements = []
+    for (table_key, changes), unh_ids in groups.items():
+        set_clause = ", ".join(f"[{column}] = ?" for column, _ in changes)
+        values = [value for _, value in changes]
+        for chunk in chunked(unh_ids, chunk_size):
+            placeholders = ", ".join("?" * len(chunk))
+            sql = (f"UPDATE [{BATCH_EDIT_TABLES[table_key]}] SET {set_clause} "
+                   f"WHERE [UNH#] IN ({placeholders})")
+            statements.append((table_key, sql, values + chunk, chunk))
+    return statements
+
+
+def apply_batch_edit(conn, row_changes, chunk_size=200):
+    """
+    Apply a compiled batch edit in one transaction.
+    Samples without an analysis row get one INSERTed (grouped by change set with executemany)
+    instead of an UPDATE that would match nothing.
+    Returns a dict with 'statements', 'updated', 'inserted' and the affected 'unh_ids'.
+    """
+    row_changes = {normalize_unh(unh_id): per_table for unh_id, per_table in row_changes.items()
+                   if normalize_unh(unh_id)}
+    cursor = conn.cursor()
+    conn.autocommit = False
+    try:
+        analysis_ids = [unh_id for unh_id, per_table in row_changes.items() if per_table.get("analysis")]
+        existing = find_existing_analysis_ids(cursor, analysis_ids, chunk_size)
+
+        # Split off the analysis changes that need an INSERT
+        update_changes = {}
+        insert_groups = OrderedDict()
+        for unh_id, per_table in row_changes.items():
+            update_changes[unh_id] = dict(per_table)
+            analysis = per_table.get("analysis")
+            if analysis and unh_id not in existing:
+                columns = tuple(sorted(analysis))
+                insert_groups.setdefault(columns, []).append([unh_id] + [analysis[c] for c in columns])
+                del update_changes[unh_id]["analysis"]
+
+        statements = compile_batch_edit(update_changes, chunk_size)
+        updated = 0
+        for table_key, sql, params, unh_ids in statements:
+            print(f"Batch edit: {sql} ({len(unh_ids)} samples)")
+            cursor.execute(sql, params)
+            updated += len(unh_ids)
+
+        inserted = 0
+        for columns, rows in insert_groups.items():
+            column_list = ", ".join(["[UNH#]"] + [f"[{c}]" for c in columns])
+            placeholders = ", ".join("?" * (len(columns) + 1))
+            cursor.executemany(
+                f"INSERT INTO [WRRC sample analysis requested] ({column_list}) VALUES ({placeholders})", rows)
+            inserted += len(rows)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    print(f"Batch edit committed: {len(statements)} UPDATE statements, "
+          f"{updated} row updates, {inserted} analysis rows inserted")
+    return {"statements": len(statements) + len(insert_groups), "updated": updated,
+            "inserted": inserted, "unh_ids": list(row_changes)}
+
+
+class WriteBehindQueue:
+    """
+    Durable write-behind queue for Edit-tab saves.
+    Every edit is appended (and fsynced) to a local journal before the save returns, repeated
+    edits to the same UNH# are merged, and a daemon thread flushes the merged edits to Access
+    with apply_batch_edit. The journal is replayed on start, so queued edits survive a crash;
+    it is compacted to the still-pending edits after each successful flush.
+    The journal must be on local disk (see get_local_data_path). The queue holds an exclusive
+    lock on it for its whole life; if a second copy of the app already holds it, the next free
+    numbered journal (name_2.journal, ...) is used instead, and is replayed by whichever copy
+    claims it next.
+    Flush results are posted to `events` as ("flushed", {unh_id: changes}, pending_count) or
+    ("error", message, retry_in_seconds, pending_count) for the UI to poll.
+    """
+
+    MAX_JOURNALS = 20
+
+    def __init__(self, journal_path, connect, flush_interval=2.0, max_retry_delay=60.0):
+        self.journal_path, self._lock_file = self._claim_journal(journal_path)
+        self._connect = connect
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max_retry_delay
+        self.pending = OrderedDict()
+        self.events = queue.Queue()
+        self.last_error = None
+        self._retry_delay = 0.0
+        self._force = False
+        self._stop = False
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._replay()
+
+    @classmethod
+    def journal_slots(cls, journal_path):
+        """journal_path and its numbered siblings, in the order they are claimed."""
+        stem, ext = os.path.splitext(journal_path)
+        return [journal_path] + [f"{stem}_{n}{ext}" for n in range(2, cls.MAX_JOURNALS + 1)]
+
+    @classmethod
+    def has_leftover_edits(cls, journal_path):
+        """True if any journal slot still holds edits from an earlier session."""
+        return any(os.path.exists(path) and os.path.getsize(path) > 0 for path in cls.journal_slots(journal_path))
+
+    def _claim_journal(self, journal_path):
+        """Lock the first free journal slot, trying slots that still hold edits first so they get replayed."""
+        slots = self.journal_slots(journal_path)
+        slots.sort(key=lambda path: not (os.path.exists(path) and os.path.getsize(path) > 0))
+        for path in slots:
+            lock_file = lock_file_exclusive(path + ".lock")
+            if lock_file is not None:
+                if path != journal_path:
+                    print(f"Using edit journal {path}")
+                return path, lock_file
+        raise RuntimeError(f"All {self.MAX_JOURNALS} edit journals next to {journal_path} are in use")
+
+    def _merge(self, unh_id, sample_changes, analysis_changes):
+        entry = self.pending.setdefault(unh_id, {"sample": {}, "analysis": {}})
+        entry["sample"].update(sample_changes or {})
+        entry["analysis"].update(analysis_changes or {})
+        self.pending.move_to_end(unh_id)
+
+    def _replay(self):
+        """Load edits left in the journal by a previous session (or a crash)."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    print(f"Skipping unreadable journal line: {line[:80]!r}")
+                    continue
+                self._merge(record["unh"], record.get("sample"), record.get("analysis"))
+        if self.pending:
+            print(f"Replayed {len(self.pending)} pending edits from {self.journal_path}")
+
+    def _rewrite_journal(self):
+        """Compact the journal to the pending edits (caller holds the condition lock)."""
+        if not self.pending:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            return
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for unh_id, entry in self.pending.items():
+                f.write(json.dumps({"unh": unh_id, **entry}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+
+    def enqueue(self, unh_id, sample_changes, analysis_changes):
+        """Durably record an edit; returns once it is on disk."""
+        unh_id = normalize_unh(unh_id)
+        record = {"unh": unh_id, "sample": sample_changes or {}, "analysis": analysis_changes or {},
+                  "queued_at": datetime.datetime.now().isoformat(timespec="seconds")}
+        with self._condition:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._merge(unh_id, sample_changes, analysis_changes)
+            self._condition.notify()
+
+    def pending_changes(self, unh_id):
+        """The merged, not yet flushed changes for a UNH#, or None."""
+        with self._condition:
+            entry = self.pending.get(normalize_unh(unh_id))
+            if entry is None:
+                return None
+            return {"sample": dict(entry["sample"]), "analysis": dict(entry["analysis"])}
+
+    def pending_count(self):
+        with self._condition:
+            return len(self.pending)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="WriteBehindFlusher", daemon=True)
+            self._thread.start()
+
+    def retry_now(self):
+        """Skip the current back-off and flush as soon as possible."""
+        with self._condition:
+            self._force = True
+            self._condition.notify()
+
+    def stop(self, timeout=2.0):
+        """
+        Stop the flusher, giving a flush already in progress up to `timeout` seconds. Nothing is
+        flushed synchronously: edits still pending stay in the journal for the next start.
+        """
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        pending = self.pending_count()
+        if pending:
+            print(f"{pending} queued edits kept in {self.journal_path}; they will be written on the next start")
+        if not (self._thread is not None and self._thread.is_alive()):
+            # A flush still running keeps the lock until the process exits
+            self._lock_file.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stop and not self.pending:
+                    self._condition.wait()
+                # Let edits accumulate for a moment (longer after a failure) so they share a transaction
+                deadline = time.monotonic() + max(self.flush_interval, self._retry_delay)
+                while not self._stop and not self._force:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stop:
+                    return
+                self._force = False
+            self.flush_now()
+
+    def flush_now(self):
+        """Write all pending edits in one transaction. Returns True on success."""
+        with self._flush_lock:
+            with self._condition:
+                snapshot = OrderedDict(
+                    (unh_id, {"sample": dict(e["sample"]), "analysis": dict(e["analysis"])})
+                    for unh_id, e in self.pending.items())
+            if not snapshot:
+                return True
+
+            try:
+                conn = self._connect()
+                try:
+                    apply_batch_edit(conn, snapshot)
+                finally:
+                    conn.close()
+            except Exception as e:
+                with self._condition:
+                    self.last_error = str(e)
+                    self._retry_delay = min(max(self._retry_delay * 2, self.flush_interval * 2),
+                                            self.max_retry_delay)
+                    retry_in = self._retry_delay
+                    pending = len(self.pending)
+                print(f"Write-behind flush failed ({pending} pending, retrying in {retry_in:.0f}s): {e}")
+                self.events.put(("error", str(e), retry_in, pending))
+                return False
+
+            with self._condition:
+                # Edits that arrived during the flush stay queued; rewriting flushed values again is harmless
+                for unh_id, entry in snapshot.items():
+                    if self.pending.get(unh_id) == entry:
+                        del self.pending[unh_id]
+                self._rewrite_journal()
+                self.last_error = None
+                self._retry_delay = 0.0
+                pending = len(self.pending)
+            print(f"Write-behind flushed {len(snapshot)} samples ({pending} still pending)")
+            self.events.put(("flushed", snapshot, pending))
+            return True
+
+
+def chunked(items, size):
+    """Yield successive lists of at most `size` items (used to keep IN (...) lists small for Access)."""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def normalize_unh(value):
+    """Return a UNH# as the trimmed string form used for lookups, or '' if missing."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class DataExistenceMatrix:
+    """
+    Cached UNH# x measurement table existence matrix.
+    Built with one SELECT DISTINCT [UNH#] per table and refreshed incrementally for
+    individual samples, so the Edit tab and Search grid never have to probe tables per click.
+    Measurement data uploaded from other workstations is picked up by a full reload on Refresh
+    and by a periodic background reload. The sets are written from the reloader thread and read
+    by the UI, so every access goes through an RLock.
+    """
+
+    IN_CHUNK_SIZE = 200
+
+    def __init__(self, tables=None):
+        self.tables = dict(tables or MEASUREMENT_TABLES)
+        self.unh_sets = {key: set() for key in self.tables}
+        self.known_ids = set()
+        self.loaded = False
+        self.version = 0
+        self._stop_event = threading.Event()
+        self._reload_thread = None
+        self._lock = threading.RLock()
+
+    def load(self, conn):
+        """Load the full matrix: one SELECT DISTINCT per measurement table."""
+        start = time.perf_counter()
+        # Built aside and swapped in, so readers on other threads never see a half-loaded matrix
+        unh_sets = {}
+        cursor = conn.cursor()
+        for key, full_table_name in self.tables.items():
+            try:
+                cursor.execute(f"SELECT DISTINCT [UNH#] FROM [{full_table_name}]")
+                unh_sets[key] = {normalize_unh(row[0]) for row in cursor.fetchall() if row[0] is not None}
+            except Exception as e:
+                print(f"Error loading existence data from {full_table_name}: {e}")
+                with self._lock:
+                    unh_sets[key] = set(self.unh_sets.get(key, set()))
+        cursor.close()
+
+        with self._lock:
+            self.unh_sets = unh_sets
+            self.loaded = True
+            self.version += 1
+        total = sum(len(ids) for ids in unh_sets.values())
+        print(f"Loaded data existence matrix ({total} entries over {len(self.tables)} tables) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def refresh(self, conn, unh_ids):
+        """Re-check the given UNH#s against every measurement table using chunked IN (...) queries."""
+        unh_ids = sorted({normalize_unh(u) for u in unh_ids if normalize_unh(u)})
+        if not unh_ids:
+            return
+
+        start = time.perf_counter()
+        found_by_table = {}
+        cursor = conn.cursor()
+        for key, full_table_name in self.tables.items():
+            found = set()
+            try:
+                for chunk in chunked(unh_ids, self.IN_CHUNK_SIZE):
+                    placeholders = ", ".join(["?"] * len(chunk))
+                    cursor.execute(
+                        f"SELECT DISTINCT [UNH#] FROM [{full_table_name}] WHERE [UNH#] IN ({placeholders})",
+                        chunk
+                    )
+                    found.update(normalize_unh(row[0]) for row in cursor.fetchall())
+            except Exception as e:
+                print(f"Error refreshing existence data from {full_table_name}: {e}")
+                continue
+            found_by_table[key] = found
+        cursor.close()
+
+        with self._lock:
+            for key, found in found_by_table.items():
+                self.unh_sets[key].difference_update(unh_ids)
+                self.unh_sets[key].update(found)
+            self.known_ids.update(unh_ids)
+            self.version += 1
+        print(f"Refreshed existence flags for {len(unh_ids)} samples in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def update_flags(self, unh_id, related_data):
+        """Record fresh flags for one sample (e.g. from a single-record fetch)."""
+        unh_id = normalize_unh(unh_id)
+        with self._lock:
+            changed = False
+            for key, exists in related_data.items():
+                if key not in self.unh_sets:
+                    continue
+                if exists and unh_id not in self.unh_sets[key]:
+                    self.unh_sets[key].add(unh_id)
+                    changed = True
+                elif not exists and unh_id in self.unh_sets[key]:
+                    self.unh_sets[key].discard(unh_id)
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def flags(self, unh_id):
+        """Return {table_key: bool} for one UNH#."""
+        unh_id = normalize_unh(unh_id)
+        with self._lock:
+            return {key: unh_id in ids for key, ids in self.unh_sets.items()}
+
+    def start_reconciliation(self, connect, interval_seconds=600):
+        """Reload the whole matrix on a background thread every `interval_seconds`."""
+        if self._reload_thread is not None:
+            return
+
+        def run():
+            while not self._stop_event.wait(interval_seconds):
+                conn = None
+                try:
+                    conn = connect()
+                    self.load(conn)
+                except Exception as e:
+                    print(f"Data existence matrix reload failed: {e}")
+                finally:
+                    if conn is not None:
+                        try:
+                            conn.close()
+                        except Exception:
+                            pass
+
+        self._reload_thread = threading.Thread(target=run, name="ExistenceMatrixReloader", daemon=True)
+        self._reload_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def has_data_mask(self, unh_series, key=None):
+        """Vectorized boolean mask: sample has data in table `key` (or in any table if key is None)."""
+        unh = unh_series.map(normalize_unh)
+        with self._lock:
+            if key is not None:
+                return unh.isin(self.unh_sets.get(key, set()))
+            mask = pd.Series(False, index=unh_series.index)
+            for ids in self.unh_sets.values():
+                mask |= unh.isin(ids)
+            return mask
+
+
+def normalize_due_date(val):
+    """Return a date() for a Due_Date cell or None if unparsable."""
+    if pd.isna(val):
+        return None
+    try:
+        if isinstance(val, datetime.date) and not isinstance(val, datetime.datetime):
+            return val
+        if isinstance(val, datetime.datetime):
+            return val.date()
+        if isinstance(val, str) and val.strip():
+            # try several formats
+            for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d-%m-%Y', '%Y/%m/%d'):
+                try:
+                    return datetime.datetime.strptime(val.strip(), fmt).date()
+                except Exception:
+                    pass
+    except Exception as e:
+        print(f"normalize_due_date error: {e}")
+    return None
+
+
+class AnalysisRequestedIndex:
+    """
+    In-memory copy of [WRRC sample analysis requested], keyed by UNH#.
+    Loaded once alongside the sample data; the edit form, batch update and calendar read from it.
+    Each row also carries the sample name/project from [WRRC sample info] for the calendar views.
+    A background pass periodically reconciles it against the database.
+    A due-date index (date -> {UNH#: compact record}) is built with every full load and kept up
+    to date row by row on refresh, so a calendar month is a handful of dict lookups.
+    """
+
+    LABEL_COLUMNS = ["Sample_Name", "Project", "Sub_Project"]
+    IN_CHUNK_SIZE = 200
+
+    def __init__(self):
+        self.rows = {}
+        self.labels = {}
+        self.due_index = {}
+        self._due_date_of = {}
+        self.known_ids = set()
+        self.loaded = False
+        self.version = 0
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._reconcile_thread = None
+
+    def _select_sql(self, where=""):
+        labels = ", ".join(f"s.[{col}] AS [__s_{col}]" for col in self.LABEL_COLUMNS)
+        return (
+            f"SELECT a.*, {labels} "
+            "FROM [WRRC sample analysis requested] AS a "
+            "LEFT JOIN [WRRC sample info] AS s ON a.[UNH#] = s.[UNH#]"
+            f"{where}"
+        )
+
+    def _fetch(self, cursor):
+        """Read a result set into ({unh: row_dict}, {unh: label_dict})."""
+        columns = [column[0] for column in cursor.description]
+        rows = {}
+        labels = {}
+        for row in cursor.fetchall():
+            record = {}
+            label = {}
+            for col, value in zip(columns, row):
+                if col.startswith("__s_"):
+                    label[col[len("__s_"):]] = value
+                else:
+                    record[col] = value
+            unh_id = normalize_unh(record.get("UNH#"))
+            # The join can repeat a UNH# if sample info has duplicates; keep the first row
+            if unh_id and unh_id not in rows:
+                rows[unh_id] = record
+                labels[unh_id] = label
+        return rows, labels
+
+    def load(self, conn):
+        """Bulk-load the whole table in one query."""
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self._select_sql())
+            rows, labels = self._fetch(cursor)
+        finally:
+            cursor.close()
+
+        with self._lock:
+            self.rows = rows
+            self.labels = labels
+            self._rebuild_due_index()
+            self.loaded = True
+            self.version += 1
+        print(f"Loaded {len(rows)} analysis-requested rows into memory in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        print(self.memory_report())
+
+    def refresh(self, conn, unh_ids):
+        """Re-read the rows for the given UNH#s (after a save, batch update or import)."""
+        unh_ids = sorted({normalize_unh(u) for u in unh_ids if normalize_unh(u)})
+        if not unh_ids:
+            return
+
+        rows, labels = {}, {}
+        cursor = conn.cursor()
+        try:
+            for chunk in chunked(unh_ids, self.IN_CHUNK_SIZE):
+                placeholders = ", ".join(["?"] * len(chunk))
+                cursor.execute(self._select_sql(f" WHERE a.[UNH#] IN ({placeholders})"), chunk)
+                chunk_rows, chunk_labels = self._fetch(cursor)
+                rows.update(chunk_rows)
+                labels.update(chunk_labels)
+        finally:
+            cursor.close()
+
+        with self._lock:
+            for unh_id in unh_ids:
+                if unh_id in rows:
+                    self.rows[unh_id] = rows[unh_id]
+                    self.labels[unh_id] = labels[unh_id]
+                else:
+                    self.rows.pop(unh_id, None)
+                    self.labels.pop(unh_id, None)
+                self._index_due_date(unh_id)
+            self.known_ids.update(unh_ids)
+            self.version += 1
+
+    def get(self, unh_id):
+        """Return a copy of the analysis row for a UNH#, or None if it has no row."""
+        with self._lock:
+            row = self.rows.get(normalize_unh(unh_id))
+            return dict(row) if row is not None else None
+
+    def exists(self, unh_id):
+        with self._lock:
+            return normalize_unh(unh_id) in self.rows
+
+    def due_date_rows(self):
+        """Return [(unh_id, due_date, label_dict)] for every row with a Due_Date."""
+        with self._lock:
+            return [
+                (unh_id, row.get("Due_Date"), self.labels.get(unh_id, {}))
+                for unh_id, row in self.rows.items()
+                if row.get("Due_Date") is not None
+            ]
+
+    def _index_due_date(self, unh_id, normalize=normalize_due_date):
+        """Move one UNH# to the right due-date bucket (or out of the index). Call with the lock held."""
+        old_date = self._due_date_of.pop(unh_id, None)
+        if old_date is not None:
+            bucket = self.due_index.get(old_date)
+            if bucket is not None:
+                bucket.pop(unh_id, None)
+                if not bucket:
+                    del self.due_index[old_date]
+
+        row = self.rows.get(unh_id)
+        due_date = normalize(row.get("Due_Date")) if row is not None else None
+        if due_date is None:
+            return
+        label = self.labels.get(unh_id, {})
+        self.due_index.setdefault(due_date, {})[unh_id] = {
+            'UNH#': unh_id,
+            'Due_Date': row.get("Due_Date"),
+            'Sample_Name': label.get('Sample_Name'),
+            'Project': label.get('Project'),
+            'Sub_Project': label.get('Sub_Project')
+        }
+        self._due_date_of[unh_id] = due_date
+
+    def _rebuild_due_index(self):
+        """Rebuild the due-date index from self.rows. Call with the lock held."""
+        start = time.perf_counter()
+        self.due_index = {}
+        self._due_date_of = {}
+        # Many samples share a due date: parse each distinct value once
+        parsed = {}
+
+        def normalize(value):
+            if value not in parsed:
+                parsed[value] = normalize_due_date(value)
+            return parsed[value]
+
+        for unh_id in self.rows:
+            self._index_due_date(unh_id, normalize)
+        print(f"Indexed {len(self._due_date_of)} due dates across {len(self.due_index)} days in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def due_dates_between(self, start=None, end=None):
+        """{date: [record]} for the due dates from start to end inclusive (open-ended if None)."""
+        groups = {}
+        with self._lock:
+            if not self.due_index:
+                return groups
+            start = start or min(self.due_index)
+            end = end or max(self.due_index)
+            day = start
+            while day <= end:
+                bucket = self.due_index.get(day)
+                if bucket:
+                    groups[day] = list(bucket.values())
+                day += datetime.timedelta(days=1)
+        return groups
+
+    def memory_report(self):
+        """Approximate memory used by the cached rows."""
+        with self._lock:
+            total = sys.getsizeof(self.rows) + sys.getsizeof(self.labels)
+            for unh_id, row in self.rows.items():
+                total += sys.getsizeof(unh_id) + sys.getsizeof(row)
+                total += sum(sys.getsizeof(v) for v in row.values())
+            for label in self.labels.values():
+                total += sys.getsizeof(label) + sum(sys.getsizeof(v) for v in label.values())
+            columns = len(next(iter(self.rows.values()), {}))
+            return (f"Analysis-requested cache: {len(self.rows)} rows x {columns} columns, "
+                    f"~{total / (1024 * 1024):.2f} MB")
+
+    def reconcile(self, conn):
+        """
+        Compare the cache against a fresh read of the table and adopt the database state.
+        Returns (missing, extra, changed) counts from the cache's point of view.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            version_at_start = self.version
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self._select_sql())
+            rows, labels = self._fetch(cursor)
+        finally:
+            cursor.close()
+
+        with self._lock:
+            missing = [u for u in rows if u not in self.rows]
+            extra = [u for u in self.rows if u not in rows]
+            changed = [u for u in rows if u in self.rows and rows[u] != self.rows[u]]
+            if self.version != version_at_start:
+                # The app wrote to the cache while we were reading; our snapshot may predate it
+                print("Analysis cache changed during reconciliation; will adopt on the next pass")
+            elif missing or extra or changed:
+                self.rows = rows
+                self.labels = labels
+                self._rebuild_due_index()
+                self.version += 1
+
+        print(f"Reconciled analysis-requested cache in {(time.perf_counter() - start) * 1000:.1f} ms: "
+              f"{len(missing)} missing, {len(extra)} extra, {len(changed)} changed")
+        if missing or extra or changed:
+            print(f"  Example differences: missing={missing[:5]} extra={extra[:5]} changed={changed[:5]}")
+        return len(missing), len(extra), len(changed)
+
+    def start_reconciliation(self, connect, interval_seconds=600):
+        """Run reconcile() on a background thread every `interval_seconds`."""
+        if self._reconcile_thread is not None:
+            return
+
+        def run():
+            while not self._stop_event.wait(interval_seconds):
+                conn = None
+                try:
+                    conn = connect()
+                    self.reconcile(conn)
+                except Exception as e:
+                    print(f"Analysis cache reconciliation failed: {e}")
+                finally:
+                    if conn is not None:
+                        try:
+                            conn.close()
+                        except Exception:
+                            pass
+
+        self._reconcile_thread = threading.Thread(target=run, name="AnalysisIndexReconciler", daemon=True)
+        self._reconcile_thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# Rank given to empty/unparsable values, so they can be kept last in either sort direction
+SORT_RANK_EMPTY = np.iinfo(np.int64).max
+
+
+def compute_sort_ranks(values, column_name):
+    """
+    Compute dense integer sort ranks for one column of the search data.
+    UNH# sorts numerically, date columns by parsed date, numeric columns by value
+    and everything else case-folded. Empty values always rank last (SORT_RANK_EMPTY).
+    """
+    series = pd.Series(values).fillna("").astype(str).str.strip()
+    empty = (series == "").to_numpy()
+    ranks = np.zeros(len(series), dtype=np.int64)
+
+    if column_name == "UNH#":
+        numeric = pd.to_numeric(series, errors='coerce')
+        is_num = numeric.notna().to_numpy()
+        num_ranks = numeric[is_num].rank(method='dense').to_numpy(dtype=np.int64)
+        ranks[is_num] = num_ranks
+        offset = int(num_ranks.max()) if len(num_ranks) else 0
+        # Non-numeric IDs sort after the numeric ones, alphabetically
+        text_mask = ~is_num & ~empty
+        text_ranks = series[text_mask].str.casefold().rank(method='dense').to_numpy(dtype=np.int64)
+        ranks[text_mask] = text_ranks + offset
+    else:
+        typed = None
+        non_empty = series[~empty]
+        if len(non_empty):
+            numeric = pd.to_numeric(non_empty, errors='coerce')
+            if numeric.notna().all():
+                typed = pd.to_numeric(series.where(~empty), errors='coerce')
+            elif 'date' in column_name.lower():
+                try:
+                    typed = pd.to_datetime(series.where(~empty), errors='coerce', format='mixed')
+                except (TypeError, ValueError):
+                    typed = pd.to_datetime(series.where(~empty), errors='coerce')
+                if typed.notna().sum() < len(non_empty) * 0.5:
+                    typed = None
+
+        if typed is None:
+            typed = series.str.casefold().where(~empty)
+
+        valid = typed.notna().to_numpy()
+        ranks[valid] = typed[valid].rank(method='dense').to_numpy(dtype=np.int64)
+        empty = ~valid
+
+    # Empty / unparsable values go to the end
+    ranks[empty] = SORT_RANK_EMPTY
+    return ranks
+
+
+def descending_sort_ranks(ranks):
+    """Ranks for a descending sort: non-empty values reversed, empty ones still last."""
+    return np.where(ranks == SORT_RANK_EMPTY, SORT_RANK_EMPTY, -ranks)
+
+
+# Sample Submission form: header text -> sample field, and the analysis checkbox columns
+SUBMISSION_FIELD_MAPPINGS = {
+    'UNH ID': 'unh_id',
+    'Sample_Name': 'sample_name',
+    'Collection_Date': 'collection_date',
+    'Collection_Time': 'collection_time',
+    'Sample_Type': 'sample_type',
+    'Field_Notes': 'field_notes',
+    'pH': 'ph',
+    'Cond µS/cm': 'cond',
+    'Spec_Cond µS/cm': 'spec_cond',
+    'DO_Conc mg/L': 'do_conc',
+    'DO%': 'do_percent',
+    'Temperature degrees C': 'temperature',
+    'Salinity (ppt)': 'salinity',
+    'Number of containers': 'containers',
+    'Filtered/unfiltered?': 'filtered',
+    'Preservation': 'preservation',
+    'Filter - Volume Filtered mL': 'filter_volume'
+}
+SUBMISSION_ANALYSIS_NAMES = [
+    'DOC', 'TDN', 'Anions', 'Cations', 'NO3+NO2', 'NO2', 'NH4',
+    'PO4/SRP', 'SiO2', 'TN', 'TP', 'TDP', 'TSS', 'PC/PN',
+    'Chl a', 'EEMs', 'Gases - GC', 'Additional'
+]
+SUBMISSION_SHEETS = ["Project Information", "Sample Information"]
+
+# Parsed workbooks keyed by (path, kind, mtime, size); preview followed by import costs one parse
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+PARSE_CACHE_SIZE = 4
+
+
+def parse_cached(file_path, kind, parse):
+    """
+    Return parse(file_path), reusing the result while the file's (mtime, size) is unchanged.
+    Cached DataFrames are handed out as copies so callers can't alter the cached parse.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), kind, stat.st_mtime_ns, stat.st_size)
+    with _PARSE_CACHE_LOCK:
+        result = _PARSE_CACHE.get(key)
+        if result is not None:
+            _PARSE_CACHE.move_to_end(key)
+            print(f"Using cached {kind} parse of {os.path.basename(file_path)}")
+    if result is None:
+        start = time.perf_counter()
+        result = parse(file_path)
+        print(f"Parsed {kind} file {os.path.basename(file_path)} in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        with _PARSE_CACHE_LOCK:
+            _PARSE_CACHE[key] = result
+            while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
+    return tuple(df.copy() for df in result) if isinstance(result, tuple) else result.copy()
+
+
+def detect_header_row(raw_df, known_headers, max_rows=10, default=1):
+    """Index of the row (among the first `max_rows`) matching the most known header names."""
+    known = {str(h).strip().lower() for h in known_headers}
+    best_row, best_hits = default, 0
+    for i in range(min(max_rows, len(raw_df))):
+        hits = sum(1 for value in raw_df.iloc[i] if pd.notna(value) and str(value).strip().lower() in known)
+        if hits > best_hits:
+            best_row, best_hits = i, hits
+    return best_row
+
+
+def frame_from_header_row(raw_df, header_row):
+    """
+    Turn a header=None, dtype=object read into exactly what read_excel(header=header_row) returns,
+    by running pandas' own row parser over the rows already loaded (same column naming,
+    numeric inference and NA handling as the Excel reader).
+    """
+    rows = [["" if value is None or (isinstance(value, float) and pd.isna(value)) else value
+             for value in row]
+            for row in raw_df.itertuples(index=False, name=None)]
+    return TextParser(rows, header=header_row).read()
+
+
+def parse_submission_workbook(file_path):
+    """
+    Parse a Sample Submission workbook in one pass: the workbook is opened once, each sheet is
+    read once and the Sample Information header row is detected from the rows already loaded.
+    Returns (project_df, sample_df); raises ValueError if a required sheet is missing.
+    """
+    with pd.ExcelFile(file_path) as xls:
+        missing_sheets = [sheet for sheet in SUBMISSION_SHEETS if sheet not in xls.sheet_names]
+        if missing_sheets:
+            raise ValueError(f"The Excel file is missing the following required sheets: "
+                             f"{', '.join(missing_sheets)}")
+
+        project_df = xls.parse("Project Information")
+        raw_df = xls.parse("Sample Information", header=None, dtype=object)
+
+    header_row = detect_header_row(raw_df, list(SUBMISSION_FIELD_MAPPINGS) + SUBMISSION_ANALYSIS_NAMES)
+    print(f"Sample Information header detected on row {header_row + 1}")
+    sample_df = frame_from_header_row(raw_df, header_row)
+
+    return project_df.fillna(""), sample_df.fillna("")
+
+
+def extract_project_info(project_df):
+    """
+    Extract project information by finding field names in the first column
+    and their values in the second column.
+    """
+    project_info = {}
+
+    # Check if the DataFrame is not empty
+    if project_df.empty:
+        print("Project DataFrame is empty")
+        return project_info
+
+    # Print DataFrame shape and columns for debugging
+    print(f"Project DataFrame shape: {project_df.shape}")
+    print(f"Project DataFrame columns: {project_df.columns.tolist()}")
+    print("First few rows:")
+    print(project_df.head().to_string())
+
+    # Extract field names and values by searching for labels in the first column
+    # and their corresponding values in the second column
+    field_mapping = {
+        "Contact Name": "contact_name",
+        "Contact Address": "contact_address",
+        "Contact Email": "contact_email",
+        "Project Name": "project_name",
+        "Project Location/Area": "project_location",
+        "Brief Project Description": "project_description",
+        "Date samples shipped": "shipment_date"
+    }
+
+    # Find the column names (they might vary)
+    first_col = project_df.columns[0] if len(project_df.columns) > 0 else None
+    second_col = project_df.columns[1] if len(project_df.columns) > 1 else None
+
+    if first_col is None or second_col is None:
+        print("Error: DataFrame doesn't have enough columns")
+        return project_info
+
+    # Iterate through each row to find the fields
+    for i in range(len(project_df)):
+        field_label = project_df.iloc[i][first_col]
+        field_value = project_df.iloc[i][second_col] if i < len(project_df) else ""
+
+        # Skip if the field label is not a string
+        if not isinstance(field_label, str):
+            continue
+
+        # Clean up the field label by removing : and whitespace
+        clean_label = field_label.strip().rstrip(':')
+
+        # Print each label for debugging
+        print(f"Checking label: '{field_label}' -> cleaned to -> '{clean_label}'")
+
+        # Match with our field mapping
+        for key, mapped_name in field_mapping.items():
+            if clean_label.lower() == key.lower():
+                project_info[mapped_name] = str(field_value).strip()
+                print(f"✅ Matched '{clean_label}' -> '{mapped_name}' with value: '{field_value}'")
+                break
+
+    # Print what we found for debugging
+    print("Extracted project info:")
+    for k, v in project_info.items():
+        print(f"  {k}: {v}")
+
+    return project_info
+
+
+# Log Book files are streamed in chunks; the first chunk is small so the preview appears quickly
+LOGBOOK_FIRST_CHUNK_ROWS = 200
+LOGBOOK_CHUNK_ROWS = 2000
+# Besides Excel, Log Book imports read delimited text and Parquet exports
+CSV_EXTENSIONS = (".csv", ".tsv", ".txt")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+# Optional source header -> Log Book header renames for instrument and LIMS exports
+IMPORT_COLUMN_MAP_FILE = "import_column_map.json"
+
+
+def _excel_cell_value(cell):
+    """A read-only cell's value as pandas' openpyxl reader returns it."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == "e":
+        return np.nan
+    if isinstance(cell.value, float) and cell.value.is_integer():
+        return int(cell.value)
+    return cell.value
+
+
+def iter_logbook_chunks(file_path, chunk_size=LOGBOOK_CHUNK_ROWS, first_chunk_size=LOGBOOK_FIRST_CHUNK_ROWS,
+                        column_map=None):
+    """
+    Stream a Log Book source as DataFrame chunks with empty cells as "": an Excel workbook,
+    a CSV/TSV export or a Parquet file, chosen by extension. column_map renames source headers
+    to Log Book headers (see load_column_map) before the chunks reach the extractor.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in CSV_EXTENSIONS:
+        chunks = _iter_csv_chunks(file_path, chunk_size, first_chunk_size)
+    elif extension in PARQUET_EXTENSIONS:
+        chunks = _iter_parquet_chunks(file_path, chunk_size, first_chunk_size)
+    else:
+        chunks = _iter_excel_chunks(file_path, chunk_size, first_chunk_size)
+
+    for chunk in chunks:
+        if column_map:
+            chunk = chunk.rename(columns=lambda col: column_map.get(str(col).strip(), col))
+        yield chunk
+
+
+def load_column_map(path):
+    """
+    Read a JSON object of source header -> Log Book header renames, e.g.
+    {"Temp_C": "Temperature", "Lab Sample ID": "UNH#"}. Returns {} when the file doesn't exist.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        column_map = json.load(f)
+    if not isinstance(column_map, dict):
+        raise ValueError(f"{path} must contain a JSON object of source header -> Log Book header")
+    column_map = {str(source).strip(): str(target) for source, target in column_map.items()}
+    print(f"Loaded {len(column_map)} column renames from {path}")
+    return column_map
+
+
+def _iter_csv_chunks(file_path, chunk_size, first_chunk_size):
+    """
+    Stream a delimited text export with pandas' chunked C reader. Every cell is read as text
+    (so IDs never become floats) and blanks stay "". The delimiter is sniffed from the start
+    of the file.
+    """
+    if file_path.lower().endswith(".tsv"):
+        delimiter = "\t"
+    else:
+        with open(file_path, "r", encoding="utf-8-sig", errors="replace") as f:
+            sample = f.read(64 * 1024)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+        except csv.Error:
+            delimiter = ","
+
+    with pd.read_csv(file_path, sep=delimiter, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                     encoding_errors="replace", iterator=True) as reader:
+        size = first_chunk_size
+        while True:
+            try:
+                chunk = reader.get_chunk(size)
+            except StopIteration:
+                return
+            yield chunk.reset_index(drop=True)
+            size = chunk_size
+
+
+def _iter_parquet_chunks(file_path, chunk_size, first_chunk_size):
+    """
+    Stream a Parquet file batch by batch with pyarrow (an optional dependency, only needed for
+    Parquet). Integer columns with nulls stay integers and missing values become "".
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Reading Parquet files needs the pyarrow package (pip install pyarrow).")
+
+    def to_frame(batches):
+        frame = pa.Table.from_batches(batches).to_pandas(integer_object_nulls=True, date_as_object=True)
+        return frame.astype(object).where(frame.notna(), "")
+
+    parquet_file = pq.ParquetFile(file_path)
+    pending = []
+    pending_rows = 0
+    first = True
+    for batch in parquet_file.iter_batches(batch_size=first_chunk_size):
+        if first:
+            yield to_frame([batch])
+            first = False
+            continue
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= chunk_size:
+            yield to_frame(pending)
+            pending = []
+            pending_rows = 0
+    if pending:
+        yield to_frame(pending)
+
+
+def _iter_excel_chunks(file_path, chunk_size, first_chunk_size):
+    """
+    Stream the first sheet of a Log Book workbook as DataFrame chunks (header taken from the
+    first row, empty cells as ""), using openpyxl read-only mode so only one chunk of rows is
+    in memory at a time. Column names and NA handling come from pandas' row parser, but columns
+    stay object dtype: cells keep their Excel type whatever the rest of the column holds, so a
+    blank cell can't turn every ID in the column into "1200.0" the way whole-sheet inference does.
+    Old .xls files can't be streamed and are read whole, then sliced.
+    """
+    if not file_path.lower().endswith((".xlsx", ".xlsm")):
+        log_data = pd.read_excel(file_path).fillna("")
+        size = first_chunk_size
+        for start in range(0, len(log_data), size):
+            yield log_data.iloc[start:start + size].reset_index(drop=True)
+            size = chunk_size
+        return
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # The stored dimensions are often wrong in exported files; read until the rows run out
+        ws.reset_dimensions()
+        rows = ws.iter_rows()
+
+        header = None
+        for row in rows:
+            values = [_excel_cell_value(cell) for cell in row]
+            if any(value != "" for value in values):
+                header = values
+                break
+        if header is None:
+            return
+        while header and header[-1] == "":
+            header.pop()
+        width = len(header)
+
+        batch = []
+        size = first_chunk_size
+        for row in rows:
+            values = [_excel_cell_value(cell) for cell in row[:width]]
+            batch.append(values + [""] * (width - len(values)))
+            if len(batch) >= size:
+                yield TextParser([header] + batch, header=0, dtype=object).read().fillna("")
+                batch = []
+                size = chunk_size
+        if batch:
+            yield TextParser([header] + batch, header=0, dtype=object).read().fillna("")
+    finally:
+        wb.close()
+
+
+# Log Book: header text -> sample field, and the analysis checkbox columns
+LOGBOOK_FIELD_MAPPINGS = {
+    'UNH#': 'unh_id',
+    'Sample_Name': 'sample_name',
+    'Collection_Date': 'collection_date',
+    'Collection_Time': 'collection_time',
+    'Project': 'project',
+    'Sub_Project': 'sub_project',
+    'Sub_ProjectA': 'sub_projecta',
+    'Sub_ProjectB': 'sub_projectb',
+    'BatchID': 'batch_id',
+    'Frozen_Received': 'frozen_received',
+    'Refrigerated_Received': 'refrigerated_received',
+    'Field_Notes': 'field_notes',
+    'Lab_Notes': 'lab_notes',
+    'Sample_Type': 'sample_type',
+    'Logger': 'logger',
+    'pH': 'ph',
+    'Cond': 'cond',
+    'Spec_Cond': 'spec_cond',
+    'DO_Conc': 'do_conc',
+    'DO%': 'do_percent',
+    'Temperature': 'temperature',
+    'Turbidity': 'turbidity',
+    'Salinity': 'salinity',
+    'DTWT': 'dtwt',
+    'Volume': 'volume',
+    'Dilution': 'dilution',
+    'Start Date/Time': 'start_datetime',
+    'Atm_Pressure_mb': 'atm_pressure',
+    'ORP_mV': 'orp_mv',
+    'Due_Date': 'due_date'
+}
+LOGBOOK_ANALYSIS_NAMES = [
+    'DOC', 'TDN', 'Anions', 'Cations', 'NO3+NO2', 'NO2', 'NH4',
+    'PO4/SRP', 'SiO2', 'TN', 'TP', 'TDP', 'TSS', 'PC/PN',
+    'Chl a', 'EEMs', 'Gases - GC', 'ICPOES', 'Additional'
+]
+
+# Cell values that mark an analysis as requested (compared after str().upper().strip())
+ANALYSIS_REQUESTED_FLAGS = ('X', 'TRUE', '1', 'Y')
+
+
+def header_tokens(header):
+    """
+    Lower-case word tokens of a header, ignoring parenthesised units: '_' and punctuation
+    separate words, '%' and '#' are kept ('DO_Conc (mg/L)' -> ('do', 'conc')).
+    """
+    text = re.sub(r"\([^)]*\)", " ", str(header).lower())
+    return tuple(re.findall(r"[^\W_]+|[%#]", text))
+
+
+def _common_prefix_length(a, b):
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+class ColumnResolver:
+    """
+    Maps a sheet's headers to sample fields and analysis names. The rules are compiled once:
+    exact header, then the same words ignoring case, punctuation and units ('Sample Name' ==
+    'Sample_Name'), then the field whose header shares the longest run of leading words
+    ('DO_Conc (mg/L)' -> 'DO_Conc', never 'Cond'; the run must be two words or all of one of
+    the two headers), then a field whose header contains all of the column's words
+    ('Containers' -> 'Number of containers'). A tie is left unmapped rather than guessed. Analysis columns match their name exactly, ignoring case.
+
+    Resolutions are cached by a hash of the header row, so every chunk of a file and every
+    file from a known template version maps with one dict lookup. Columns that match nothing
+    are reported once per header signature with their best-scoring candidates.
+    """
+    CACHE_SIZE = 32
+
+    def __init__(self, field_mappings, analysis_names, label="Sheet"):
+        self.label = label
+        self._exact = dict(field_mappings)
+        self._rules = [(header_tokens(header), header, field) for header, field in field_mappings.items()]
+        self._by_tokens = {}
+        for tokens, _, field in self._rules:
+            self._by_tokens.setdefault(tokens, field)
+        self._analyses = {}
+        for name in analysis_names:
+            self._analyses.setdefault(name.lower(), name)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def signature(columns):
+        """Hash of the stripped header texts, in order."""
+        joined = "\x1f".join(str(col).strip() for col in columns)
+        return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+    def _match_field(self, col_str):
+        if col_str in self._exact:
+            return self._exact[col_str]
+        tokens = header_tokens(col_str)
+        if not tokens:
+            return None
+        if tokens in self._by_tokens:
+            return self._by_tokens[tokens]
+
+        best = {}
+        for rule_tokens, _, field in self._rules:
+            length = _common_prefix_length(tokens, rule_tokens)
+            # One shared leading word only counts when it is a whole header ('Lab ID' is not 'Lab_Notes')
+            if length >= 2 or (length and length in (len(tokens), len(rule_tokens))):
+                best[field] = max(best.get(field, 0), length)
+        if best:
+            top = max(best.values())
+            fields = [field for field, length in best.items() if length == top]
+            return fields[0] if len(fields) == 1 else None
+
+        fields = {field for rule_tokens, _, field in self._rules if set(tokens) <= set(rule_tokens)}
+        return fields.pop() if len(fields) == 1 else None
+
+    def candidates(self, header, limit=3):
+        """The `limit` mapping headers most similar to `header`, as (header, field, score)."""
+        text = " ".join(header_tokens(header))
+        scored = [(rule_header, field, difflib.SequenceMatcher(None, text, " ".join(rule_tokens)).ratio())
+                  for rule_tokens, rule_header, field in self._rules]
+        scored.sort(key=lambda item: item[2], reverse=True)
+        return scored[:limit]
+
+    def _compile(self, columns):
+        fields, analyses, unmatched = [], [], {}
+        for position, col in enumerate(columns):
+            col_str = str(col).strip()
+            analysis = self._analyses.get(col_str.lower())
+            if analysis is not None:
+                analyses.append((position, analysis))
+                # Analysis checkboxes only double as a field on an exact header match
+                if col_str in self._exact:
+                    fields.append((position, self._exact[col_str]))
+                continue
+            field = self._match_field(col_str)
+            if field is not None:
+                fields.append((position, field))
+            elif col_str and not col_str.startswith("Unnamed:") and col_str.lower() != "nan":
+                unmatched[col_str] = self.candidates(col_str)
+        return {"fields": fields, "analyses": analyses, "unmatched": unmatched}
+
+    def resolve(self, columns):
+        """
+        Resolve a header row. Returns a dict with 'fields' (column -> sample field), 'analyses'
+        (column -> analysis name), 'unmatched' (header -> best candidates), 'signature' and
+        'cached' (True when the header row was seen before).
+        """
+        columns = list(columns)
+        signature = self.signature(columns)
+        with self._lock:
+            compiled = self._cache.get(signature)
+            cached = compiled is not None
+            if cached:
+                self._cache.move_to_end(signature)
+        if not cached:
+            compiled = self._compile(columns)
+            with self._lock:
+                self._cache[signature] = compiled
+                while len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            self._report(columns, compiled, signature)
+        return {"fields": {columns[position]: field for position, field in compiled["fields"]},
+                "analyses": {columns[position]: name for position, name in compiled["analyses"]},
+                "unmatched": compiled["unmatched"], "signature": signature, "cached": cached}
+
+    def _report(self, columns, compiled, signature):
+        print(f"{self.label} header {signature[:12]}: {len(columns)} columns, {len(compiled['fields'])} fields, "
+              f"{len(compiled['analyses'])} analyses")
+        for position, field in compiled["fields"]:
+            print(f"  {columns[position]} -> {field}")
+        print(f"  Analysis columns: {[columns[position] for position, _ in compiled['analyses']]}")
+        for header, candidates in compiled["unmatched"].items():
+            suggestions = ", ".join(f"'{rule_header}' ({score:.2f})" for rule_header, _, score in candidates)
+            print(f"  Unrecognised column '{header}'; closest: {suggestions}")
+
+
+SUBMISSION_COLUMNS = ColumnResolver(SUBMISSION_FIELD_MAPPINGS, SUBMISSION_ANALYSIS_NAMES, "Sample Information")
+LOGBOOK_COLUMNS = ColumnResolver(LOGBOOK_FIELD_MAPPINGS, LOGBOOK_ANALYSIS_NAMES, "Log Book")
+
+
+def cell_text(series):
+    """str() of every cell, column-wise (datetime columns go through str() so they keep their time part)."""
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        return series.map(str)
+    return series.astype(str)
+
+
+def format_cells(series):
+    """
+    Column-wise form of the extractors' per-cell formatting: dates as YYYY-MM-DD, times as
+    HH:MM:SS, everything else str().strip(). Missing cells come back as NaN.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d').astype(object)
+
+    text = cell_text(series).str.strip().astype(object)
+    if series.dtype == object:
+        types = series.map(type)
+        is_date = types.isin([datetime.datetime, datetime.date, pd.Timestamp])
+        if is_date.any():
+            text[is_date] = series[is_date].map(lambda value: value.strftime('%Y-%m-%d'))
+        is_time = types == datetime.time
+        if is_time.any():
+            text[is_time] = series[is_time].map(lambda value: value.strftime('%H:%M:%S'))
+    return text.where(series.notna())
+
+
+def analysis_flag_block(df, analysis_columns):
+    """One boolean column per analysis name: True where the cell marks the analysis as requested."""
+    flags = {}
+    for col, analysis_name in analysis_columns.items():
+        values = df[col]
+        flags[analysis_name] = (values.notna()
+                                & cell_text(values).str.upper().str.strip().isin(ANALYSIS_REQUESTED_FLAGS))
+    return pd.DataFrame(flags, index=df.index)
+
+
+def _field_columns(column_mapping, formatted, include):
+    """(field, values) per mapped column, in column order; rows without a value hold None."""
+    return [(field_name, np.where(include[col], formatted[col], None))
+            for col, field_name in column_mapping.items()]
+
+
+def _field_values(field_columns, field_name, size):
+    """The value a field ends up with per row: the last column mapped to it that has a value wins."""
+    values = np.full(size, None, dtype=object)
+    for name, column_values in field_columns:
+        if name == field_name:
+            values = np.where(pd.notna(column_values), column_values, values)
+    return values
+
+
+def _build_records(field_columns, analyses, keep):
+    """
+    Produce the sample dicts for the kept rows. Assigning column by column keeps the key order
+    (and last-value-wins) of the old row-by-row extractors; 'analyses' goes last.
+    """
+    columns = [(name, values[keep]) for name, values in field_columns]
+    analysis_names = list(analyses.columns)
+    analysis_rows = analyses.to_numpy(dtype=bool)[keep].tolist()
+
+    samples = []
+    for i, flags in enumerate(analysis_rows):
+        sample = {}
+        for name, values in columns:
+            value = values[i]
+            if value is not None:
+                sample[name] = value
+        sample['analyses'] = dict(zip(analysis_names, flags))
+        samples.append(sample)
+    return samples
+
+
+def _print_first_sample(samples):
+    if samples:
+        print("First sample:")
+        for key, value in samples[0].items():
+            if key != 'analyses':
+                print(f"  {key}: {value}")
+        print("  Analyses requested:")
+        for analysis, requested in samples[0]['analyses'].items():
+            if requested:
+                print(f"    {analysis}")
+
+
+def extract_sample_records(sample_df):
+    """
+    Extract sample information from a Sample Submission DataFrame.
+    Returns a list of dictionaries, each containing a sample's information.
+    """
+    if sample_df.empty:
+        return []
+
+    print(f"Sample DataFrame has {len(sample_df)} rows and {len(sample_df.columns)} columns")
+
+    df = sample_df.reset_index(drop=True)
+    resolution = SUBMISSION_COLUMNS.resolve(df.columns)
+    column_mapping = resolution["fields"]
+    analysis_columns = resolution["analyses"]
+
+    # Rows to keep: not completely empty, not a repeated header row
+    keep = ~df.isnull().all(axis=1)
+    header_like = df.iloc[:, 0].map(
+        lambda value: isinstance(value, str) and ('UNH' in value or 'Sample' in value or 'ID' in value))
+    if header_like.any():
+        print(f"Skipping {int((header_like & keep).sum())} header-like rows")
+    keep &= ~header_like.astype(bool)
+
+    formatted = {col: format_cells(df[col]) for col in column_mapping}
+    include = {col: df[col].notna().to_numpy() for col in column_mapping}
+    field_columns = _field_columns(column_mapping, formatted, include)
+
+    # Only keep samples that have at least a sample name or UNH ID
+    has_id = np.zeros(len(df), dtype=bool)
+    for name in ('sample_name', 'unh_id'):
+        has_id |= np.array([bool(value) for value in _field_values(field_columns, name, len(df))], dtype=bool)
+    keep = keep.to_numpy() & has_id
+
+    samples = _build_records(field_columns, analysis_flag_block(df, analysis_columns), keep)
+
+    print(f"Extracted {len(samples)} valid samples")
+    _print_first_sample(samples)
+    return samples
+
+
+def extract_logbook_records(log_data):
+    """
+    Extract sample information from a Log Book DataFrame.
+    Returns a list of dictionaries, each containing a sample's information.
+    Skip rows where only UNH# is populated.
+    """
+    if log_data.empty:
+        return []
+
+    df = log_data.reset_index(drop=True)
+    resolution = LOGBOOK_COLUMNS.resolve(df.columns)
+    column_mapping = resolution["fields"]
+    analysis_columns = resolution["analyses"]
+
+    keep = (~df.isnull().all(axis=1)).to_numpy()
+
+    # A cell counts as populated when it is not NA and not blank once stringified
+    stripped = {col: cell_text(df[col]).str.strip() for col in column_mapping}
+    populated = {col: (df[col].notna() & (stripped[col] != "")).to_numpy() for col in column_mapping}
+
+    # UNH# comes from the first column mapped to it, as plain text
+    unh_col = next((col for col, field in column_mapping.items() if field == 'unh_id'), None)
+    other_mapping = OrderedDict((col, field) for col, field in column_mapping.items() if field != 'unh_id')
+    if unh_col is not None:
+        unh_values = np.where(populated[unh_col], stripped[unh_col].astype(object), None)
+        mapping = OrderedDict([(unh_col, 'unh_id')])
+        mapping.update(other_mapping)
+    else:
+        unh_values = np.full(len(df), None, dtype=object)
+        mapping = other_mapping
+
+    # Skip rows where only UNH# is populated
+    has_other_data = np.zeros(len(df), dtype=bool)
+    for col in other_mapping:
+        has_other_data |= populated[col]
+    unh_only = pd.notna(unh_values) & ~has_other_data
+    if unh_only.any():
+        print(f"Skipping {int((unh_only & keep).sum())} rows with only UNH#")
+    keep = keep & ~unh_only
+
+    formatted = {col: format_cells(df[col]) for col in other_mapping}
+    if unh_col is not None:
+        formatted[unh_col] = unh_values
+    include = dict(populated)
+    field_columns = _field_columns(mapping, formatted, include)
+
+    # Only keep samples that have at least a sample name or UNH ID
+    sample_names = _field_values(field_columns, 'sample_name', len(df))
+    has_id = pd.notna(unh_values) | np.array([bool(value) for value in sample_names], dtype=bool)
+    keep = keep & has_id
+
+    samples = _build_records(field_columns, analysis_flag_block(df, analysis_columns), keep)
+
+    print(f"Extracted {len(samples)} valid samples from Log Book")
+    _print_first_sample(samples)
+    return samples
+
+
+COLLECTION_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%m-%d-%Y', '%d-%m-%Y', '%m.%d.%Y', '%d.%m.%Y']
+COLLECTION_TIME_FORMATS = ['%H:%M:%S', '%I:%M:%S %p', '%I:%M %p', '%H:%M']
+
+
+def normalize_collection_date(collection_date):
+    """Collection date as an Access-compatible 'YYYY-MM-DD' string; unparseable text is returned unchanged."""
+    if not collection_date:
+        return collection_date
+    if isinstance(collection_date, (datetime.datetime, datetime.date)):
+        return collection_date.strftime('%Y-%m-%d')
+    if isinstance(collection_date, str):
+        for fmt in COLLECTION_DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(collection_date, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        print(f"Warning: Could not parse date format for {collection_date}")
+    return collection_date
+
+
+def sample_name_date_key(sample_name, collection_date):
+    """Key matching the (Sample_Name, Collection_Date) duplicate check; None when the date is empty."""
+    if not collection_date:
+        return None
+    if isinstance(collection_date, (datetime.datetime, datetime.date)):
+        collection_date = collection_date.strftime('%Y-%m-%d')
+    return (str(sample_name).strip(), str(collection_date).strip())
+
+
+def prefetch_existing_sample_keys(cursor, unh_ids=(), sample_names=(), chunk_size=200):
+    """
+    Look up which incoming samples already exist, with a few chunked IN (...) queries instead of
+    one COUNT(*) per row. Returns (existing UNH# set, existing (Sample_Name, Collection_Date) key set).
+    """
+    existing_unh = set()
+    for chunk in chunked(list(dict.fromkeys(normalize_unh(u) for u in unh_ids if normalize_unh(u))), chunk_size):
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT [UNH#] FROM [WRRC sample info] WHERE [UNH#] IN ({placeholders})", chunk)
+        existing_unh.update(normalize_unh(row[0]) for row in cursor.fetchall())
+
+    existing_name_dates = set()
+    names = list(dict.fromkeys(str(n) for n in sample_names if n))
+    for chunk in chunked(names, chunk_size):
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT [Sample_Name], [Collection_Date] FROM [WRRC sample info] "
+                       f"WHERE [Sample_Name] IN ({placeholders})", chunk)
+        for sample_name, collection_date in cursor.fetchall():
+            key = sample_name_date_key(sample_name, collection_date)
+            if key is not None:
+                existing_name_dates.add(key)
+
+    print(f"Duplicate pre-check: {len(existing_unh)} existing UNH#s, "
+          f"{len(existing_name_dates)} existing name/date keys")
+    return existing_unh, existing_name_dates
+
+
+def normalize_collection_time(collection_time):
+    """Collection time as 'HH:MM:SS' (None when empty); unparseable text is returned unchanged."""
+    if not collection_time:
+        return None
+    try:
+        # Handle different time formats
+        if isinstance(collection_time, datetime.time):
+            return collection_time.strftime('%H:%M:%S')
+        if isinstance(collection_time, str) and collection_time.strip():
+            # Try to standardize time format
+            for fmt in COLLECTION_TIME_FORMATS:
+                try:
+                    return datetime.datetime.strptime(collection_time, fmt).time().strftime('%H:%M:%S')
+                except ValueError:
+                    continue
+            return collection_time
+        return None  # Empty or non-string time value
+    except Exception as time_err:
+        print(f"Time parsing error: {time_err}")
+        return None
+
+
+# Issues listed in the Validation preview tab; the rest go to the console
+VALIDATION_PREVIEW_ROWS = 2000
+# Plausible ranges for field measurements (values outside are flagged, not changed)
+VALIDATION_RANGES = {
+    'ph': ('pH', 0, 14),
+    'cond': ('Cond', 0, 200000),
+    'spec_cond': ('Spec_Cond', 0, 200000),
+    'do_conc': ('DO_Conc', 0, 50),
+    'do_percent': ('DO%', 0, 500),
+    'temperature': ('Temperature', -5, 60),
+    'salinity': ('Salinity', 0, 70)
+}
+# Measurement text the importers store as NULL
+NUMERIC_NULL_TOKENS = ('', 's', 'na', 'n/a')
+VALIDATION_REPORT_COLUMNS = ['Sample', 'UNH#', 'Sample_Name', 'Field', 'Value', 'Severity', 'Message']
+
+
+def _parses_with_formats(text, formats):
+    """Boolean Series: True where the text matches one of the strptime formats."""
+    parsed = pd.Series(False, index=text.index)
+    for fmt in formats:
+        parsed |= pd.to_datetime(text, format=fmt, errors='coerce').notna()
+    return parsed
+
+
+def validate_samples(samples):
+    """
+    Vectorized pre-import checks over a whole extracted batch: required fields, numeric types
+    and plausible ranges for the field measurements, date and time parseability, and UNH#s
+    or (name, date) pairs repeated within the file. Nothing is changed or written.
+    Returns a DataFrame with one row per issue (VALIDATION_REPORT_COLUMNS); 'Sample' is the
+    1-based position in the batch and 'Severity' is 'error' (the value can't be stored as
+    is) or 'warning'.
+    """
+    start = time.perf_counter()
+    if not samples:
+        return pd.DataFrame(columns=VALIDATION_REPORT_COLUMNS)
+
+    df = pd.DataFrame.from_records(samples)
+    empty = pd.Series("", index=df.index)
+
+    def text(field):
+        if field not in df.columns:
+            return empty
+        values = df[field]
+        return values.where(values.notna(), "").astype(str).str.strip()
+
+    issues = []
+
+    def flag(mask, field, values, severity, message):
+        if mask.any():
+            issues.append(pd.DataFrame({'Sample': df.index[mask] + 1, 'Field': field, 'Value': values[mask],
+                                        'Severity': severity, 'Message': message}))
+
+    unh = text('unh_id').str.replace(r"\.0$", "", regex=True)
+    sample_name = text('sample_name')
+    collection_date = text('collection_date')
+
+    # Required fields
+    flag(unh == "", 'UNH#', unh, 'warning', "Missing UNH#: no analysis request will be recorded")
+    flag(sample_name == "", 'Sample_Name', sample_name, 'warning', "Missing sample name: stored as 'Unknown Sample'")
+    flag(collection_date == "", 'Collection_Date', collection_date, 'warning',
+         "Missing collection date: the name/date duplicate check can't run")
+
+    # Measurements: numeric and in range
+    for field, (label, low, high) in VALIDATION_RANGES.items():
+        values = text(field)
+        blank = values.str.lower().isin(NUMERIC_NULL_TOKENS)
+        numbers = pd.to_numeric(values.where(~blank), errors='coerce')
+        flag(~blank & numbers.isna(), label, values, 'error', f"{label} is not a number")
+        flag(numbers.notna() & ((numbers < low) | (numbers > high)), label, values, 'warning',
+             f"{label} outside the expected range {low} to {high}")
+
+    # Dates and times; due dates go through normalize_due_date, the parser the due-date index uses
+    flag((collection_date != "") & ~_parses_with_formats(collection_date, COLLECTION_DATE_FORMATS),
+         'Collection_Date', collection_date, 'error', "Collection_Date is not a recognised date")
+    due_date = text('due_date')
+    if 'due_date' in df.columns:
+        raw_due = df['due_date'].where(due_date != "")
+        parsed = {value: normalize_due_date(value) for value in raw_due.dropna().unique()}
+        due_parsed = raw_due.map(lambda value: parsed.get(value) if pd.notna(value) else None).notna()
+        flag((due_date != "") & ~due_parsed, 'Due_Date', due_date, 'error', "Due_Date is not a recognised date")
+    collection_time = text('collection_time')
+    flag((collection_time != "") & ~_parses_with_formats(collection_time, COLLECTION_TIME_FORMATS),
+         'Collection_Time', collection_time, 'warning', "Collection_Time is not a recognised time")
+
+    # Repeats within the file
+    flag((unh != "") & unh.duplicated(keep='first'), 'UNH#', unh, 'warning',
+         "UNH# repeated in this file: only its first row is imported")
+    name_date = sample_name.where(sample_name != "", "Unknown Sample") + "|" + collection_date
+    flag((collection_date != "") & name_date.duplicated(keep='first'), 'Sample_Name', sample_name, 'warning',
+         "Sample name and collection date repeated in this file: only the first is imported")
+
+    if issues:
+        report = pd.concat(issues, ignore_index=True)
+        report['UNH#'] = unh.to_numpy()[report['Sample'] - 1]
+        report['Sample_Name'] = sample_name.to_numpy()[report['Sample'] - 1]
+        report = report.sort_values(['Sample', 'Severity'], kind='stable')[VALIDATION_REPORT_COLUMNS]
+        report = report.reset_index(drop=True)
+    else:
+        report = pd.DataFrame(columns=VALIDATION_REPORT_COLUMNS)
+
+    errors, warnings = validation_counts(report)
+    print(f"Validated {len(df)} samples in {(time.perf_counter() - start) * 1000:.0f} ms: "
+          f"{errors} errors, {warnings} warnings")
+    return report
+
+
+def validation_counts(report):
+    """(errors, warnings) in a validate_samples report."""
+    errors = int((report['Severity'] == 'error').sum())
+    return errors, len(report) - errors
+
+
+# Preview rows inserted into a treeview up front, and again each time it is scrolled near the end
+PREVIEW_PAGE_ROWS = 500
+# Preview rows kept for paging; rows past this are only counted in the Summary tab (all are imported)
+PREVIEW_MAX_ROWS = 5000
+PREVIEW_SUMMARY_COLUMNS = ['Column', 'Filled', 'Fill Rate', 'Requested']
+PREVIEW_ANALYSIS_NAMES = set(SUBMISSION_ANALYSIS_NAMES) | set(LOGBOOK_ANALYSIS_NAMES)
+
+
+def preview_frame_from_samples(samples):
+    """Extracted samples as one DataFrame for the preview: sample fields, then 'X' per requested analysis."""
+    fields = pd.DataFrame.from_records([{k: v for k, v in sample.items() if k != 'analyses'} for sample in samples])
+    analyses = pd.DataFrame.from_records([sample.get('analyses', {}) for sample in samples])
+    if analyses.empty:
+        return fields
+    analyses = pd.DataFrame(np.where(analyses.eq(True), 'X', ''), columns=analyses.columns)
+    return pd.concat([fields.drop(columns=fields.columns.intersection(analyses.columns)), analyses], axis=1)
+
+
+def preview_row_values(frame):
+    """Treeview values for a slice of a preview frame: str() of every cell, '' for missing ones."""
+    return frame.astype(object).where(frame.notna(), "").astype(str).values.tolist()
+
+
+def add_preview_counts(counts, frame):
+    """
+    Add one block of preview rows to running column-wise counts (None to start): a dict of
+    'rows', non-empty cells per column ('filled'), 'X' cells per analysis column ('requested')
+    and rows requesting any analysis ('any_requested'). Blocks may bring new columns.
+    """
+    filled = frame.notna() & frame.astype(str).apply(lambda column: column.str.strip().ne(''))
+    analysis_columns = [col for col in frame.columns if col in PREVIEW_ANALYSIS_NAMES]
+    block = {'rows': len(frame), 'filled': filled.sum().astype(int),
+             'requested': frame[analysis_columns].eq('X').sum().astype(int),
+             'any_requested': int(filled[analysis_columns].any(axis=1).sum())}
+    if counts is None:
+        return block
+    merged = {'rows': counts['rows'] + block['rows'], 'any_requested': counts['any_requested'] + block['any_requested']}
+    for key in ('filled', 'requested'):
+        columns = list(counts[key].index) + [col for col in block[key].index if col not in counts[key].index]
+        merged[key] = counts[key].reindex(columns, fill_value=0) + block[key].reindex(columns, fill_value=0)
+    return merged
+
+
+def preview_summary(counts):
+    """
+    Per-column statistics from add_preview_counts: non-empty cells, fill rate and, for analysis
+    columns, how many samples request it. The first row holds the totals.
+    """
+    if counts is None:
+        counts = add_preview_counts(None, pd.DataFrame())
+    rows = counts['rows']
+    filled = counts['filled']
+    summary = pd.DataFrame({
+        'Column': [str(col) for col in filled.index],
+        'Filled': filled.values,
+        'Fill Rate': [f"{count / rows:.0%}" if rows else "" for count in filled.values],
+        'Requested': [int(counts['requested'][col]) if col in counts['requested'].index else ''
+                      for col in filled.index],
+    })
+    totals = pd.DataFrame([{'Column': f"(all {len(filled)} columns)", 'Filled': rows, 'Fill Rate': '',
+                            'Requested': counts['any_requested']}])
+    return pd.concat([totals, summary], ignore_index=True)
+
+
+class PreviewPager:
+    """
+    Shows a DataFrame in a ttk.Treeview a page at a time. Only the first PREVIEW_PAGE_ROWS rows
+    are inserted; the next page goes in when the view is scrolled to the bottom, so a 30k-row
+    file previews as fast as a small one. Rows can be appended while a file is still streaming.
+    At most `max_rows` rows are kept (`frame`); the rest only go into the column-wise `counts`
+    behind the Summary tab, so the pager's memory doesn't grow with the file.
+    """
+
+    def __init__(self, tree, scrollbar, page_rows=PREVIEW_PAGE_ROWS, max_rows=PREVIEW_MAX_ROWS):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page_rows = page_rows
+        self.max_rows = max_rows
+        self.frame = pd.DataFrame()
+        self.counts = None
+        self.total_rows = 0
+        self.shown = 0
+        self.target = page_rows
+        self._note_item = None
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def show(self, frame, column_width=100):
+        """Replace the tree's contents with `frame`."""
+        self.tree.delete(*self.tree.get_children())
+        self.counts = add_preview_counts(None, frame)
+        self.total_rows = len(frame)
+        self.frame = frame.iloc[:self.max_rows].reset_index(drop=True)
+        self.shown = 0
+        self.target = self.page_rows
+        self._note_item = None
+        self._set_columns(column_width)
+        self._fill()
+
+    def extend(self, frame, column_width=100):
+        """Append rows; new columns go on the end so rows already in the tree keep their positions."""
+        if frame.empty:
+            return
+        self.counts = add_preview_counts(self.counts, frame)
+        self.total_rows += len(frame)
+        room = self.max_rows - len(self.frame)
+        if room > 0:
+            columns = list(self.frame.columns)
+            self.frame = pd.concat([self.frame, frame.iloc[:room]], ignore_index=True, sort=False)
+            if list(self.frame.columns) != columns:
+                self._set_columns(column_width)
+        self._fill()
+
+    def _set_columns(self, column_width):
+        columns = [str(col) for col in self.frame.columns]
+        self.tree["columns"] = columns
+        self.tree["show"] = "headings"
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_width, minwidth=50)
+
+    def _fill(self):
+        end = min(self.target, len(self.frame))
+        if end > self.shown:
+            for values in preview_row_values(self.frame.iloc[self.shown:end]):
+                self.tree.insert("", "end", values=values)
+            self.shown = end
+        if self.shown == len(self.frame) and self.total_rows > self.shown:
+            note = [f"... {self.total_rows - self.shown} more rows not shown (they are still imported)"]
+            if self._note_item is None:
+                self._note_item = self.tree.insert("", "end", values=note)
+            else:
+                self.tree.item(self._note_item, values=note)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.98 and self.shown < len(self.frame):
+            self.target = self.shown + self.page_rows
+            # Inserting from inside the scroll callback re-enters it; defer to the event loop
+            self.tree.after_idle(self._fill)
+
+
+# Excel analysis names -> [WRRC sample analysis requested] columns
+ANALYSIS_COLUMN_MAPPING = {
+    'DOC': 'DOC',
+    'TDN': 'TDN',
+    'Anions': 'Anions',
+    'Cations': 'Cations',
+    'NO3+NO2': 'NO3AndNO2',
+    'NO2': 'NO2',
+    'NH4': 'NH4',
+    'PO4/SRP': 'PO4OrSRP',
+    'SiO2': 'SiO2',
+    'TN': 'TN',
+    'TP': 'TP',
+    'TDP': 'TDP',
+    'TSS': 'TSS',
+    'PC/PN': 'PCAndPN',
+    'Chl a': 'Chl_a',
+    'EEMs': 'EEMs',
+    'Gases - GC': 'Gases_GC',
+    'ICPOES': 'ICPOES',
+    'Additional': 'Additional'
+}
+
+
+def build_sample_info_row(project_info, sample):
+    """
+    Column -> value dict for a Sample Submission row in [WRRC sample info] (NULL columns left out).
+    Project comes from the user-entered name, Sub_Project from the form's project name and
+    Sub_ProjectA from its contact name.
+    """
+    # Extract sample information
+    unh_id = sample.get('unh_id', '')
+    sample_name = sample.get('sample_name', '')
+    sample_type = sample.get('sample_type', '')
+    field_notes = sample.get('field_notes', '')
+
+    # Handle date and time formatting to prevent data type mismatches
+    collection_date = sample.get('collection_date', '')
+    collection_time = sample.get('collection_time', '')
+
+    # Convert date to proper format (yyyy-mm-dd) if needed
+    collection_date = normalize_collection_date(collection_date)
+
+    # Format collection time if needed
+    collection_time = normalize_collection_time(collection_time)
+
+    # IMPORTANT: Use the user-entered project name for the Project field
+    # Get it directly from project_info['user_project_name']
+    project = project_info.get('user_project_name', '')
+
+    # Make sure we have a valid project name or use a default
+    if not project or project.strip() == '':
+        project = "Default Project"
+        print(f"Warning: Using default project name because user entry is empty")
+    else:
+        print(f"Using user-entered project name: '{project}'")
+
+    # Use the Excel project name for Sub_Project
+    sub_project = project_info.get('project_name', '')
+    print(f"Using Excel project name for Sub_Project: '{sub_project}'")
+
+    # If no sub_project found, use a default value to avoid empty string error
+    if not sub_project or sub_project.strip() == '':
+        sub_project = "Default Sub Project"
+
+    # Get contact name for Sub_ProjectA
+    proj_manager = project_info.get('contact_name', '')
+
+    # Make sure proj_manager is not empty
+    if not proj_manager or proj_manager.strip() == '':
+        proj_manager = "Unknown"  # Set a default value
+
+    # Get additional measurements if available
+    ph = sample.get('ph', '')
+    conductivity = sample.get('cond', '')
+    spec_cond = sample.get('spec_cond', '')
+    do_conc = sample.get('do_conc', '')
+    do_percent = sample.get('do_percent', '')
+    temperature = sample.get('temperature', '')
+    salinity = sample.get('salinity', '')
+
+    # Validate numeric fields to prevent type errors
+    if salinity is not None:
+        if salinity == '' or (isinstance(salinity, str) and salinity.lower() == 's'):
+            salinity = None  # Handle special case
+        elif isinstance(salinity, str):
+            try:
+                salinity = float(salinity)
+            except ValueError:
+                print(f"Warning: Invalid salinity value '{salinity}' - setting to NULL")
+                salinity = None
+
+    print(f"Sample info: UNH ID={unh_id}, Name={sample_name}, Date={collection_date}, Time={collection_time}")
+    print(f"Project info: Project={project}, Sub_Project={sub_project}, Manager={proj_manager}")
+
+    # Build a field mapping from our variables to the actual database column names
+    field_mapping = {
+        'UNH#': unh_id if unh_id else None,
+        'Sample_Name': sample_name if sample_name else "Unknown Sample",
+        'Collection_Date': collection_date if collection_date else None,
+        'Project': project if project else "Default Project",
+        'Sub_Project': sub_project if sub_project else "Default Sub Project",
+        'Sub_ProjectA': proj_manager if proj_manager else "Unknown",
+        'Sample_Type': sample_type if sample_type else None,
+        'Field_Notes': field_notes if field_notes else None,
+        'pH': ph if ph else None,
+        'Cond': conductivity if conductivity else None,
+        'Spec_Cond': spec_cond if spec_cond else None,
+        'DO_Conc': do_conc if do_conc else None,
+        'DO%': do_percent if do_percent else None,
+        'Temperature': temperature if temperature else None,
+        'Salinity': salinity if salinity is not None else None
+    }
+
+    # Only add Collection_Time if it's not empty
+    if collection_time:
+        field_mapping['Collection_Time'] = collection_time
+
+    # Filter out None values to avoid issues
+    fields = {k: v for k, v in field_mapping.items() if v is not None}
+    return fields
+
+
+def build_logbook_sample_row(project_info, sample):
+    """Column -> value dict for a Log Book row in [WRRC sample info] (NULL columns left out)."""
+    # Extract sample information
+    unh_id = sample.get('unh_id', '')
+    sample_name = sample.get('sample_name', '')
+    sample_type = sample.get('sample_type', '')
+    field_notes = sample.get('field_notes', '')
+
+    # Handle date and time formatting
+    collection_date = sample.get('collection_date', '')
+    collection_time = sample.get('collection_time', '')
+
+    # Convert date to proper format (yyyy-mm-dd) if needed
+    collection_date = normalize_collection_date(collection_date)
+
+    # Format collection time if needed
+    collection_time = normalize_collection_time(collection_time)
+
+    # Use project info from the sample itself
+    project = project_info.get('user_project_name', '')
+    if not project:
+        project = "Default Project"
+        print(f"Warning: Using default project name because no project specified in Log Book")
+
+    # Get project-related fields from sample
+    sub_project = project_info.get('sub_project', '')
+    sub_projecta = project_info.get('sub_projecta', '')
+    sub_projectb = sample.get('sub_projectb', '')
+
+    # Get additional measurements if available
+    ph = sample.get('ph', '')
+    conductivity = sample.get('cond', '')
+    spec_cond = sample.get('spec_cond', '')
+    do_conc = sample.get('do_conc', '')
+    do_percent = sample.get('do_percent', '')
+    temperature = sample.get('temperature', '')
+    salinity = sample.get('salinity', '')
+
+    # Validate numeric fields
+    for field_name in ['ph', 'cond', 'spec_cond', 'do_conc', 'do_percent', 'temperature', 'salinity']:
+        value = sample.get(field_name)
+        if value is not None:
+            if value == '' or (isinstance(value, str) and value.lower() in ['s', 'na', 'n/a']):
+                sample[field_name] = None
+            elif isinstance(value, str):
+                try:
+                    sample[field_name] = float(value)
+                except ValueError:
+                    print(f"Warning: Invalid {field_name} value '{value}' - setting to NULL")
+                    sample[field_name] = None
+
+    print(f"Log Book sample info: UNH ID={unh_id}, Name={sample_name}, Date={collection_date}")
+    print(f"Using project from Log Book: '{project}'")
+
+    # Build a field mapping from variables to database column names
+    field_mapping = {
+        'UNH#': unh_id if unh_id else None,
+        'Sample_Name': sample_name if sample_name else "Unknown Sample",
+        'Collection_Date': collection_date if collection_date else None,
+        'Project': project if project else "Default Project",
+        'Sub_Project': sub_project if sub_project else None,
+        'Sub_ProjectA': sub_projecta if sub_projecta else None,
+        'Sub_ProjectB': sub_projectb if sub_projectb else None,
+        'Sample_Type': sample_type if sample_type else None,
+        'Field_Notes': field_notes if field_notes else None,
+        'pH': sample.get('ph') if sample.get('ph') is not None else None,
+        'Cond': sample.get('cond') if sample.get('cond') is not None else None,
+        'Spec_Cond': sample.get('spec_cond') if sample.get('spec_cond') is not None else None,
+        'DO_Conc': sample.get('do_conc') if sample.get('do_conc') is not None else None,
+        'DO%': sample.get('do_percent') if sample.get('do_percent') is not None else None,
+        'Temperature': sample.get('temperature') if sample.get('temperature') is not None else None,
+        'Salinity': sample.get('salinity') if sample.get('salinity') is not None else None
+    }
+
+    # Only add Collection_Time if it's not empty
+    if collection_time:
+        field_mapping['Collection_Time'] = collection_time
+
+    # Filter out None values
+    fields = {k: v for k, v in field_mapping.items() if v is not None}
+    return fields
+
+
+def _add_requested_analyses(fields, sample):
+    """Mark each requested analysis column as 'required'."""
+    analyses = sample.get('analyses', {})
+
+    # Log the analyses that are marked as required
+    required_analyses = [analysis for analysis, is_required in analyses.items() if is_required]
+    print(f"Required analyses for UNH# {fields['UNH#']}: {required_analyses}")
+
+    for analysis, is_required in analyses.items():
+        if is_required:
+            db_column = ANALYSIS_COLUMN_MAPPING.get(analysis)
+            if db_column:
+                fields[db_column] = "required"
+
+
+def build_analysis_requested_row(sample):
+    """
+    Column -> value dict for a Sample Submission row in [WRRC sample analysis requested],
+    or None when there is no UNH# or nothing besides it to insert.
+    """
+    unh_id = sample.get('unh_id', '')
+    if not unh_id:
+        print("Cannot insert analysis request: Missing UNH ID")
+        return None
+
+    fields = {'UNH#': str(unh_id)}
+    # Add additional fields if they exist
+    for column, key in (('Containers', 'containers'), ('Due_Date', 'due_date'), ('Filtered', 'filtered'),
+                        ('Preservation', 'preservation'), ('Filter_Volume', 'filter_volume'),
+                        ('Field_Notes', 'field_notes'), ('Sample_Type', 'sample_type'),
+                        ('Collection_Date', 'collection_date'), ('Collection_Time', 'collection_time')):
+        value = sample.get(key, '')
+        if value:
+            fields[column] = value if column == 'Due_Date' else str(value)
+    _add_requested_analyses(fields, sample)
+
+    if len(fields) <= 1:
+        print(f"No analysis fields to insert for UNH# {unh_id}")
+        return None
+    return fields
+
+
+def build_logbook_analysis_row(sample):
+    """
+    Column -> value dict for a Log Book row in [WRRC sample analysis requested],
+    or None when there is no UNH# or nothing besides it to insert.
+    """
+    unh_id = sample.get('unh_id', '')
+    if not unh_id:
+        print("Cannot insert analysis request: Missing UNH ID")
+        return None
+
+    fields = {'UNH#': str(unh_id)}
+    # Add additional fields if they exist
+    for column, key in (('Containers', 'containers'), ('Filtered', 'filtered'), ('Preservation', 'preservation'),
+                        ('Filter_Volume', 'filter_volume'), ('Due_Date', 'due_date')):
+        value = sample.get(key, '')
+        if value:
+            fields[column] = value if column == 'Due_Date' else str(value)
+    _add_requested_analyses(fields, sample)
+
+    if len(fields) <= 1:
+        print(f"No analysis fields to insert for UNH# {unh_id}")
+        return None
+    return fields
+
+
+def insert_row(cursor, table, fields):
+    """INSERT one column -> value dict into `table`."""
+    columns = ", ".join(f"[{column}]" for column in fields)
+    placeholders = ", ".join("?" * len(fields))
+    query = f"INSERT INTO [{table}] ({columns}) VALUES ({placeholders})"
+    print(f"Query: {query}")
+    print(f"Parameters: {list(fields.values())}")
+    cursor.execute(query, list(fields.values()))
+
+
+# SQLSTATEs a driver answers with when it can't bind parameter arrays (fast_executemany):
+# optional feature not implemented, driver does not support this function, invalid attribute
+FAST_EXECUTEMANY_UNSUPPORTED_STATES = ("HYC00", "IM001", "HY092")
+# ODBC driver name -> whether it takes parameter arrays, filled in by the first bulk insert through it
+_FAST_EXECUTEMANY_SUPPORT = {}
+
+
+def odbc_driver_name(conn):
+    """The ODBC driver behind a pyodbc connection (e.g. ACEODBC.DLL), or '' if it can't be asked."""
+    try:
+        return conn.getinfo(pyodbc.SQL_DRIVER_NAME) or ""
+    except Exception:
+        return ""
+
+
+def is_fast_executemany_unsupported(error):
+    """True if a pyodbc.Error is the driver refusing parameter arrays, not a failure of the insert itself."""
+    return bool(error.args) and error.args[0] in FAST_EXECUTEMANY_UNSUPPORTED_STATES
+
+
+def bulk_insert_rows(conn, table, rows, chunk_size=500, commit_each_chunk=False, progress=None,
+                     cancel_event=None):
+    """
+    Bulk-insert column -> value dicts into `table`. Rows are grouped by column signature (the
+    columns they actually have values for), and each group is written with executemany in
+    chunks of `chunk_size`, using pyodbc's fast_executemany where the driver supports it. Only
+    the driver's "not supported" SQLSTATEs switch a driver to plain executemany (remembered per
+    driver); any other error is raised.
+    With commit_each_chunk every chunk is its own transaction; otherwise the caller commits.
+
+    progress(done, total) is called after each chunk; cancel_event (a threading.Event) is checked
+    before each one and stops the insert, leaving the rollback to the caller.
+    Returns a dict with 'rows', 'statements', 'seconds', 'rows_per_second' and 'cancelled'.
+    """
+    groups = OrderedDict()
+    for fields in rows:
+        groups.setdefault(tuple(fields), []).append([fields[column] for column in fields])
+
+    start = time.perf_counter()
+    statements = 0
+    done = 0
+    cancelled = False
+    driver = odbc_driver_name(conn)
+    cursor = conn.cursor()
+    try:
+        for columns, values in groups.items():
+            column_list = ", ".join(f"[{column}]" for column in columns)
+            placeholders = ", ".join("?" * len(columns))
+            query = f"INSERT INTO [{table}] ({column_list}) VALUES ({placeholders})"
+            for chunk in chunked(values, chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if _FAST_EXECUTEMANY_SUPPORT.get(driver) is not False and hasattr(cursor, "fast_executemany"):
+                    cursor.fast_executemany = True
+                    try:
+                        cursor.executemany(query, chunk)
+                        _FAST_EXECUTEMANY_SUPPORT[driver] = True
+                    except pyodbc.Error as e:
+                        if _FAST_EXECUTEMANY_SUPPORT.get(driver) or not is_fast_executemany_unsupported(e):
+                            raise
+                        # The driver rejected parameter arrays before running anything; use plain executemany
+                        print(f"fast_executemany not supported by {driver or 'this driver'} ({e}); falling back")
+                        _FAST_EXECUTEMANY_SUPPORT[driver] = False
+                        cursor.fast_executemany = False
+                        cursor.executemany(query, chunk)
+                else:
+                    cursor.executemany(query, chunk)
+                statements += 1
+                if commit_each_chunk:
+                    conn.commit()
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, len(rows))
+            if cancelled:
+                break
+    finally:
+        cursor.close()
+
+    seconds = time.perf_counter() - start
+    rows_per_second = done / seconds if seconds > 0 else float(done)
+    print(f"Bulk insert into [{table}]{' (cancelled)' if cancelled else ''}: {done} of {len(rows)} rows in "
+          f"{len(groups)} column signatures, {statements} executemany calls, {seconds * 1000:.0f} ms "
+          f"({rows_per_second:.0f} rows/s)")
+    return {"rows": done, "statements": statements, "seconds": seconds, "rows_per_second": rows_per_second,
+            "cancelled": cancelled}
+
+
+def plan_import_rows(samples, existing_unh, existing_name_dates=None, project_info=None, keys=None):
+    """
+    Decide, in memory, what an import will write: existing UNH#s are skipped, and for
+    submissions (project_info given) so are existing (Sample_Name, Collection_Date) pairs.
+    Log Book imports (project_info None) take their project from each sample.
+    Keys of planned rows are added to the sets so duplicates within the file are caught too.
+    Returns a dict with 'sample_rows', 'analysis_rows', 'entries' ((row key, sample row, analysis
+    row or None) per planned sample, for chunked writes), 'imported', 'skipped' and 'duplicates'.
+    `keys` are the samples' row keys (import_row_keys of the whole file); computed here if not given.
+    """
+    plan = {"sample_rows": [], "analysis_rows": [], "entries": [], "imported": 0, "skipped": 0, "duplicates": 0}
+    if keys is None:
+        keys = import_row_keys(samples)
+    for sample, row_key in zip(samples, keys):
+        unh_id = sample.get('unh_id', '')
+        if unh_id and normalize_unh(unh_id) in existing_unh:
+            print(f"Skipping existing UNH# {unh_id}")
+            plan["skipped"] += 1
+            continue
+
+        if project_info is not None:
+            fields = build_sample_info_row(project_info, sample)
+            key = sample_name_date_key(fields['Sample_Name'], fields.get('Collection_Date'))
+            if existing_name_dates is not None and key in existing_name_dates:
+                print(f"Warning: Sample {fields['Sample_Name']} with date {fields.get('Collection_Date')} "
+                      f"already exists in database. Skipping.")
+                plan["duplicates"] += 1
+                continue
+            if existing_name_dates is not None and key is not None:
+                existing_name_dates.add(key)
+            analysis = build_analysis_requested_row(sample)
+        else:
+            # Get project info directly from the sample
+            sample_project_info = {
+                'user_project_name': sample.get('project', 'Default Project'),
+                'project_name': sample.get('project', ''),
+                'sub_project': sample.get('sub_project', ''),
+                'sub_projecta': sample.get('sub_projecta', '')
+            }
+            fields = build_logbook_sample_row(sample_project_info, sample)
+            analysis = build_logbook_analysis_row(sample)
+
+        if unh_id:
+            existing_unh.add(normalize_unh(unh_id))
+        plan["sample_rows"].append(fields)
+        if analysis:
+            plan["analysis_rows"].append(analysis)
+        plan["entries"].append((row_key, fields, analysis))
+        plan["imported"] += 1
+    return plan
+
+
+def import_row_key(sample):
+    """Journal key for an imported sample: its UNH#, or 'name|date' for samples without one."""
+    unh_id = normalize_unh(sample.get('unh_id', ''))
+    if unh_id:
+        return unh_id
+    return f"{str(sample.get('sample_name', '')).strip()}|{str(sample.get('collection_date', '')).strip()}"
+
+
+def import_row_keys(samples):
+    """
+    Journal keys for all of a file's samples, in file order. Rows without a UNH# that repeat a
+    'name|date' key (including blank name and date) get '#2', '#3', ... by their position, so
+    distinct rows never mark each other as already imported when a run is resumed.
+    """
+    keys = []
+    occurrences = {}
+    for sample in samples:
+        key = import_row_key(sample)
+        if not normalize_unh(sample.get('unh_id', '')):
+            occurrences[key] = occurrences.get(key, 0) + 1
+            if occurrences[key] > 1:
+                key = f"{key}#{occurrences[key]}"
+        keys.append(key)
+    return keys
+
+
+# Samples per committed chunk in checkpointed imports, and the per-user local folder their journals live in
+IMPORT_COMMIT_EVERY = 500
+IMPORT_CHECKPOINT_DIR = "import_checkpoints"
+
+
+class ImportCheckpoint:
+    """
+    Local journal of what an import has committed, one file per (source file hash, project).
+    After each committed chunk its row keys are appended (and fsynced) as a JSON line, and a
+    final line marks the import complete. A retry skips the keys already recorded, so it resumes
+    after the last checkpoint; re-running a completed import is a no-op. If the app dies between
+    a commit and its journal line, those rows are caught by the usual duplicate check instead.
+    """
+
+    def __init__(self, journal_dir, file_path, project):
+        self.file_path = file_path
+        self.project = project or ""
+        self.file_hash = file_sha256(file_path)
+        project_hash = hashlib.sha256(self.project.encode("utf-8")).hexdigest()[:12]
+        self.journal_path = os.path.join(journal_dir, f"{self.file_hash[:24]}_{project_hash}.journal")
+        self.done_keys = set()
+        self.completed = None
+        os.makedirs(journal_dir, exist_ok=True)
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    print(f"Skipping unreadable checkpoint line: {line[:80]!r}")
+                    continue
+                self.done_keys.update(record.get("keys", []))
+                if "completed" in record:
+                    self.completed = record["completed"]
+        print(f"Checkpoint {self.journal_path}: {len(self.done_keys)} rows already imported"
+              f"{', import complete' if self.completed is not None else ''}")
+
+    def _append(self, record):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, keys):
+        """Record the keys of a chunk that has just been committed."""
+        keys = list(keys)
+        self._append({"keys": keys, "at": datetime.datetime.now().isoformat(timespec="seconds")})
+        self.done_keys.update(keys)
+
+    def complete(self, summary):
+        """Mark the import finished; `summary` is returned as-is on later no-op runs."""
+        self._append({"completed": summary, "file": self.file_path, "project": self.project})
+        self.completed = summary
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signature(file_path):
+    """(absolute path, mtime, size) of a file; changes whenever the file is saved again."""
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+class ImportSession:
+    """
+    Samples extracted by a preview, kept so the import that follows can skip reading the file
+    again. The file's signature is taken before it is read; the session only applies while the
+    file's mtime and size (and the read options, e.g. the Log Book column map) are unchanged.
+    """
+
+    def __init__(self, kind, signature, samples, project_info=None, rows_read=0, report=None, options=None):
+        self.kind = kind
+        self.signature = signature
+        self.samples = samples
+        self.project_info = project_info
+        self.rows_read = rows_read
+        self.report = report
+        self.options = options
+
+    def matches(self, kind, file_path, options=None):
+        """True if this session was built from the same, unmodified file with the same options."""
+        if kind != self.kind or options != self.options:
+            return False
+        try:
+            return file_signature(file_path) == self.signature
+        except OSError:
+            return False
+
+    def take_samples(self):
+        """Copies of the sample records, so an import can't alter what a retry would reuse."""
+        return [dict(sample) for sample in self.samples]
+
+
+def run_sample_import(conn, samples, project_info=None, bulk=True, progress=None, cancel_event=None,
+                      commit_every=None, checkpoint=None):
+    """
+    Dedupe and insert extracted samples on `conn`. Sample Submission imports pass the form's
+    project_info; Log Book imports (project_info None) take it from each sample.
+
+    Duplicates are resolved against keys pre-fetched for the whole batch, then rows are written
+    with bulk_insert_rows (bulk=True) or one INSERT per row. By default everything is one
+    transaction. With commit_every=N (or an ImportCheckpoint) the import commits every N samples
+    and records each committed chunk in the checkpoint, so a failed or cancelled run keeps its
+    committed chunks and a retry resumes after them; a checkpoint that is already complete
+    makes the call a no-op.
+
+    progress(stage, done, total) reports the "dedupe" and "insert" stages; cancel_event stops the
+    import and rolls back whatever is not committed yet.
+    Returns a dict with 'imported', 'skipped', 'duplicates', 'resumed', 'imported_ids',
+    'cancelled', 'already_completed', 'seconds' and 'rows_per_second'.
+    """
+    start = time.perf_counter()
+    result = {"imported": 0, "skipped": 0, "duplicates": 0, "resumed": 0, "imported_ids": [], "cancelled": False,
+              "already_completed": False, "seconds": 0.0, "rows_per_second": 0.0}
+
+    if checkpoint is not None and checkpoint.completed is not None:
+        print(f"Import of {checkpoint.file_path} for project '{checkpoint.project}' already completed "
+              f"({checkpoint.completed}); nothing to do")
+        result["already_completed"] = True
+        result["resumed"] = len(checkpoint.done_keys)
+        return result
+    if checkpoint is not None:
+        commit_every = commit_every or IMPORT_COMMIT_EVERY
+        remaining = [(key, sample) for key, sample in zip(import_row_keys(samples), samples)
+                     if key not in checkpoint.done_keys]
+        result["resumed"] = len(samples) - len(remaining)
+        if result["resumed"]:
+            print(f"Resuming import: {result['resumed']} samples were committed by an earlier run")
+        row_keys = [key for key, _ in remaining]
+        samples = [sample for _, sample in remaining]
+    else:
+        row_keys = import_row_keys(samples)
+
+    def report(stage, done, total):
+        if progress is not None:
+            progress(stage, done, total)
+
+    def is_cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    cursor = conn.cursor()
+
+    def write(sample_rows, analysis_rows, offset, total):
+        """Insert one batch of rows; returns True if it was cancelled part-way."""
+        if bulk:
+            stats = bulk_insert_rows(conn, "WRRC sample info", sample_rows,
+                                     progress=lambda done, _: report("insert", offset + done, total),
+                                     cancel_event=cancel_event)
+            if not stats["cancelled"]:
+                stats = bulk_insert_rows(conn, "WRRC sample analysis requested", analysis_rows,
+                                         progress=lambda done, _: report("insert", offset + len(sample_rows) + done,
+                                                                         total),
+                                         cancel_event=cancel_event)
+            return stats["cancelled"]
+        done = offset
+        for table, rows in (("WRRC sample info", sample_rows), ("WRRC sample analysis requested", analysis_rows)):
+            for fields in rows:
+                if is_cancelled():
+                    return True
+                insert_row(cursor, table, fields)
+                done += 1
+                if done % 50 == 0 or done == total:
+                    report("insert", done, total)
+        return False
+
+    conn.autocommit = False
+    try:
+        report("dedupe", 0, len(samples))
+        unh_ids = [sample.get('unh_id', '') for sample in samples]
+        sample_names = []
+        if project_info is not None:
+            sample_names = [sample.get('sample_name', '') or "Unknown Sample" for sample in samples]
+        existing_unh, existing_name_dates = prefetch_existing_sample_keys(cursor, unh_ids, sample_names)
+        plan = plan_import_rows(samples, existing_unh, existing_name_dates if project_info is not None else None,
+                                project_info, keys=row_keys)
+        result["skipped"] = plan["skipped"]
+        result["duplicates"] = plan["duplicates"]
+        report("dedupe", len(samples), len(samples))
+
+        if commit_every:
+            entries = plan["entries"]
+            total = len(plan["sample_rows"]) + len(plan["analysis_rows"])
+            written = 0
+            report("insert", 0, total)
+            for chunk in chunked(entries, commit_every):
+                if is_cancelled():
+                    result["cancelled"] = True
+                    break
+                sample_rows = [fields for _, fields, _ in chunk]
+                analysis_rows = [analysis for _, _, analysis in chunk if analysis]
+                if write(sample_rows, analysis_rows, written, total) or is_cancelled():
+                    result["cancelled"] = True
+                    break
+                conn.commit()
+                if checkpoint is not None:
+                    checkpoint.record(key for key, _, _ in chunk)
+                written += len(sample_rows) + len(analysis_rows)
+                result["imported"] += len(chunk)
+                result["imported_ids"].extend(fields['UNH#'] for fields in sample_rows if fields.get('UNH#'))
+            if result["cancelled"]:
+                conn.rollback()
+            elif checkpoint is not None:
+                checkpoint.complete({"imported": result["imported"], "skipped": result["skipped"],
+                                     "duplicates": result["duplicates"], "resumed": result["resumed"]})
+        else:
+            sample_rows = plan["sample_rows"]
+            analysis_rows = plan["analysis_rows"]
+            total = len(sample_rows) + len(analysis_rows)
+            report("insert", 0, total)
+            if write(sample_rows, analysis_rows, 0, total) or is_cancelled():
+                conn.rollback()
+                result["cancelled"] = True
+                result["skipped"] = result["duplicates"] = 0
+            else:
+                conn.commit()
+                result["imported"] = plan["imported"]
+                result["imported_ids"] = [fields['UNH#'] for fields in sample_rows if fields.get('UNH#')]
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    result["seconds"] = time.perf_counter() - start
+    if result["seconds"] > 0:
+        result["rows_per_second"] = result["imported"] / result["seconds"]
+    if result["cancelled"]:
+        status = "cancelled; committed chunks kept" if commit_every else "cancelled and rolled back"
+    else:
+        status = "completed"
+    print(f"Import {status}: {result['imported']} imported, {result['skipped']} skipped, "
+          f"{result['duplicates']} duplicates, {result['resumed']} resumed in {result['seconds']:.2f} s "
+          f"({result['rows_per_second']:.0f} samples/s, {'bulk' if bulk else 'row by row'})")
+    return result
+
+
+def parse_submission_file(file_path):
+    """
+    Parse and validate one Sample Submission workbook. Kept at module level so it can run in a
+    worker process. Returns a dict with 'file', 'project_info' (from the workbook), 'samples',
+    'rows', 'error' (None on success), 'validation_errors', 'validation_warnings' and
+    'parse_seconds'.
+    """
+    start = time.perf_counter()
+    report = {"file": file_path, "project_info": {}, "samples": [], "rows": 0, "error": None,
+              "validation_errors": 0, "validation_warnings": 0, "parse_seconds": 0.0}
+    try:
+        project_df, sample_df = parse_submission_workbook(file_path)
+        report["project_info"] = extract_project_info(project_df)
+        report["samples"] = extract_sample_records(sample_df)
+        report["rows"] = len(sample_df)
+        report["validation_errors"], report["validation_warnings"] = validation_counts(
+            validate_samples(report["samples"]))
+    except Exception as e:
+        print(f"Error parsing {file_path}: {e}")
+        report["error"] = str(e)
+    report["parse_seconds"] = time.perf_counter() - start
+    return report
+
+
+def import_submission_files(file_paths, connect, project_name, bulk=True, max_workers=None, progress=None,
+                            cancel_event=None, checkpoint_dir=None):
+    """
+    Import many Sample Submission workbooks: they are parsed and validated in parallel in a
+    process pool (one worker per core by default), and a single writer on one connection from
+    connect() imports each file with run_sample_import, in its own transaction, as soon as it
+    is parsed. A file that fails to parse or insert doesn't stop the others.
+
+    progress(written, total) is called after each file; cancel_event stops the run, rolling back
+    the file being written and skipping the rest. With checkpoint_dir each file is imported
+    with its own ImportCheckpoint: files already imported into the project aren't parsed again,
+    and interrupted ones resume.
+    Returns one report per processed file: the parse_submission_file fields (without 'samples')
+    plus 'imported', 'skipped', 'duplicates', 'resumed', 'already_completed', 'imported_ids',
+    'cancelled' and 'write_seconds'.
+    """
+    file_paths = list(dict.fromkeys(file_paths))
+    total = len(file_paths)
+    workers = max_workers or min(total, os.cpu_count() or 1)
+    reports = []
+    conn = None
+    start = time.perf_counter()
+
+    def is_cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    checkpoints = {}
+    if checkpoint_dir is not None:
+        for path in list(file_paths):
+            try:
+                checkpoint = ImportCheckpoint(checkpoint_dir, path, project_name)
+            except OSError as e:
+                print(f"Could not open checkpoint for {path}: {e}")
+                continue
+            if checkpoint.completed is None:
+                checkpoints[path] = checkpoint
+                continue
+            # Already imported into this project: report it without parsing the file again
+            file_paths.remove(path)
+            reports.append({"file": path, "project_info": {}, "rows": 0, "error": None,
+                            "validation_errors": 0, "validation_warnings": 0, "parse_seconds": 0.0,
+                            "imported": 0, "skipped": 0, "duplicates": 0, "resumed": len(checkpoint.done_keys),
+                            "already_completed": True, "imported_ids": [], "cancelled": False,
+                            "write_seconds": 0.0})
+        if reports and progress is not None:
+            progress(len(reports), total)
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=max(workers, 1))
+    try:
+        pending = {executor.submit(parse_submission_file, path) for path in file_paths}
+        while pending and not is_cancelled():
+            # Wake up regularly so a cancel is noticed while the pool is still parsing
+            done, pending = concurrent.futures.wait(pending, timeout=0.2,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                report = future.result()
+                samples = report.pop("samples")
+                report.update(imported=0, skipped=0, duplicates=0, resumed=0, already_completed=False,
+                              imported_ids=[], cancelled=False, write_seconds=0.0)
+                if is_cancelled():
+                    report["cancelled"] = True
+                elif report["error"] is None and not samples:
+                    report["error"] = "No valid samples found"
+                elif report["error"] is None:
+                    if conn is None:
+                        conn = connect()
+                    project_info = {**report["project_info"], 'user_project_name': project_name}
+                    try:
+                        result = run_sample_import(conn, samples, project_info, bulk=bulk, cancel_event=cancel_event,
+                                                   checkpoint=checkpoints.get(report["file"]))
+                        for key in ("imported", "skipped", "duplicates", "resumed", "imported_ids", "cancelled"):
+                            report[key] = result[key]
+                        report["write_seconds"] = result["seconds"]
+                    except Exception as e:
+                        print(f"Error importing {report['file']}: {e}")
+                        print(traceback.format_exc())
+                        report["error"] = f"Insert failed: {e}"
+                reports.append(report)
+                if progress is not None:
+                    progress(len(reports), total)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    seconds = time.perf_counter() - start
+    print(f"Multi-file import: {len(reports)} of {total} files processed with {workers} parse workers, "
+          f"{sum(r['imported'] for r in reports)} samples imported in {seconds:.2f} s")
+    return reports
+
+
+# Headless hot-folder import: settings file next to the app, and the files it picks up
+HOT_FOLDER_CONFIG_FILE = "hot_folder.json"
+HOT_FOLDER_EXTENSIONS = (".xls", ".xlsx") + CSV_EXTENSIONS + PARQUET_EXTENSIONS
+# Rescan the drop folder at least this often even if its mtime hasn't moved (coarse network-share clocks)
+HOT_FOLDER_RESCAN_SECONDS = 60
+# Back-off cap for files whose insert hit a database or network error (they stay in the drop folder)
+HOT_FOLDER_MAX_RETRY_SECONDS = 900
+HOT_FOLDER_LOG_COLUMNS = ['time', 'file', 'kind', 'status', 'rows', 'imported', 'skipped', 'duplicates',
+                          'validation_errors', 'validation_warnings', 'seconds', 'moved_to', 'message']
+HOT_FOLDER_DEFAULTS = {
+    "folder": None,
+    "project": None,
+    "archive_folder": None,
+    "error_folder": None,
+    "log_file": None,
+    "interval_seconds": 10,
+    "settle_seconds": 5,
+    "reject_on_validation_errors": True,
+}
+
+
+def detect_import_kind(file_path):
+    """'submission' for workbooks with the submission form's sheets, 'logbook' for anything else."""
+    if not file_path.lower().endswith((".xls", ".xlsx")):
+        return "logbook"
+    with pd.ExcelFile(file_path) as workbook:
+        sheet_names = workbook.sheet_names
+    return "submission" if all(sheet in sheet_names for sheet in SUBMISSION_SHEETS) else "logbook"
+
+
+def read_import_file(file_path, kind, column_map=None):
+    """Extract the samples of a submission or Log Book file: (samples, project_info, rows_read)."""
+    if kind == "submission":
+        project_df, sample_df = parse_submission_workbook(file_path)
+        return extract_sample_records(sample_df), extract_project_info(project_df), len(sample_df)
+    samples = []
+    rows_read = 0
+    for chunk in iter_logbook_chunks(file_path, column_map=column_map):
+        samples.extend(extract_logbook_records(chunk))
+        rows_read += len(chunk)
+    return samples, None, rows_read
+
+
+def unique_destination(folder, file_name):
+    """Path in `folder` for `file_name`, with a timestamp added if that name is already taken."""
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, file_name)
+    if os.path.exists(target):
+        stem, ext = os.path.splitext(file_name)
+        target = os.path.join(folder, f"{stem}_{datetime.datetime.now():%Y%m%d-%H%M%S}{ext}")
+    return target
+
+
+class HotFolderWatcher:
+    """
+    Headless importer for a drop folder. Each poll is one os.scandir of the folder, skipped
+    entirely while the folder's mtime is unchanged and nothing is waiting. A new file is only
+    picked up once its size and mtime have been stable for `settle_seconds` and it can be
+    opened, so half-copied files are left alone. Files go through the same extraction,
+    validation, dedupe and insert as the Import tab (run_sample_import, with a checkpoint so a
+    killed watcher resumes), then move to the archive or error folder, and every file gets a
+    row in the CSV result log. The database is only connected while files are being imported.
+    A database or network error during the insert leaves the file in the drop folder and retries
+    it with exponential back-off; the checkpoint makes the retry resume rather than re-insert.
+    """
+
+    def __init__(self, folder, connect, project_name=None, archive_dir=None, error_dir=None, log_path=None,
+                 interval=10, settle_seconds=5, reject_on_validation_errors=True, column_map=None,
+                 checkpoint_dir=None):
+        self.folder = os.path.abspath(folder)
+        self.connect = connect
+        self.project_name = project_name
+        self.archive_dir = archive_dir or os.path.join(self.folder, "archive")
+        self.error_dir = error_dir or os.path.join(self.folder, "error")
+        self.log_path = log_path or os.path.join(self.folder, "hot_folder_log.csv")
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.reject_on_validation_errors = reject_on_validation_errors
+        self.column_map = column_map or {}
+        self.checkpoint_dir = checkpoint_dir
+        # path -> ((size, mtime_ns), time that signature was first seen)
+        self.pending = {}
+        # path -> (failed attempts, monotonic time of the next attempt)
+        self.retry_at = {}
+        self._folder_mtime = None
+        self._last_scan = None
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _candidates(self):
+        """Importable files directly in the drop folder (Excel lock files and the log are skipped)."""
+        log_path = os.path.abspath(self.log_path)
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                name = entry.name
+                if (not entry.is_file() or name.startswith(("~$", ".")) or not name.lower().endswith(HOT_FOLDER_EXTENSIONS)
+                        or os.path.abspath(entry.path) == log_path):
+                    continue
+                stat = entry.stat()
+                yield entry.path, (stat.st_size, stat.st_mtime_ns)
+
+    def ready_files(self, now=None):
+        """Files whose size and mtime haven't changed for settle_seconds and that can be opened."""
+        now = time.monotonic() if now is None else now
+        folder_mtime = os.stat(self.folder).st_mtime_ns
+        if (folder_mtime == self._folder_mtime and not self.pending
+                and now - self._last_scan < HOT_FOLDER_RESCAN_SECONDS):
+            return []
+        self._folder_mtime = folder_mtime
+        self._last_scan = now
+
+        seen = {}
+        for path, signature in self._candidates():
+            previous = self.pending.get(path)
+            seen[path] = previous if previous is not None and previous[0] == signature else (signature, now)
+        self.pending = seen
+        self.retry_at = {path: retry for path, retry in self.retry_at.items() if path in seen}
+
+        ready = []
+        for path, (signature, since) in sorted(self.pending.items()):
+            if now - since < self.settle_seconds or now < self.retry_at.get(path, (0, now))[1]:
+                continue
+            try:
+                # Still being written by another program (Windows keeps it locked)
+                with open(path, "rb"):
+                    pass
+            except OSError:
+                continue
+            ready.append(path)
+        return ready
+
+    def poll(self):
+        """Import every file that is ready; returns their results."""
+        ready = self.ready_files()
+        if not ready:
+            return []
+        results = []
+        conn = None
+        try:
+            for path in ready:
+                if conn is None:
+                    try:
+                        conn = self.connect()
+                    except Exception as e:
+                        # Database unavailable: leave the files where they are and try next poll
+                        print(f"Hot folder: could not connect to the database: {e}")
+                        break
+                result = self.process_file(path, conn)
+                results.append(result)
+                if result["status"] == "retry":
+                    # The connection is likely gone too; the rest wait for the next poll
+                    break
+                del self.pending[path]
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        return results
+
+    def process_file(self, path, conn):
+        """Import one file, move it to the archive or error folder and log the outcome."""
+        start = time.perf_counter()
+        name = os.path.basename(path)
+        result = {"time": datetime.datetime.now().isoformat(timespec="seconds"), "file": name, "kind": "",
+                  "status": "error", "rows": 0, "imported": 0, "skipped": 0, "duplicates": 0,
+                  "validation_errors": 0, "validation_warnings": 0, "seconds": 0.0, "moved_to": "",
+                  "message": ""}
+        report = None
+        details = None
+        try:
+            kind = detect_import_kind(path)
+            result["kind"] = kind
+            samples, project_info, result["rows"] = read_import_file(path, kind, self.column_map)
+            report = validate_samples(samples)
+            result["validation_errors"], result["validation_warnings"] = validation_counts(report)
+            project = "Log Book"
+            if kind == "submission":
+                project = self.project_name or project_info.get('project_name', '')
+                if not project:
+                    raise ValueError("No project name configured and none in the workbook")
+                project_info = {**project_info, 'user_project_name': project}
+
+            if not samples:
+                result["message"] = "No valid samples found"
+            elif result["validation_errors"] and self.reject_on_validation_errors:
+                result["message"] = f"{result['validation_errors']} validation errors; nothing imported"
+            else:
+                checkpoint = None
+                if self.checkpoint_dir is not None:
+                    checkpoint = ImportCheckpoint(self.checkpoint_dir, path, project)
+                try:
+                    imported = run_sample_import(conn, samples, project_info, checkpoint=checkpoint)
+                except (pyodbc.Error, OSError) as e:
+                    return self._defer(path, result, e, start)
+                for key in ("imported", "skipped", "duplicates"):
+                    result[key] = imported[key]
+                result["status"] = "imported"
+                result["message"] = ("already imported" if imported["already_completed"]
+                                     else f"{imported['rows_per_second']:.0f} rows/s")
+        except Exception as e:
+            result["message"] = str(e)
+            details = traceback.format_exc()
+            print(f"Hot folder: error importing {name}: {e}")
+            print(details)
+
+        target_dir = self.archive_dir if result["status"] == "imported" else self.error_dir
+        try:
+            target = unique_destination(target_dir, name)
+            os.replace(path, target)
+            result["moved_to"] = target
+            if result["status"] != "imported":
+                # Why it failed, next to the file itself
+                if report is not None and len(report):
+                    report.to_csv(os.path.splitext(target)[0] + "_validation.csv", index=False)
+                with open(os.path.splitext(target)[0] + "_error.txt", "w", encoding="utf-8") as f:
+                    f.write(f"{result['message']}\n")
+                    if details:
+                        f.write(f"\n{details}")
+        except OSError as e:
+            print(f"Hot folder: could not move {name}: {e}")
+            result["message"] = f"{result['message']} (not moved: {e})".strip()
+
+        self.retry_at.pop(path, None)
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        self._log(result)
+        print(f"Hot folder: {name} [{result['kind'] or '?'}] {result['status']}: {result['imported']} imported, "
+              f"{result['duplicates']} duplicates, {result['message']}")
+        return result
+
+    def _defer(self, path, result, error, start):
+        """Leave a file whose insert failed transiently in place and schedule a retry with back-off."""
+        attempts = self.retry_at.get(path, (0, 0))[0] + 1
+        delay = min(self.interval * 2 ** attempts, HOT_FOLDER_MAX_RETRY_SECONDS)
+        self.retry_at[path] = (attempts, time.monotonic() + delay)
+        result["status"] = "retry"
+        result["message"] = f"{error} (attempt {attempts}, retrying in {delay:.0f} s)"
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        self._log(result)
+        print(f"Hot folder: {os.path.basename(path)} not imported yet: {result['message']}")
+        return result
+
+    def _log(self, result):
+        new_file = not os.path.exists(self.log_path)
+        with open(self.log_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=HOT_FOLDER_LOG_COLUMNS)
+            if new_file:
+                writer.writeheader()
+            writer.writerow(result)
+
+    def run(self, stop_event=None, once=False):
+        """
+        Poll until stop_event is set (or Ctrl+C). With once=True, look at the folder, wait
+        settle_seconds, then import the files that haven't changed meanwhile and return; files
+        still being copied are left for the next run.
+        """
+        print(f"Watching {self.folder} every {self.interval} s (files settle for {self.settle_seconds} s)")
+        stop_event = stop_event or threading.Event()
+        try:
+            if once and self.settle_seconds > 0:
+                self.ready_files()
+                if stop_event.wait(self.settle_seconds):
+                    return
+            while True:
+                try:
+                    self.poll()
+                except OSError as e:
+                    # e.g. a network drive dropping out; keep watching
+                    print(f"Hot folder: poll failed: {e}")
+                if once or stop_event.wait(self.interval):
+                    break
+        except KeyboardInterrupt:
+            print("Hot folder watcher stopped")
+
+
+def load_hot_folder_config(path):
+    """HOT_FOLDER_DEFAULTS overlaid with the JSON settings in `path`, if it exists."""
+    config = dict(HOT_FOLDER_DEFAULTS)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        if not isinstance(settings, dict):
+            raise ValueError(f"{path} must contain a JSON object of settings")
+        config.update(settings)
+    return config
+
+
+def run_hot_folder(argv):
+    """
+    Command-line entry point: sampletracking --watch [FOLDER] [--project NAME] [--once]
+    [--interval SECONDS] [--settle SECONDS]. Anything not given comes from hot_folder.json next
+    to the app.
+    """
+    parser = argparse.ArgumentParser(description="Import sample files dropped into a folder.")
+    parser.add_argument("--watch", nargs="?", const="", metavar="FOLDER", required=True,
+                        help="drop folder to watch (default: 'folder' in hot_folder.json)")
+    parser.add_argument("--project", help="Project for submission workbooks (default: the workbook's own)")
+    parser.add_argument("--interval", type=float, help="seconds between polls")
+    parser.add_argument("--settle", type=float, metavar="SECONDS",
+                        help="seconds a file must stay unchanged before it is imported")
+    parser.add_argument("--once", action="store_true", help="import what is ready now, then exit")
+    args = parser.parse_args(argv)
+
+    config = load_hot_folder_config(get_file_path(HOT_FOLDER_CONFIG_FILE))
+    folder = args.watch or config["folder"]
+    if not folder:
+        parser.error(f"no folder given and none set in {HOT_FOLDER_CONFIG_FILE}")
+    db_path = get_database_path()
+    watcher = HotFolderWatcher(
+        folder,
+        lambda: connect_to_database(db_path, DATABASE_PASSWORD),
+        project_name=args.project or config["project"],
+        archive_dir=config["archive_folder"],
+        error_dir=config["error_folder"],
+        log_path=config["log_file"],
+        interval=args.interval if args.interval is not None else config["interval_seconds"],
+        settle_seconds=args.settle if args.settle is not None else config["settle_seconds"],
+        reject_on_validation_errors=config["reject_on_validation_errors"],
+        column_map=load_column_map(get_file_path(IMPORT_COLUMN_MAP_FILE)),
+        checkpoint_dir=get_local_data_path(IMPORT_CHECKPOINT_DIR)
+    )
+    watcher.run(once=args.once)
+    return 0
+
+
 class BatchUpdateDialog(ctk.CTkToplevel):
     def __init__(self, parent, selected_samples):
         super().__init__(parent)
         print("CTkToplevel created")
         self.parent = parent
         self.selected_samples = selected_samples
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.worker_queue = queue.Queue()
         self.title("Batch Update Analysis Status")
         self.geometry("1000x800")
         self.resizable(True, True)
@@ -86,8 +3323,22 @@ class BatchUpdateDialog(ctk.CTkToplevel):
         # Instead, disable the parent window
         self.parent.attributes('-disabled', True)
 
+    def on_cancel(self):
+        """Cancel a running update, or close the dialog if nothing is running."""
+        if self.worker is not None:
+            self.cancel_event.set()
+            self.progress_var.set("Cancelling after the current batch...")
+            self.cancel_btn.configure(state="disabled")
+            return
+        self.on_close()
+
     def on_close(self):
         """Handle window close event."""
+        if self.worker is not None:
+            # Don't abandon a running update; ask it to stop instead
+            self.on_cancel()
+            return
+
         # Re-enable parent window
         self.parent.attributes('-disabled', False)
         self.parent.focus_force()
@@ -188,17 +3439,37 @@ class BatchUpdateDialog(ctk.CTkToplevel):
         self.notes_text = ctk.CTkTextbox(analysis_frame, height=60, width=400)
         self.notes_text.grid(row=2, column=1, columnspan=3, pady=(10, 0), sticky="ew")
 
+        # Commit policy: 0 keeps the whole update in one transaction
+        ttk.Label(analysis_frame, text="Commit every N samples (0 = all at once):").grid(
+            row=3, column=0, sticky="w", padx=(0, 10), pady=(10, 0))
+
+        self.commit_every_var = tk.StringVar(value="500")
+        self.commit_every_entry = ttk.Entry(analysis_frame, textvariable=self.commit_every_var, width=10)
+        self.commit_every_entry.grid(row=3, column=1, sticky="w", pady=(10, 0))
+
         analysis_frame.grid_columnconfigure(1, weight=1)
 
+        # Progress of a running update
+        progress_frame = ctk.CTkFrame(main_frame)
+        progress_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.progress_bar = ctk.CTkProgressBar(progress_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(fill=tk.X, padx=10, pady=(10, 5))
+
+        self.progress_var = tk.StringVar(value="")
+        progress_label = ctk.CTkLabel(progress_frame, textvariable=self.progress_var)
+        progress_label.pack(pady=(0, 5))
+
         # Buttons frame using CTk
         buttons_frame = ctk.CTkFrame(main_frame)
         buttons_frame.pack(fill=tk.X, pady=(10, 0))
 
-        update_btn = ctk.CTkButton(buttons_frame, text="Update All Selected", command=self.update_samples)
-        update_btn.pack(side=tk.RIGHT, padx=(10, 0))
+        self.update_btn = ctk.CTkButton(buttons_frame, text="Update All Selected", command=self.update_samples)
+        self.update_btn.pack(side=tk.RIGHT, padx=(10, 0))
 
-        cancel_btn = ctk.CTkButton(buttons_frame, text="Cancel", command=self.on_close)
-        cancel_btn.pack(side=tk.RIGHT)
+        self.cancel_btn = ctk.CTkButton(buttons_frame, text="Cancel", command=self.on_cancel)
+        self.cancel_btn.pack(side=tk.RIGHT)
 
     def populate_selected_samples(self):
         # Clear existing items
@@ -253,39 +3524,297 @@ class BatchUpdateDialog(ctk.CTkToplevel):
             return
 
         try:
-            success_count = self.parent.perform_batch_update(
-                self.selected_samples, analysis_type, status, notes, due_date_done
-            )
+            commit_every = int(self.commit_every_var.get().strip() or 0)
+            if commit_every < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Commit every N samples must be a whole number (0 = all at once).",
+                                 parent=self)
+            self.focus_force()
+            return
 
-            if success_count > 0:
-                messagebox.showinfo("Success", f"Successfully updated {success_count} samples.", parent=self)
-                self.parent.refresh_data()
-                self.on_close()
-            else:
-                messagebox.showwarning("Warning", "No samples were updated.", parent=self)
-                self.focus_force()
+        updates = self.parent.build_batch_updates(analysis_type, status, due_date_done)
+        unh_ids = [sample.get('UNH#', '') for sample in self.selected_samples if sample.get('UNH#', '')]
+        if not updates or not unh_ids:
+            messagebox.showwarning("Warning", "No samples were updated.", parent=self)
+            self.focus_force()
+            return
+
+        # Run the update on a worker thread so the dialog stays responsive
+        self.update_btn.configure(state="disabled")
+        self.cancel_btn.configure(text="Cancel Update")
+        self.progress_bar.set(0)
+        self.progress_var.set(f"Updating 0 of {len(unh_ids)} samples...")
+        self.cancel_event.clear()
+        self.worker = threading.Thread(
+            target=self._run_update_worker,
+            args=(unh_ids, updates, commit_every or None),
+            name="BatchUpdateWorker",
+            daemon=True
+        )
+        self.worker.start()
+        self.after(100, self._poll_worker)
 
+    def _run_update_worker(self, unh_ids, updates, commit_every):
+        """Worker thread: run the batch update on its own connection and report back through the queue."""
+        conn = None
+        try:
+            conn = connect_to_database(self.parent.db_path, self.parent.password)
+            result = run_batch_update(
+                conn, unh_ids, updates,
+                commit_every=commit_every,
+                progress=lambda done, total: self.worker_queue.put(("progress", done, total)),
+                cancel_event=self.cancel_event
+            )
+            self.worker_queue.put(("done", result))
         except Exception as e:
-            messagebox.showerror("Error", f"Error during batch update: {str(e)}", parent=self)
-            self.focus_force()
-            print(f"Batch update error: {e}")
-            print(traceback.format_exc())
+            self.worker_queue.put(("error", e, traceback.format_exc()))
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
 
-class SampleTrackerApp(ctk.CTk):
+    def _poll_worker(self):
+        """Apply progress messages from the worker on the Tk thread."""
+        finished = None
+        try:
+            while True:
+                message = self.worker_queue.get_nowait()
+                if message[0] == "progress":
+                    _, done, total = message
+                    self.progress_bar.set(done / total if total else 1)
+                    if not self.cancel_event.is_set():
+                        self.progress_var.set(f"Updating {done} of {total} samples...")
+                else:
+                    finished = message
+        except queue.Empty:
+            pass
 
-    def __init__(self):
-        super().__init__()
+        if finished is None:
+            self.after(100, self._poll_worker)
+            return
 
-        # Set appearance mode and default color theme
-        ctk.set_appearance_mode("System")
-        ctk.set_default_color_theme("blue")
+        self.worker = None
+        self.update_btn.configure(state="normal")
+        self.cancel_btn.configure(text="Cancel", state="normal")
 
-        self.title("WRRC Sample Tracking Application")
-        self.geometry("1200x800")
-        print("Initializing application...")
+        if finished[0] == "error":
+            _, error, details = finished
+            print(f"Batch update error: {error}")
+            print(details)
+            self.progress_var.set("Update failed; no uncommitted changes were kept.")
+            messagebox.showerror("Error", f"Error during batch update: {str(error)}", parent=self)
+            self.focus_force()
+            return
 
-        # Initialize state variables FIRST
-        self.analysis_completed_var = ctk.BooleanVar(value=False)
+        result = finished[1]
+        self.parent.last_batch_update_result = result
+        self.parent.after_batch_update(result["committed_ids"])
+
+        success_count = result["updated"] + result["inserted"]
+        total_ms = sum(result["timings"].values()) * 1000
+        if result["cancelled"]:
+            self.progress_var.set(f"Cancelled: {success_count} samples were committed before cancelling.")
+            messagebox.showinfo("Batch Update Cancelled",
+                                f"Update cancelled.\n\n{success_count} samples were committed before the "
+                                f"cancel; the remaining changes were rolled back.", parent=self)
+            self.parent.refresh_data()
+            self.focus_force()
+        elif success_count > 0:
+            messagebox.showinfo("Success",
+                                f"Successfully updated {success_count} samples.\n\n"
+                                f"{result['updated']} updated, {result['inserted']} inserted "
+                                f"in {total_ms:.0f} ms", parent=self)
+            self.parent.refresh_data()
+            self.on_close()
+        else:
+            messagebox.showwarning("Warning", "No samples were updated.", parent=self)
+            self.focus_force()
+
+
+class BatchEditDialog(ctk.CTkToplevel):
+    """Edit several sample-info fields, analysis columns and the due date for many samples at once."""
+
+    def __init__(self, parent, selected_samples):
+        super().__init__(parent)
+        self.parent = parent
+        self.selected_samples = selected_samples
+        self.title(f"Batch Edit ({len(selected_samples)} samples selected)")
+        self.geometry("900x800")
+        self.resizable(True, True)
+
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.attributes('-topmost', True)
+
+        self.create_widgets()
+        self.lift()
+        self.focus_force()
+        self.parent.attributes('-disabled', True)
+
+    def on_close(self):
+        """Handle window close event."""
+        self.parent.attributes('-disabled', False)
+        self.parent.focus_force()
+        self.destroy()
+
+    def _add_field_rows(self, frame, fields):
+        """One 'change this field' checkbox and entry per field; unticked fields are left alone."""
+        rows = {}
+        for i, field in enumerate(fields):
+            enabled_var = ctk.BooleanVar(value=False)
+            checkbox = ctk.CTkCheckBox(frame, text=f"{field}:", variable=enabled_var)
+            checkbox.grid(row=i, column=0, padx=(10, 5), pady=3, sticky="w")
+
+            entry = ctk.CTkEntry(frame, width=300, placeholder_text="(empty clears the field)")
+            entry.grid(row=i, column=1, padx=(0, 10), pady=3, sticky="w")
+            rows[field] = (enabled_var, entry)
+        return rows
+
+    def create_widgets(self):
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        title_label = ctk.CTkLabel(main_frame, text=f"Batch Edit {len(self.selected_samples)} Samples",
+                                   font=("Helvetica", 16, "bold"))
+        title_label.pack(pady=(0, 5))
+
+        hint_label = ctk.CTkLabel(main_frame,
+                                  text="Tick the fields to change; the same value is applied to every selected sample.")
+        hint_label.pack(pady=(0, 10))
+
+        fields_frame = ctk.CTkScrollableFrame(main_frame)
+        fields_frame.pack(fill=tk.BOTH, expand=True)
+
+        ctk.CTkLabel(fields_frame, text="Sample Information",
+                     font=("Helvetica", 14, "bold")).pack(anchor="w", padx=10, pady=(5, 5))
+        sample_frame = ctk.CTkFrame(fields_frame)
+        sample_frame.pack(fill=tk.X, padx=5)
+        sample_fields = [f for f in self.parent.sample_info_fields if f != "UNH#"]
+        self.sample_rows = self._add_field_rows(sample_frame, sample_fields)
+
+        ctk.CTkLabel(fields_frame, text="Analysis Information",
+                     font=("Helvetica", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
+        analysis_frame = ctk.CTkFrame(fields_frame)
+        analysis_frame.pack(fill=tk.X, padx=5)
+        analysis_fields = [f for f in self.parent.analysis_fields if f != "Due_Date"]
+        self.analysis_rows = self._add_field_rows(analysis_frame, analysis_fields)
+
+        # Due date: leave alone, set a date, or clear it (analysis complete)
+        ctk.CTkLabel(fields_frame, text="Due Date",
+                     font=("Helvetica", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 5))
+        due_frame = ctk.CTkFrame(fields_frame)
+        due_frame.pack(fill=tk.X, padx=5, pady=(0, 10))
+
+        self.due_date_mode_var = tk.StringVar(value="unchanged")
+        for text, mode in (("Leave unchanged", "unchanged"), ("Set to:", "set"),
+                           ("Mark as complete (clear)", "clear")):
+            ctk.CTkRadioButton(due_frame, text=text, variable=self.due_date_mode_var,
+                               value=mode).pack(side="left", padx=10, pady=5)
+            if mode == "set":
+                self.due_date_entry = DateEntry(
+                    due_frame,
+                    width=12,
+                    background='darkblue',
+                    foreground='white',
+                    borderwidth=2,
+                    date_pattern='yyyy-mm-dd'
+                )
+                self.due_date_entry.pack(side="left", padx=(0, 10))
+
+        self.status_var = tk.StringVar(value="")
+        ctk.CTkLabel(main_frame, textvariable=self.status_var).pack(pady=(5, 0))
+
+        buttons_frame = ctk.CTkFrame(main_frame)
+        buttons_frame.pack(fill=tk.X, pady=(10, 0))
+
+        apply_btn = ctk.CTkButton(buttons_frame, text="Apply to All Selected", command=self.apply_changes)
+        apply_btn.pack(side=tk.RIGHT, padx=(10, 0))
+
+        cancel_btn = ctk.CTkButton(buttons_frame, text="Cancel", command=self.on_close)
+        cancel_btn.pack(side=tk.RIGHT)
+
+    def _requested_values(self):
+        """The ticked fields as ({sample column: value}, {analysis column: value})."""
+        sample_values = {field: entry.get().strip()
+                         for field, (enabled_var, entry) in self.sample_rows.items() if enabled_var.get()}
+        analysis_values = {field: entry.get().strip()
+                           for field, (enabled_var, entry) in self.analysis_rows.items() if enabled_var.get()}
+
+        mode = self.due_date_mode_var.get()
+        if mode == "set":
+            analysis_values["Due_Date"] = self.due_date_entry.get_date().strftime('%Y-%m-%d')
+        elif mode == "clear":
+            analysis_values["Due_Date"] = ""
+        return sample_values, analysis_values
+
+    def apply_changes(self):
+        sample_values, analysis_values = self._requested_values()
+        if not sample_values and not analysis_values:
+            messagebox.showwarning("Warning", "Tick at least one field to change.", parent=self)
+            self.focus_force()
+            return
+
+        row_changes = self.parent.build_batch_edit_changes(self.selected_samples, sample_values, analysis_values)
+        if not row_changes:
+            messagebox.showinfo("No Changes", "The selected samples already have these values.", parent=self)
+            self.focus_force()
+            return
+
+        statements = compile_batch_edit(row_changes)
+        fields = list(sample_values) + list(analysis_values)
+        confirm_msg = (f"Change {', '.join(fields)} on {len(row_changes)} samples?\n\n"
+                       f"({len(self.selected_samples) - len(row_changes)} samples already match and are skipped; "
+                       f"{len(statements)} grouped UPDATE statements)")
+        if not messagebox.askyesno("Confirm Batch Edit", confirm_msg, parent=self):
+            self.focus_force()
+            return
+
+        conn = self.parent._get_db_connection()
+        if not conn:
+            return
+        try:
+            start = time.perf_counter()
+            result = apply_batch_edit(conn, row_changes)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            print(f"Batch edit error: {str(e)}")
+            print(traceback.format_exc())
+            messagebox.showerror("Error", f"Error during batch edit: {str(e)}", parent=self)
+            self.focus_force()
+            return
+        finally:
+            conn.close()
+
+        self.parent.after_batch_update(result["unh_ids"])
+        messagebox.showinfo("Success",
+                            f"Updated {len(result['unh_ids'])} samples with {result['statements']} statements "
+                            f"in {elapsed_ms:.0f} ms.", parent=self)
+        self.parent.refresh_data()
+        self.on_close()
+
+
+# Sample chips shown inline in a calendar day cell; busier days get a 'Show all' pop-out
+CALENDAR_MAX_INLINE = 4
+
+
+class SampleTrackerApp(ctk.CTk):
+
+    def __init__(self):
+        super().__init__()
+
+        # Set appearance mode and default color theme
+        ctk.set_appearance_mode("System")
+        ctk.set_default_color_theme("blue")
+
+        self.title("WRRC Sample Tracking Application")
+        self.geometry("1200x800")
+        print("Initializing application...")
+
+        # Initialize state variables FIRST
+        self.analysis_completed_var = ctk.BooleanVar(value=False)
         self.filter_by_date_var = ctk.BooleanVar(value=True)  # Default to filtering by date
         self.percent_date_filtered = 0
         self.years_limit = 1  # Changed from 8 to 1 year
@@ -297,10 +3826,38 @@ class SampleTrackerApp(ctk.CTk):
         self.UNCHECKED = "\N{BALLOT BOX}"  # ☒ alt: BALLOT BOX WITH X
         self.CHECKED = "\N{BALLOT BOX WITH CHECK}"  # ☑
 
+        # Column sort state for the Search treeview: list of (column, descending)
+        self.sort_columns = []
+        self._sort_cache = {"version": None, "ranks": {}, "orders": {}}
+        self._tree_item_positions = {}
+
         # Connect to Access database AFTER initializing variables
         self.db_path = get_database_path()
-        self.password = "x"
-        self.data = self._load_data_from_database()  # This should respect the date filter now
+        self.password = DATABASE_PASSWORD
+        self._shared_conn = None
+        self.existence_matrix = DataExistenceMatrix()
+        self.analysis_index = AnalysisRequestedIndex()
+        # Queued Edit-tab saves: only started when write-behind is turned on, or to flush edits a
+        # previous session left in the journal
+        self.write_behind = None
+        self.write_behind_error = None
+        try:
+            if WriteBehindQueue.has_leftover_edits(self._write_behind_journal_path()):
+                self._start_write_behind()
+        except OSError as e:
+            print(f"Could not check for queued edits from a previous session: {e}")
+        # Background import pipeline (parse -> validate -> dedupe -> insert)
+        self.import_worker = None
+        self.import_cancel_event = threading.Event()
+        self.import_queue = queue.Queue()
+        self.import_resumable = False
+        # Samples extracted by the last preview, reused by the import while the file is unchanged
+        self.import_session = None
+        self.has_data_filter_var = ctk.StringVar(value="All samples")
+        # (data_version, groups) from the Due_Date query, used when the analysis cache isn't loaded
+        self._due_date_groups = None
+        self.data_version = 0
+        self._reload_data()  # This should respect the date filter now
 
         # Style for treeview with checkboxes
         style = ttk.Style(self)
@@ -321,31 +3878,63 @@ class SampleTrackerApp(ctk.CTk):
         # Selected record for editing
         self.selected_record = None
         self.analysis_data = None
+        self.related_data = None
+        self.last_batch_update_result = None
+        self.after(1000, self._poll_write_behind)
 
         # Start with the search tab showing
         self.tabview.set("Search")
 
+        self.protocol("WM_DELETE_WINDOW", self.on_app_close)
+
+    def on_app_close(self):
+        """Stop background workers and close the shared connection before exiting."""
+        self.analysis_index.stop()
+        self.existence_matrix.stop()
+        if self.write_behind is not None:
+            # Bounded: unflushed edits stay in the local journal and are written on the next start
+            self.write_behind.stop(timeout=2.0)
+        if self.import_worker is not None and self.import_worker.is_alive():
+            # Let a running import roll back on its own connection
+            self.import_cancel_event.set()
+            self.import_worker.join(timeout=10)
+        self._close_shared_connection()
+        self.destroy()
+
     def _get_db_connection(self):
         """Create a connection to the Access database."""
         try:
-            conn_str = (
-                r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-                f"DBQ={self.db_path};"
-                f"PWD={self.password};"
-                "Extended Properties='Excel 8.0;IMEX=1;'"
-            )
-
-            conn = pyodbc.connect(conn_str, autocommit=True)
-            conn.setdecoding(pyodbc.SQL_CHAR, encoding='latin1')
-            conn.setdecoding(pyodbc.SQL_WCHAR, encoding='latin1')
-            conn.setencoding(encoding='latin1')
-
-            return conn
+            return connect_to_database(self.db_path, self.password)
         except Exception as e:
             print(f"Error connecting to database: {e}")
             messagebox.showerror("Database Error", f"Could not connect to the database: {str(e)}")
             return None
 
+    def _get_shared_connection(self):
+        """
+        Return a long-lived connection for quick read-only lookups on the UI thread.
+        Opening a new Access connection over the network share costs far more than the queries.
+        """
+        if self._shared_conn is not None:
+            try:
+                self._shared_conn.cursor().close()
+                return self._shared_conn
+            except Exception as e:
+                print(f"Shared connection is no longer usable, reconnecting: {e}")
+                self._close_shared_connection()
+
+        self._shared_conn = self._get_db_connection()
+        return self._shared_conn
+
+    def _close_shared_connection(self):
+        """Close the shared read connection if it is open."""
+        if self._shared_conn is not None:
+            try:
+                self._shared_conn.close()
+            except Exception:
+                pass
+            self._shared_conn = None
+
     def create_tabview(self):
         """Create the main tabview for the application."""
         self.tabview = ctk.CTkTabview(self)
@@ -357,6 +3946,83 @@ class SampleTrackerApp(ctk.CTk):
         self.tabview.add("Edit")
         self.tabview.add("Calendar")  # Add the Calendar tab
 
+    def _reload_data(self, full=False):
+        """
+        Reload self.data from the database and bump the data version used by derived caches.
+        full=True (the Refresh button) also re-reads the data-existence matrix for every sample.
+        """
+        self.data = self._load_data_from_database()
+        self.data_version += 1
+        self._sync_existence_matrix(full)
+        self._sync_analysis_index()
+
+    def _sync_analysis_index(self):
+        """Bulk-load the analysis-requested cache on first load, then pick up rows for new samples."""
+        if self.data.empty or "UNH#" not in self.data.columns:
+            return
+
+        data_ids = set(self.data["UNH#"].map(normalize_unh)) - {""}
+        try:
+            if not self.analysis_index.loaded:
+                conn = self._get_shared_connection()
+                if conn:
+                    self.analysis_index.load(conn)
+                    self.analysis_index.known_ids = data_ids
+                    self.analysis_index.start_reconciliation(
+                        lambda: connect_to_database(self.db_path, self.password)
+                    )
+            else:
+                new_ids = data_ids - self.analysis_index.known_ids
+                if new_ids:
+                    conn = self._get_shared_connection()
+                    if conn:
+                        self.analysis_index.refresh(conn, new_ids)
+        except Exception as e:
+            print(f"Error updating analysis-requested cache: {e}")
+            self._close_shared_connection()
+
+    def _refresh_analysis_index(self, unh_ids):
+        """Re-read the cached analysis rows for samples we just wrote to."""
+        if not self.analysis_index.loaded:
+            # The calendar falls back to querying; make it re-read after this write
+            self._due_date_groups = None
+            return
+        try:
+            conn = self._get_shared_connection()
+            if conn:
+                self.analysis_index.refresh(conn, unh_ids)
+        except Exception as e:
+            print(f"Error refreshing analysis-requested cache: {e}")
+            self._close_shared_connection()
+
+    def _sync_existence_matrix(self, full=False):
+        """
+        Build the data-existence matrix on first load (or when `full`), then refresh only samples
+        it hasn't seen. A background reload keeps existing samples current between refreshes.
+        """
+        if self.data.empty or "UNH#" not in self.data.columns:
+            return
+
+        data_ids = set(self.data["UNH#"].map(normalize_unh)) - {""}
+        try:
+            if full or not self.existence_matrix.loaded:
+                conn = self._get_shared_connection()
+                if conn:
+                    self.existence_matrix.load(conn)
+                    self.existence_matrix.known_ids = data_ids
+                    self.existence_matrix.start_reconciliation(
+                        lambda: connect_to_database(self.db_path, self.password)
+                    )
+            else:
+                new_ids = data_ids - self.existence_matrix.known_ids
+                if new_ids:
+                    conn = self._get_shared_connection()
+                    if conn:
+                        self.existence_matrix.refresh(conn, new_ids)
+        except Exception as e:
+            print(f"Error updating data existence matrix: {e}")
+            self._close_shared_connection()
+
     def _load_data_from_database(self):
         """Load data from Access database instead of Excel."""
         try:
@@ -495,6 +4161,7 @@ class SampleTrackerApp(ctk.CTk):
 
         # Apply date filter if checkbox is checked
         filtered_data = self.apply_date_filter(filtered_data)
+        filtered_data = self.apply_existence_filter(filtered_data)
 
         if filtered_data.empty:
             print("No samples found for:", search_term)
@@ -544,6 +4211,7 @@ class SampleTrackerApp(ctk.CTk):
 
         # Apply date filter if checkbox is checked
         filtered_data = self.apply_date_filter(filtered_data)
+        filtered_data = self.apply_existence_filter(filtered_data)
 
         if filtered_data.empty:
             print("No project found for:", search_term)
@@ -666,6 +4334,35 @@ class SampleTrackerApp(ctk.CTk):
             print(traceback.format_exc())
             return df  # Return original dataframe if there's an error
 
+    def _existence_filter_options(self):
+        """Choices for the 'Has data' filter on the Search tab."""
+        return (["All samples", "Any measurement data", "No measurement data"] +
+                [f"Has {key} data" for key in MEASUREMENT_TABLES] +
+                [f"Missing {key} data" for key in MEASUREMENT_TABLES])
+
+    def apply_existence_filter(self, df):
+        """Filter rows by the 'Has data' option using the cached existence matrix."""
+        choice = self.has_data_filter_var.get()
+        if choice == "All samples" or df.empty or "UNH#" not in df.columns:
+            return df
+        if not self.existence_matrix.loaded:
+            print("Existence matrix not loaded; ignoring 'Has data' filter")
+            return df
+
+        if choice == "Any measurement data":
+            mask = self.existence_matrix.has_data_mask(df["UNH#"])
+        elif choice == "No measurement data":
+            mask = ~self.existence_matrix.has_data_mask(df["UNH#"])
+        else:
+            negate = choice.startswith("Missing ")
+            key = choice.split(" ", 1)[1].rsplit(" data", 1)[0]
+            mask = self.existence_matrix.has_data_mask(df["UNH#"], key)
+            if negate:
+                mask = ~mask
+
+        print(f"'Has data' filter '{choice}': {len(df)} rows reduced to {int(mask.sum())} rows")
+        return df[mask]
+
     def clear_search(self):
         """Clear both search fields and show all records."""
         self.sample_search_entry.delete(0, "end")
@@ -675,23 +4372,7 @@ class SampleTrackerApp(ctk.CTk):
     # Enhanced calendar methods from second version
     def _normalize_due_date(self, val):
         """Return a date() for Due_Date cell or None if unparsable."""
-        if pd.isna(val):
-            return None
-        try:
-            if isinstance(val, datetime.date) and not isinstance(val, datetime.datetime):
-                return val
-            if isinstance(val, datetime.datetime):
-                return val.date()
-            if isinstance(val, str) and val.strip():
-                # try several formats
-                for fmt in ('%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d-%m-%Y', '%Y/%m/%d'):
-                    try:
-                        return datetime.datetime.strptime(val.strip(), fmt).date()
-                    except Exception:
-                        pass
-        except Exception as e:
-            print(f"_normalize_due_date error: {e}")
-        return None
+        return normalize_due_date(val)
 
     def _focus_sample_in_tree(self, row_series):
         """Switch to Search tab, show all, then focus the matching row."""
@@ -786,66 +4467,105 @@ class SampleTrackerApp(ctk.CTk):
 
         tv.bind('<Double-1>', on_open)
 
-    def _clear_calendar_grid(self):
-        """Remove all widgets inside the month grid."""
-        for w in self.month_grid_frame.winfo_children():
-            w.destroy()
-
-    def _render_calendar_month(self):
-        """Render the 7×6 calendar month grid with sample chips."""
-        print(f"Rendering month: {self.current_year}-{self.current_month:02d}")
-        self.month_label.configure(text=f"{pycal.month_name[self.current_month]} {self.current_year}")
-        self._clear_calendar_grid()
-
-        # Weekday header
+    def _build_calendar_grid(self):
+        """
+        Create the month grid's widgets once: the weekday header and 6 weeks x 7 day cells, each
+        with its date label, CALENDAR_MAX_INLINE chip labels and a 'Show all' button. Rendering a
+        month only reconfigures these, so navigating doesn't destroy and recreate hundreds of widgets.
+        """
         for i, wd in enumerate(pycal.weekheader(2).split()):
             hdr = ttk.Label(self.month_grid_frame, text=wd, anchor='center', font=('Helvetica', 12, 'bold'))
             hdr.grid(row=0, column=i, sticky='nsew', padx=2, pady=2)
 
         for c in range(7):
             self.month_grid_frame.grid_columnconfigure(c, weight=1)
-        # rows: one header + 6 weeks max
-        for r in range(1, 7):
-            self.month_grid_frame.grid_rowconfigure(r, weight=1)
-
-        by_date = self._group_samples_by_date()
-        monthcal = pycal.Calendar(firstweekday=0).monthdatescalendar(self.current_year, self.current_month)
 
-        MAX_INLINE = 4  # show up to 4 items inline
-
-        for r, week in enumerate(monthcal, start=1):
-            for c, day in enumerate(week):
-                in_month = (day.month == self.current_month)
+        self._calendar_cells = []
+        for r in range(1, 7):
+            for c in range(7):
+                index = len(self._calendar_cells)
                 cell = ttk.Frame(self.month_grid_frame, relief='groove', borderwidth=1)
                 cell.grid(row=r, column=c, sticky='nsew', padx=2, pady=2)
 
-                date_hdr = ttk.Label(cell, text=str(day.day),
-                                     font=('Helvetica', 11, 'bold'),
-                                     foreground=('black' if in_month else 'gray'))
+                date_hdr = ttk.Label(cell, font=('Helvetica', 11, 'bold'))
                 date_hdr.pack(anchor='ne', padx=4, pady=(2, 0))
 
+                chips = []
+                for i in range(CALENDAR_MAX_INLINE):
+                    lnk = ttk.Label(cell, cursor='hand2', foreground='blue')
+                    lnk.bind("<Button-1>", lambda e, k=index, i=i: self._on_calendar_chip(k, i))
+                    chips.append(lnk)
+
+                btn = ttk.Button(cell, width=16, command=lambda k=index: self._on_calendar_show_all(k))
+                self._calendar_cells.append({"frame": cell, "date": date_hdr, "chips": chips, "button": btn,
+                                             "day": None, "rows": [], "layout": None})
+
+    def _on_calendar_chip(self, cell_index, chip_index):
+        """Jump to the sample currently shown on a calendar chip."""
+        rows = self._calendar_cells[cell_index]["rows"]
+        if chip_index < len(rows):
+            rs = rows[chip_index]
+            print(f"Clicked sample chip: {rs.get('UNH#', '')} / {rs.get('Sample_Name', '')}")
+            self._focus_sample_in_tree(rs)
+
+    def _on_calendar_show_all(self, cell_index):
+        cell = self._calendar_cells[cell_index]
+        self._open_day_popup(cell["day"], cell["rows"])
+
+    def _render_calendar_month(self):
+        """Render the 7×6 calendar month grid with sample chips, reusing the grid's widgets."""
+        start = time.perf_counter()
+        print(f"Rendering month: {self.current_year}-{self.current_month:02d}")
+        self.month_label.configure(text=f"{pycal.month_name[self.current_month]} {self.current_year}")
+
+        monthcal = pycal.Calendar(firstweekday=0).monthdatescalendar(self.current_year, self.current_month)
+        by_date = self._group_samples_by_date(monthcal[0][0], monthcal[-1][-1])
+        max_inline = CALENDAR_MAX_INLINE
+
+        for r in range(6):
+            # Months span 4 to 6 weeks; unused rows are hidden rather than destroyed
+            self.month_grid_frame.grid_rowconfigure(r + 1, weight=1 if r < len(monthcal) else 0)
+            for c in range(7):
+                cell = self._calendar_cells[r * 7 + c]
+                if r >= len(monthcal):
+                    cell["frame"].grid_remove()
+                    cell["day"], cell["rows"] = None, []
+                    continue
+                cell["frame"].grid()
+
+                day = monthcal[r][c]
                 rows = by_date.get(day, [])
-                # show up to 4
-                shown = 0
-                for row_series in rows[:MAX_INLINE]:
+                cell["day"], cell["rows"] = day, rows
+                cell["date"].configure(text=str(day.day),
+                                       foreground=('black' if day.month == self.current_month else 'gray'))
+
+                # Only re-pack when the number of chips (or the button) changes
+                shown = min(len(rows), max_inline)
+                layout = (shown, len(rows) > shown)
+                if layout != cell["layout"]:
+                    for widget in cell["chips"] + [cell["button"]]:
+                        widget.pack_forget()
+                    for lnk in cell["chips"][:shown]:
+                        lnk.pack(anchor='w', padx=6, pady=1)
+                    if layout[1]:
+                        cell["button"].pack(anchor='w', padx=6, pady=4)
+                    cell["layout"] = layout
+
+                for lnk, row_series in zip(cell["chips"], rows):
                     label_txt = f"{str(row_series.get('UNH#', ''))} — {str(row_series.get('Sample_Name', ''))}"
                     if len(label_txt) > 38:
                         label_txt = label_txt[:35] + "..."
-                    lnk = ttk.Label(cell, text=label_txt, cursor='hand2', foreground='blue')
-                    lnk.pack(anchor='w', padx=6, pady=1)
-
-                    def handler(rs=row_series):
-                        print(f"Clicked sample chip: {rs.get('UNH#', '')} / {rs.get('Sample_Name', '')}")
-                        self._focus_sample_in_tree(rs)
-
-                    lnk.bind("<Button-1>", lambda e, h=handler: h())
-                    shown += 1
-
-                remaining = len(rows) - shown
-                if remaining > 0:
-                    btn = ttk.Button(cell, text=f"Show all {len(rows)}", width=16,
-                                     command=lambda d=day, rws=rows: self._open_day_popup(d, rws))
-                    btn.pack(anchor='w', padx=6, pady=4)
+                    lnk.configure(text=label_txt)
+                if layout[1]:
+                    cell["button"].configure(text=f"Show all {len(rows)}")
+
+        configured = time.perf_counter()
+        # Include Tk's geometry pass, so the timing covers what the user waits for
+        self.month_grid_frame.update_idletasks()
+        end = time.perf_counter()
+        print(f"Rendered {pycal.month_name[self.current_month]} {self.current_year} "
+              f"({sum(len(v) for v in by_date.values())} samples) in {(end - start) * 1000:.1f} ms "
+              f"(widgets updated in {(configured - start) * 1000:.1f} ms, layout {(end - configured) * 1000:.1f} ms)")
 
     def _go_prev_month(self):
         print("Navigating to previous month")
@@ -911,6 +4631,30 @@ class SampleTrackerApp(ctk.CTk):
             text_color="#00aa00"  # Bright green
         )
 
+        # Optional write-behind mode: saves go to a local journal and are flushed in the background
+        write_behind_frame = ctk.CTkFrame(main_frame)
+        write_behind_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.write_behind_var = ctk.BooleanVar(value=False)
+        write_behind_checkbox = ctk.CTkCheckBox(
+            write_behind_frame,
+            text="Write-behind saves (queue edits locally and write them in the background)",
+            variable=self.write_behind_var,
+            command=self._on_write_behind_toggled
+        )
+        write_behind_checkbox.pack(side="left", padx=10, pady=5)
+
+        self.write_behind_status_var = ctk.StringVar(value="")
+        write_behind_status = ctk.CTkLabel(write_behind_frame, textvariable=self.write_behind_status_var)
+        write_behind_status.pack(side="left", padx=10)
+
+        self.write_behind_retry_button = ctk.CTkButton(
+            write_behind_frame,
+            text="Retry Now",
+            width=100,
+            command=lambda: self.write_behind.retry_now()
+        )
+
         # Create a frame for the sample info
         sample_info_frame = ctk.CTkFrame(main_frame)
         sample_info_frame.pack(fill="x", padx=10, pady=10)
@@ -1123,30 +4867,16 @@ class SampleTrackerApp(ctk.CTk):
     def _insert_new_analysis_record(self, cursor, unh_id):
         """Insert a new record in the WRRC sample analysis requested table."""
         try:
-            # Build columns and values for the INSERT statement
-            columns = ["[UNH#]"]
-            values = [unh_id]
-
-            for field, entry in self.analysis_entries.items():
-                # Handle Due_Date field which uses DateEntry
-                if field == "Due_Date":
-                    if not self.analysis_completed_var.get() and hasattr(entry, 'get_date'):
-                        due_date = entry.get_date().strftime('%Y-%m-%d')
-                        if due_date:
-                            columns.append(f"[{field}]")
-                            values.append(due_date)
-                    # If analysis is completed, don't add Due_Date (it will be NULL by default)
-                else:
-                    # Regular entry fields
-                    value = entry.get().strip()
-                    if value:
-                        columns.append(f"[{field}]")
-                        values.append(value)
+            changes = self._collect_analysis_changes()
 
             # If only UNH#, no need to insert
-            if len(columns) <= 1:
+            if not changes:
                 return False
 
+            # Build columns and values for the INSERT statement
+            columns = ["[UNH#]"] + [f"[{field}]" for field in changes]
+            values = [unh_id] + list(changes.values())
+
             # Build the query
             query = f"INSERT INTO [WRRC sample analysis requested] ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(values))})"
 
@@ -1162,6 +4892,50 @@ class SampleTrackerApp(ctk.CTk):
             print(f"Error inserting analysis info: {str(e)}")
             raise
 
+    def _collect_analysis_changes(self):
+        """
+        Analysis fields to write, as {field: new value}. With no existing analysis row these are
+        the non-empty fields (plus the due date unless completed) that a new row would get.
+        """
+        changes = {}
+        unh_id = self.selected_record.get("UNH#", "")
+
+        for field, entry in self.analysis_entries.items():
+            # Get the current value from the analysis data
+            current_value = self.analysis_data.get(field, "") if self.analysis_data else ""
+
+            # Special handling for Due_Date field
+            if field == "Due_Date":
+                if self.analysis_completed_var.get():
+                    # Analysis is completed, set Due_Date to NULL
+                    # Only add to update if current value is not already NULL
+                    if self.analysis_data and current_value is not None and current_value != "":
+                        print(f"Setting Due_Date to NULL for UNH# {unh_id} (analysis completed)")
+                        changes[field] = None  # This will set it to NULL in the database
+                elif hasattr(entry, 'get_date'):
+                    # Analysis not completed, get date from DateEntry
+                    try:
+                        new_value = entry.get_date().strftime('%Y-%m-%d')
+                        # If different from current, add to update
+                        if str(current_value) != new_value:
+                            print(f"Updating Due_Date to {new_value} for UNH# {unh_id}")
+                            changes[field] = new_value
+                    except Exception as e:
+                        print(f"Error getting date from DateEntry: {str(e)}")
+            else:
+                # Regular fields
+                new_value = entry.get().strip()
+
+                # If there's a difference, add to the update
+                if str(current_value) != new_value:
+                    # Handle empty strings as NULL for appropriate fields
+                    changes[field] = new_value or None
+
+        if not self.analysis_data:
+            # A new row only needs the fields that actually have a value
+            changes = {field: value for field, value in changes.items() if value is not None}
+        return changes
+
     def _update_analysis_record(self, cursor):
         """Update a record in the WRRC sample analysis requested table."""
         try:
@@ -1170,76 +4944,22 @@ class SampleTrackerApp(ctk.CTk):
             if not unh_id:
                 return False
 
-            # Check if we have analysis data
+            # No analysis row yet: INSERT one if there are any values
             if not self.analysis_data:
-                # Check if we have any new values to insert
-                has_new_values = False
-                for field, entry in self.analysis_entries.items():
-                    if field == "Due_Date":
-                        # If analysis is not completed, check if date entry has value
-                        if not self.analysis_completed_var.get() and hasattr(entry, 'get_date'):
-                            has_new_values = True
-                            break
-                    elif entry.get().strip():
-                        has_new_values = True
-                        break
-
-                if has_new_values:
-                    # Need to INSERT a new record
-                    return self._insert_new_analysis_record(cursor, unh_id)
-                else:
-                    return False
+                return self._insert_new_analysis_record(cursor, unh_id)
 
             # We have existing analysis data, so update it
-            set_clauses = []
-            params = []
-
-            for field, entry in self.analysis_entries.items():
-                # Get the current value from the analysis data
-                current_value = self.analysis_data.get(field, "")
-
-                # Special handling for Due_Date field
-                if field == "Due_Date":
-                    if self.analysis_completed_var.get():
-                        # Analysis is completed, set Due_Date to NULL
-                        # Only add to update if current value is not already NULL
-                        if current_value is not None and current_value != "":
-                            print(f"Setting Due_Date to NULL for UNH# {unh_id} (analysis completed)")
-                            set_clauses.append(f"[{field}] = ?")
-                            params.append(None)  # This will set it to NULL in the database
-                    elif hasattr(entry, 'get_date'):
-                        # Analysis not completed, get date from DateEntry
-                        try:
-                            new_value = entry.get_date().strftime('%Y-%m-%d')
-                            # If different from current, add to update
-                            if str(current_value) != new_value:
-                                print(f"Updating Due_Date to {new_value} for UNH# {unh_id}")
-                                set_clauses.append(f"[{field}] = ?")
-                                params.append(new_value)
-                        except Exception as e:
-                            print(f"Error getting date from DateEntry: {str(e)}")
-                else:
-                    # Regular fields
-                    new_value = entry.get().strip()
-
-                    # If there's a difference, add to the update
-                    if str(current_value) != new_value:
-                        set_clauses.append(f"[{field}] = ?")
-
-                        # Handle empty strings as NULL for appropriate fields
-                        if not new_value:
-                            params.append(None)
-                        else:
-                            params.append(new_value)
+            changes = self._collect_analysis_changes()
 
             # If no changes, return early
-            if not set_clauses:
+            if not changes:
                 print("No changes to update in analysis data")
                 return False
 
             # Build the query
+            set_clauses = [f"[{field}] = ?" for field in changes]
+            params = list(changes.values()) + [unh_id]
             query = f"UPDATE [WRRC sample analysis requested] SET {', '.join(set_clauses)} WHERE [UNH#] = ?"
-            params.append(unh_id)
 
             print(f"Analysis update query: {query}")
             print(f"Parameters: {params}")
@@ -1260,6 +4980,10 @@ class SampleTrackerApp(ctk.CTk):
             messagebox.showwarning("No Record", "No record is selected for editing.")
             return
 
+        if self.write_behind_var.get() and (self.write_behind is not None or self._enable_write_behind()):
+            self._queue_edited_record()
+            return
+
         try:
             # Get connection to database
             conn = self._get_db_connection()
@@ -1282,6 +5006,7 @@ class SampleTrackerApp(ctk.CTk):
             if success_sample or success_analysis:
                 # Commit transaction
                 conn.commit()
+                self._refresh_analysis_index([self.selected_record.get("UNH#", "")])
                 self.edit_status_var.set("Record updated successfully")
 
                 # Show the "Saved" message
@@ -1291,7 +5016,7 @@ class SampleTrackerApp(ctk.CTk):
                 self.after(3000, lambda: self.saved_label.pack_forget())
 
                 # Refresh the data
-                self.data = self._load_data_from_database()
+                self._reload_data()
                 self.populate_treeview(self.data)
 
                 # Switch back to search tab after a brief delay to show the "Saved" message
@@ -1318,6 +5043,151 @@ class SampleTrackerApp(ctk.CTk):
             except:
                 pass
 
+    def _queue_edited_record(self):
+        """Write-behind save: journal the changes and let the background flusher write them."""
+        unh_id = self.selected_record.get("UNH#", "")
+        try:
+            sample_changes = self._collect_sample_info_changes()
+            analysis_changes = self._collect_analysis_changes()
+            if not unh_id or not (sample_changes or analysis_changes):
+                self.edit_status_var.set("No changes were made")
+                return
+
+            self.write_behind.enqueue(unh_id, sample_changes, analysis_changes)
+        except Exception as e:
+            print(f"Error queuing edited record: {str(e)}")
+            print(traceback.format_exc())
+            self.edit_status_var.set(f"Error: {str(e)}")
+            messagebox.showerror("Save Error", f"Error saving changes to the local journal: {str(e)}")
+            return
+
+        # The form now reflects what will be written, so the next save only diffs newer edits
+        for field, value in sample_changes.items():
+            self.selected_record[field] = "" if value is None else value
+        self.analysis_data = dict(self.analysis_data or {})
+        self.analysis_data.update(analysis_changes)
+
+        self.edit_status_var.set(f"Queued ({self.write_behind.pending_count()} samples waiting to be written)")
+        self.saved_label.pack(side="right", padx=20)
+        self.after(3000, lambda: self.saved_label.pack_forget())
+        self._update_write_behind_status()
+
+    def _apply_pending_edits(self, unh_id):
+        """Overlay queued but unflushed edits onto the record being opened in the Edit tab."""
+        if self.write_behind is None:
+            return
+        pending = self.write_behind.pending_changes(unh_id)
+        if not pending:
+            return
+        for field, value in pending["sample"].items():
+            self.selected_record[field] = "" if value is None else value
+        if pending["analysis"]:
+            self.analysis_data = dict(self.analysis_data or {})
+            self.analysis_data.update(pending["analysis"])
+        print(f"Applied queued edits to UNH# {unh_id}")
+
+    def _apply_flushed_edits(self, flushed):
+        """
+        Copy sample-info changes the write-behind flusher committed into self.data and the Search
+        rows showing them, instead of re-reading the whole sample table.
+        """
+        if self.data.empty or "UNH#" not in self.data.columns:
+            return
+        unh = self.data["UNH#"].map(normalize_unh).to_numpy()
+        changed = {}
+        for unh_id, entry in flushed.items():
+            fields = {field: "" if value is None else str(value)
+                      for field, value in entry["sample"].items() if field in self.data.columns}
+            if not fields:
+                continue
+            positions = np.flatnonzero(unh == normalize_unh(unh_id))
+            for field, value in fields.items():
+                self.data.iloc[positions, self.data.columns.get_loc(field)] = value
+            for pos in positions:
+                changed[int(pos)] = fields
+        if not changed:
+            return
+
+        # Sort keys are per data version
+        self.data_version += 1
+        for item, pos in self._tree_item_positions.items():
+            fields = changed.get(pos)
+            if fields and self.tree.exists(item):
+                for field, value in fields.items():
+                    self.tree.set(item, field, value)
+        print(f"Applied {len(changed)} flushed rows to the in-memory data")
+
+    def _write_behind_journal_path(self):
+        return get_local_data_path(f"pending_edits_{machine_user_tag()}.journal")
+
+    def _start_write_behind(self):
+        """Create and start the write-behind queue; returns False (saves stay synchronous) if it can't."""
+        try:
+            self.write_behind = WriteBehindQueue(self._write_behind_journal_path(),
+                                                 lambda: connect_to_database(self.db_path, self.password))
+            self.write_behind.start()
+            return True
+        except Exception as e:
+            print(f"Write-behind saves unavailable: {e}")
+            print(traceback.format_exc())
+            self.write_behind = None
+            self.write_behind_error = str(e)
+            return False
+
+    def _enable_write_behind(self):
+        """Start the queue for the write-behind checkbox, falling back to synchronous saves with a warning."""
+        if self.write_behind is not None or self._start_write_behind():
+            return True
+        self.write_behind_var.set(False)
+        messagebox.showwarning("Write-behind Unavailable",
+                               f"Could not open the local edit journal ({self.write_behind_error}).\n"
+                               "Changes will be saved directly to the database.")
+        return False
+
+    def _on_write_behind_toggled(self):
+        if self.write_behind_var.get():
+            self._enable_write_behind()
+        self._update_write_behind_status()
+
+    def _update_write_behind_status(self):
+        if self.write_behind is None:
+            self.write_behind_status_var.set("")
+            self.write_behind_retry_button.pack_forget()
+            return
+        pending = self.write_behind.pending_count()
+        if self.write_behind.last_error:
+            self.write_behind_status_var.set(
+                f"{pending} queued edits not yet written - last attempt failed: {self.write_behind.last_error}")
+            self.write_behind_retry_button.pack(side="left", padx=10)
+        else:
+            self.write_behind_status_var.set(f"{pending} queued edits waiting to be written" if pending else "")
+            self.write_behind_retry_button.pack_forget()
+
+    def _poll_write_behind(self):
+        """Pick up flush results from the write-behind thread (Tk is only touched here)."""
+        if self.write_behind is None:
+            self.after(1000, self._poll_write_behind)
+            return
+        flushed = {}
+        try:
+            while True:
+                event = self.write_behind.events.get_nowait()
+                if event[0] == "flushed":
+                    flushed.update(event[1])
+                else:
+                    _, error, retry_in, pending = event
+                    self.edit_status_var.set(
+                        f"Background save failed; {pending} samples kept in the local journal, "
+                        f"retrying in {retry_in:.0f}s")
+        except queue.Empty:
+            pass
+
+        if flushed:
+            self.after_batch_update(list(flushed))
+            self._apply_flushed_edits(flushed)
+        self._update_write_behind_status()
+        self.after(1000, self._poll_write_behind)
+
     def toggle_due_date_state(self):
         """Toggle the due date entry state based on the completed checkbox."""
         try:
@@ -1371,18 +5241,7 @@ class SampleTrackerApp(ctk.CTk):
         Returns a dictionary with table names as keys and boolean values indicating data existence.
         """
         # Mapping of analysis fields to actual table names
-        table_mapping = {
-            "NPOC": "WRRC NPOC Data",
-            "NO3_Cd": "WRRC NO3_Cd Data",
-            "Cation": "WRRC Cation Data",
-            "Anion": "WRRC Anion Data",
-            "PO4": "WRRC PO4 Data",
-            "SiO2": "WRRC SiO2 data",  # Note lowercase 'data'
-            "TDN": "WRRC TDN Data",
-            "TP": "WRRC TP Data",
-            "NH4": "WRRC NH4 Data",
-            "DIC": "WRRC DIC Data"
-        }
+        table_mapping = MEASUREMENT_TABLES
 
         # Initialize all to false
         related_data = {key: False for key in table_mapping.keys()}
@@ -1419,6 +5278,35 @@ class SampleTrackerApp(ctk.CTk):
 
         return related_data
 
+    def fetch_record_bundle(self, unh_id, include_flags=True):
+        """
+        Fetch the analysis-requested row and data-existence flags for one sample in a single
+        round trip over the shared connection.
+        Returns (analysis_dict or None, related_data dict). Falls back to the per-table
+        queries if the combined query fails (e.g. a measurement table is missing).
+        """
+        start = time.perf_counter()
+        conn = self._get_shared_connection()
+        if conn:
+            try:
+                bundle = query_record_bundle(conn, unh_id, include_flags)
+                if bundle is not None:
+                    analysis_dict, related_data = bundle
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    print(f"Fetched record bundle for UNH# {unh_id} in {elapsed_ms:.1f} ms (1 query)")
+                    return analysis_dict, related_data
+
+                print(f"No sample info row for UNH# {unh_id}; using per-table lookups")
+            except Exception as e:
+                print(f"Combined record fetch failed, falling back to per-table lookups: {e}")
+                self._close_shared_connection()
+
+        self.load_analysis_data(unh_id)
+        related_data = self.check_related_data(unh_id) if include_flags else {}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Fetched record for UNH# {unh_id} in {elapsed_ms:.1f} ms (fallback path)")
+        return self.analysis_data, related_data
+
     # Add the load_analysis_data method
     def load_analysis_data(self, unh_id):
         """Load analysis data for the given UNH ID."""
@@ -1456,50 +5344,46 @@ class SampleTrackerApp(ctk.CTk):
             print(f"Error loading analysis data: {str(e)}")
             self.analysis_data = None
 
-    def _update_sample_info_record(self, cursor):
-        """Update a record in the WRRC sample info table."""
-        try:
-            # Get the primary key value
-            unh_id = self.selected_record.get("UNH#", "")
-            if not unh_id:
-                return False
-
-            # Build SET clause and parameters for the UPDATE statement
-            set_clauses = []
-            params = []
+    def _collect_sample_info_changes(self):
+        """Sample-info fields that differ from the loaded record, as {field: new value}."""
+        changes = {}
+        for field, entry in self.sample_info_entries.items():
+            # Skip UNH# as it's our key
+            if field == "UNH#":
+                continue
 
-            for field, entry in self.sample_info_entries.items():
-                # Skip UNH# as it's our key
-                if field == "UNH#":
-                    continue
+            # Get the current value and the new value
+            current_value = self.selected_record.get(field, "")
+            new_value = entry.get().strip()
 
-                # Get the current value and the new value
-                current_value = self.selected_record.get(field, "")
-                new_value = entry.get().strip()
+            # If there's a difference, add to the update
+            if str(current_value) != new_value:
+                # Handle empty strings as NULL for certain fields
+                if not new_value and field in SAMPLE_INFO_NULLABLE_FIELDS:
+                    changes[field] = None
+                else:
+                    changes[field] = new_value
+        return changes
 
-                # If there's a difference, add to the update
-                if str(current_value) != new_value:
-                    # Handle special fields
-                    if field == "DO%":
-                        set_clauses.append("[DO%] = ?")
-                    else:
-                        set_clauses.append(f"[{field}] = ?")
+    def _update_sample_info_record(self, cursor):
+        """Update a record in the WRRC sample info table."""
+        try:
+            # Get the primary key value
+            unh_id = self.selected_record.get("UNH#", "")
+            if not unh_id:
+                return False
 
-                    # Handle empty strings as NULL for certain fields
-                    if not new_value and field in ['Collection_Date', 'Collection_Time', 'pH', 'Cond', 'Spec_Cond',
-                                                   'DO_Conc', 'DO%', 'Temperature', 'Salinity']:
-                        params.append(None)
-                    else:
-                        params.append(new_value)
+            changes = self._collect_sample_info_changes()
 
             # If no changes, return early
-            if not set_clauses:
+            if not changes:
                 print("No changes to update in sample info")
                 return False
 
             # Build the query
+            set_clauses = [f"[{field}] = ?" for field in changes]
+            params = list(changes.values()) + [unh_id]
             query = f"UPDATE [WRRC sample info] SET {', '.join(set_clauses)} WHERE [UNH#] = ?"
-            params.append(unh_id)
 
             print(f"Sample update query: {query}")
             print(f"Parameters: {params}")
@@ -1521,6 +5405,24 @@ class SampleTrackerApp(ctk.CTk):
         for item in self.all_samples_tree.get_children():
             self.all_samples_tree.delete(item)
 
+        if self.analysis_index.loaded:
+            # Served from the in-memory analysis-requested cache
+            rows = [
+                (unh_id, label.get('Sample_Name'), label.get('Project'), due_date)
+                for unh_id, due_date, label in self.analysis_index.due_date_rows()
+            ]
+            rows.sort(key=lambda r: (self._normalize_due_date(r[3]) or datetime.date.max, str(r[3])))
+            for unh_id, sample_name, project, due_date in rows:
+                if isinstance(due_date, (datetime.datetime, datetime.date)):
+                    formatted_due_date = due_date.strftime('%Y-%m-%d')
+                else:
+                    formatted_due_date = str(due_date)
+                self.all_samples_tree.insert("", "end", values=[
+                    str(unh_id), str(sample_name), str(project), formatted_due_date
+                ])
+            print(f"Populated 'All Samples with Due Dates' from cache ({len(rows)} rows).")
+            return
+
         conn = self._get_db_connection()
         if not conn:
             return
@@ -1568,11 +5470,32 @@ class SampleTrackerApp(ctk.CTk):
             if conn:
                 conn.close()
 
-    def _group_samples_by_date(self):
-        """Group rows by normalized Due_Date -> list[Series]."""
+    def _group_samples_by_date(self, start=None, end=None):
+        """
+        Group samples by normalized Due_Date -> list of records with UNH#, Due_Date, Sample_Name,
+        Project and Sub_Project, limited to start..end when given. Served from the analysis
+        cache's due-date index; without it, the database query runs once per data version.
+        """
+        if self.analysis_index.loaded:
+            groups = self.analysis_index.due_dates_between(start, end)
+            print(f"Found {sum(len(v) for v in groups.values())} samples across {len(groups)} dates "
+                  f"from {start} to {end} (cached).")
+            return groups
+
+        cached = self._due_date_groups
+        if cached is None or cached[0] != self.data_version:
+            cached = (self.data_version, self._query_samples_by_date())
+            self._due_date_groups = cached
+        groups = cached[1]
+        if start is None and end is None:
+            return groups
+        return {day: rows for day, rows in groups.items()
+                if (start is None or day >= start) and (end is None or day <= end)}
+
+    def _query_samples_by_date(self):
+        """Read every sample with a Due_Date from the database, grouped by normalized date."""
         print("Grouping samples by Due_Date...")
         groups = {}
-
         conn = self._get_db_connection()
         if not conn:
             return groups
@@ -1590,16 +5513,15 @@ class SampleTrackerApp(ctk.CTk):
             cursor.execute(query)
 
             for row in cursor.fetchall():
-                due_date = self._normalize_due_date(row[1])
+                due_date = normalize_due_date(row[1])
                 if due_date:
-                    sample_dict = {
+                    groups.setdefault(due_date, []).append({
                         'UNH#': row[0],
                         'Due_Date': row[1],
                         'Sample_Name': row[2],
                         'Project': row[3],
                         'Sub_Project': row[4]
-                    }
-                    groups.setdefault(due_date, []).append(pd.Series(sample_dict))
+                    })
 
             cursor.close()
             conn.close()
@@ -1679,6 +5601,7 @@ class SampleTrackerApp(ctk.CTk):
         # Month grid
         self.month_grid_frame = ttk.Frame(outer)
         self.month_grid_frame.pack(fill='both', expand=True)
+        self._build_calendar_grid()
 
         # -- New section for the all samples treeview --
         all_samples_frame = ctk.CTkFrame(outer)
@@ -1726,6 +5649,10 @@ class SampleTrackerApp(ctk.CTk):
         rowid = self.tree.identify_row(event.y)
         region = self.tree.identify("region", event.x, event.y)
         print(f"Click at row={rowid}, col={col}, region={region}")
+        if region == "heading":
+            # Shift+click adds the column as a secondary sort key
+            self.on_heading_click(col, add_key=bool(event.state & 0x0001))
+            return "break"
         if not rowid or region not in ("cell", "tree"):
             return
 
@@ -1783,89 +5710,25 @@ class SampleTrackerApp(ctk.CTk):
         dialog = BatchUpdateDialog(self, selected_list)
         # Don't use wait_window as it can cause issues with customtkinter
 
-    def perform_batch_update(self, samples, analysis_type, status, notes, due_date_done):
-        """
-        Perform the actual batch update in the database,
-        with an option to mark the Due_Date as complete.
-        """
-        print(f"Performing batch update for {len(samples)} samples")
-        print(f"Analysis: {analysis_type}, Status: {status}")
-
-        conn = self._get_db_connection()
-        if not conn:
-            return 0
-
-        cursor = conn.cursor()
-        success_count = 0
-
-        try:
-            if conn.autocommit:
-                conn.autocommit = False
-
-            for sample in samples:
-                unh_id = sample.get('UNH#', '')
-                if not unh_id:
-                    continue
-
-                # Build the SET clauses and parameters
-                set_clauses = []
-                params = []
-
-                # Add the analysis update clause
-                if analysis_type and status:
-                    set_clauses.append(f"[{analysis_type}] = ?")
-                    params.append(status)
-
-                # Add the due date update clause if checked
-                if due_date_done:
-                    set_clauses.append("Due_Date = ?")
-                    params.append(None)  # Set to NULL in the database
-
-                # If no fields are to be updated, skip this sample
-                if not set_clauses:
-                    print(f"No fields to update for UNH#: {unh_id}. Skipping.")
-                    continue
-
-                # Check if a record for the UNH# already exists
-                check_query = "SELECT COUNT(*) FROM [WRRC sample analysis requested] WHERE [UNH#] = ?"
-                cursor.execute(check_query, (unh_id,))
-                record_exists = cursor.fetchone()[0] > 0
-
-                if record_exists:
-                    # A record exists, so perform an UPDATE
-                    print(f"Updating existing record for UNH#: {unh_id}")
-                    update_query = f"UPDATE [WRRC sample analysis requested] SET {', '.join(set_clauses)} WHERE [UNH#] = ?"
-                    final_params = params + [unh_id]
-                    cursor.execute(update_query, final_params)
-                else:
-                    # No record exists, so perform an INSERT
-                    print(f"Inserting new record for UNH#: {unh_id}")
-                    columns = [f"[UNH#]"] + [clause.split('=')[0].strip() for clause in set_clauses]
-                    placeholders = ['?'] * len(columns)
-                    final_params = [unh_id] + params
-
-                    insert_query = f"INSERT INTO [WRRC sample analysis requested] ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
-                    cursor.execute(insert_query, final_params)
-
-                success_count += 1
-
-            conn.commit()
-            print(f"Successfully processed {success_count} samples.")
-
-        except Exception as e:
-            conn.rollback()
-            print(f"Error during batch update: {str(e)}")
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+    def build_batch_updates(self, analysis_type, status, due_date_done):
+        """Column -> value changes for a batch update; the same values apply to every selected sample."""
+        updates = {}
+        if analysis_type and status:
+            updates[analysis_type] = status
+        if due_date_done:
+            updates["Due_Date"] = None  # Set to NULL in the database
+        return updates
 
-        return success_count
+    def after_batch_update(self, unh_ids):
+        """Keep the in-memory caches in sync with rows a batch update committed."""
+        if not unh_ids:
+            return
+        self._refresh_analysis_index(unh_ids)
 
     def refresh_data(self):
         """Refresh the data from the database and update the display."""
         self.selected_samples.clear()
-        self.data = self._load_data_from_database()
+        self._reload_data(full=True)
         self.show_all()
         self.update_selected_count()
         self._render_calendar_month()
@@ -1885,9 +5748,60 @@ class SampleTrackerApp(ctk.CTk):
             self.tree.selection_set(item_id)
             self.edit_selected_record()
         else:
-            # Multiple samples selected - could open batch edit dialog
-            messagebox.showinfo("Multiple Selection",
-                                f"Batch editing {len(self.selected_samples)} samples is not yet implemented. Please select one sample at a time for detailed editing.")
+            # Multiple samples selected - open the batch editor
+            BatchEditDialog(self, list(self.selected_samples.values()))
+
+    def build_batch_edit_changes(self, samples, sample_values, analysis_values):
+        """
+        Per-sample change sets for a batch edit, skipping values a sample already has.
+        Empty values become NULL (for sample info, only in the fields the Edit tab treats that way).
+        """
+        def current_text(value):
+            if value is None or (isinstance(value, float) and pd.isna(value)):
+                return ""
+            if isinstance(value, (datetime.datetime, datetime.date, pd.Timestamp)):
+                return value.strftime('%Y-%m-%d')
+            text = str(value).strip()
+            return "" if text in ("nan", "None", "NaT") else text
+
+        row_changes = {}
+        for sample in samples:
+            unh_id = normalize_unh(sample.get('UNH#', ''))
+            if not unh_id:
+                continue
+
+            sample_changes = {}
+            for field, new_value in sample_values.items():
+                if current_text(sample.get(field)) != new_value:
+                    if not new_value and field in SAMPLE_INFO_NULLABLE_FIELDS:
+                        sample_changes[field] = None
+                    else:
+                        sample_changes[field] = new_value
+
+            # Without the index we can't see current analysis values, so every field is written
+            analysis_row = self.analysis_index.get(unh_id) if self.analysis_index.loaded else None
+            analysis_changes = {}
+            for field, new_value in analysis_values.items():
+                if analysis_row is None or current_text(analysis_row.get(field)) != new_value:
+                    analysis_changes[field] = new_value or None
+            if analysis_row is None and self.analysis_index.loaded:
+                # No analysis row yet: inserting all-NULL values would add nothing useful
+                analysis_changes = {k: v for k, v in analysis_changes.items() if v is not None}
+
+            if sample_changes or analysis_changes:
+                row_changes[unh_id] = {"sample": sample_changes, "analysis": analysis_changes}
+        return row_changes
+
+    def _show_data_exists_labels(self, related_data):
+        """Show/hide the Edit tab's data-exists labels from {table_key: bool} flags."""
+        for field, label in self.data_exists_labels.items():
+            table_name = self.data_table_mapping.get(field)
+            if table_name and related_data.get(table_name, False):
+                # Data exists - show the label
+                label.pack(side="left", padx=(3, 0))
+            else:
+                # No data - hide the label
+                label.pack_forget()
 
     # Add the populate_edit_form method
     def populate_edit_form(self):
@@ -1924,17 +5838,10 @@ class SampleTrackerApp(ctk.CTk):
 
         # Check for related data if we have a UNH ID
         if unh_id:
-            related_data = self.check_related_data(unh_id)
-
-            # Show/hide data exists labels based on results
-            for field, label in self.data_exists_labels.items():
-                table_name = self.data_table_mapping.get(field)
-                if table_name and related_data.get(table_name, False):
-                    # Data exists - show the label
-                    label.pack(side="left", padx=(3, 0))
-                else:
-                    # No data - hide the label
-                    label.pack_forget()
+            related_data = self.related_data
+            if related_data is None:
+                related_data = self.check_related_data(unh_id)
+            self._show_data_exists_labels(related_data)
 
         # Populate analysis entries if we have analysis data
         if self.analysis_data:
@@ -2042,12 +5949,26 @@ class SampleTrackerApp(ctk.CTk):
         # Store the selected record
         self.selected_record = record_dict
 
-        # Load analysis data for this record
+        # Load analysis data and data-existence flags for this record in one round trip
+        start = time.perf_counter()
         unh_id = record_dict.get("UNH#", "")
-        if unh_id:
-            self.load_analysis_data(unh_id)
+        if unh_id and self.analysis_index.loaded and self.existence_matrix.loaded:
+            # Both caches are in memory: no database round trip at all
+            self.analysis_data = self.analysis_index.get(unh_id)
+            self.related_data = self.existence_matrix.flags(unh_id)
+        elif unh_id and self.existence_matrix.loaded:
+            # Indicators come straight from the cached matrix; only the analysis row is fetched
+            self.related_data = self.existence_matrix.flags(unh_id)
+            self.analysis_data, _ = self.fetch_record_bundle(unh_id, include_flags=False)
+        elif unh_id:
+            self.analysis_data, self.related_data = self.fetch_record_bundle(unh_id)
+            self.existence_matrix.update_flags(unh_id, self.related_data)
         else:
             self.analysis_data = None
+            self.related_data = None
+
+        if unh_id:
+            self._apply_pending_edits(unh_id)
 
         # Switch to the Edit tab
         self.tabview.set("Edit")
@@ -2055,6 +5976,10 @@ class SampleTrackerApp(ctk.CTk):
         # Populate the edit form
         self.populate_edit_form()
 
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Edit tab opened for UNH# {unh_id} in {elapsed_ms:.1f} ms")
+        self.edit_status_var.set(f"{self.edit_status_var.get()} (loaded in {elapsed_ms:.0f} ms)")
+
     def create_search_tab(self):
         """Create the search tab contents with batch update functionality."""
         search_tab = self.tabview.tab("Search")
@@ -2103,6 +6028,18 @@ class SampleTrackerApp(ctk.CTk):
         )
         self.filter_by_date_checkbox.pack(side="left", padx=10, pady=5)
 
+        has_data_label = ctk.CTkLabel(filter_frame, text="Has data:")
+        has_data_label.pack(side="left", padx=(20, 5), pady=5)
+
+        self.has_data_filter_menu = ctk.CTkOptionMenu(
+            filter_frame,
+            variable=self.has_data_filter_var,
+            values=self._existence_filter_options(),
+            command=lambda _choice: self.refresh_search(),
+            width=200
+        )
+        self.has_data_filter_menu.pack(side="left", padx=5, pady=5)
+
         # Clear Search and Show All Buttons
         button_frame = ctk.CTkFrame(search_frame)
         button_frame.grid(row=3, column=0, columnspan=3, pady=10)
@@ -2164,8 +6101,9 @@ class SampleTrackerApp(ctk.CTk):
         treeview_frame = ctk.CTkFrame(search_tab)
         treeview_frame.pack(fill="both", expand=True, pady=10)
 
-        # Add checkbox column to the columns
-        columns = ['Select'] + self.data.columns.tolist()
+        # Add checkbox column to the columns, and "has data" columns after the data columns
+        self.has_data_columns = [f"__has_{key}" for key in MEASUREMENT_TABLES]
+        columns = ['Select'] + self.data.columns.tolist() + self.has_data_columns
         self.tree = ttk.Treeview(treeview_frame, columns=columns, show='headings', style="mystyle.Treeview")
 
         # Configure columns
@@ -2176,6 +6114,10 @@ class SampleTrackerApp(ctk.CTk):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=150, minwidth=50)
 
+        for col in self.has_data_columns:
+            self.tree.heading(col, text=col[len("__has_"):])
+            self.tree.column(col, width=70, minwidth=40, anchor='center')
+
         # Add scrollbars
         y_scrollbar = ctk.CTkScrollbar(treeview_frame, command=self.tree.yview)
         y_scrollbar.pack(side="right", fill="y")
@@ -2196,11 +6138,118 @@ class SampleTrackerApp(ctk.CTk):
         self.tree.bind("<Double-1>", lambda event: self.edit_selected_record() if self.tree.identify_column(
             event.x) != '#1' else None)
 
+    def _get_sort_ranks(self, column, desc=False):
+        """
+        Return (ranks, order) for a column of self.data, computed once per data version.
+        ranks[pos] is the dense sort rank of row pos; order is the full ascending permutation.
+        With desc=True both are for a descending sort (stable, empty values still last).
+        """
+        if self._sort_cache["version"] != self.data_version:
+            self._sort_cache = {"version": self.data_version, "ranks": {}, "orders": {}, "desc_orders": {}}
+
+        # "Has data" columns also depend on the existence matrix version
+        cache_key = column
+        if column.startswith("__has_"):
+            cache_key = f"{column}@{self.existence_matrix.version}"
+
+        if cache_key not in self._sort_cache["ranks"]:
+            start = time.perf_counter()
+            if column.startswith("__has_"):
+                mask = self.existence_matrix.has_data_mask(self.data["UNH#"], column[len("__has_"):])
+                ranks = np.where(mask.to_numpy(), 1, 2).astype(np.int64)
+            else:
+                ranks = compute_sort_ranks(self.data[column].to_numpy(), column)
+            self._sort_cache["ranks"][cache_key] = ranks
+            self._sort_cache["orders"][cache_key] = np.argsort(ranks, kind='stable')
+            print(f"Computed sort keys for '{column}' in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        ranks = self._sort_cache["ranks"][cache_key]
+        if not desc:
+            return ranks, self._sort_cache["orders"][cache_key]
+        desc_ranks = descending_sort_ranks(ranks)
+        if cache_key not in self._sort_cache["desc_orders"]:
+            self._sort_cache["desc_orders"][cache_key] = np.argsort(desc_ranks, kind='stable')
+        return desc_ranks, self._sort_cache["desc_orders"][cache_key]
+
+    def _sorted_positions(self, positions):
+        """Order row positions of self.data according to the active sort columns."""
+        positions = np.asarray(positions, dtype=np.int64)
+        sort_columns = [(col, desc) for col, desc in self.sort_columns
+                        if col in self.data.columns or (col.startswith("__has_") and "UNH#" in self.data.columns)]
+        if not sort_columns or len(positions) == 0:
+            return positions
+
+        if len(sort_columns) == 1:
+            # Single key: walk the precomputed permutation and keep the rows on display
+            col, desc = sort_columns[0]
+            _, order = self._get_sort_ranks(col, desc)
+            return order[np.isin(order, positions)]
+
+        # Multiple keys: lexsort on the integer ranks (last key is the primary one for lexsort)
+        keys = []
+        for col, desc in reversed(sort_columns):
+            ranks, _ = self._get_sort_ranks(col, desc)
+            keys.append(ranks[positions])
+        return positions[np.lexsort(keys)]
+
+    def on_heading_click(self, tree_column, add_key=False):
+        """Sort the Search treeview by the clicked column; Shift+click adds a secondary key."""
+        try:
+            col_index = int(str(tree_column).lstrip('#')) - 1
+            columns = list(self.tree["columns"])
+            if col_index < 0 or col_index >= len(columns):
+                return
+            column = columns[col_index]
+        except (ValueError, TypeError):
+            return
+
+        if column == 'Select' or (column not in self.data.columns and column not in self.has_data_columns):
+            return
+
+        existing = [i for i, (col, _) in enumerate(self.sort_columns) if col == column]
+        if add_key:
+            if existing:
+                i = existing[0]
+                self.sort_columns[i] = (column, not self.sort_columns[i][1])
+            else:
+                self.sort_columns.append((column, False))
+        else:
+            descending = (len(self.sort_columns) == 1 and existing and not self.sort_columns[0][1])
+            self.sort_columns = [(column, bool(descending))]
+
+        print(f"Sorting by: {self.sort_columns}")
+        self._apply_sort_to_tree()
+
+    def _apply_sort_to_tree(self):
+        """Reorder the existing treeview items in place according to the active sort."""
+        start = time.perf_counter()
+        items = list(self._tree_item_positions.keys())
+        if items:
+            positions = [self._tree_item_positions[item] for item in items]
+            by_position = {pos: item for item, pos in zip(items, positions)}
+            for index, pos in enumerate(self._sorted_positions(positions)):
+                self.tree.move(by_position[int(pos)], "", index)
+
+        self._update_sort_headings()
+        print(f"Sorted {len(items)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _update_sort_headings(self):
+        """Show sort direction arrows (and key order for multi-column sorts) in the headings."""
+        multi = len(self.sort_columns) > 1
+        active = {col: (i + 1, desc) for i, (col, desc) in enumerate(self.sort_columns)}
+        for col in self.data.columns.tolist() + self.has_data_columns:
+            text = col[len("__has_"):] if col.startswith("__has_") else col
+            if col in active:
+                order, desc = active[col]
+                text = f"{text} {'▼' if desc else '▲'}{order if multi else ''}"
+            self.tree.heading(col, text=text)
+
     def populate_treeview(self, df):
         """Populate the treeview with data from the DataFrame including checkbox column."""
         # Clear the current content of the treeview
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._tree_item_positions = {}
 
         # Clear selected samples
         self.selected_samples.clear()
@@ -2209,8 +6258,24 @@ class SampleTrackerApp(ctk.CTk):
             print("No data to populate treeview")
             return
 
+        # Map result rows back to their positions in self.data so sorting can use the cached ranks
+        positions = self.data.index.get_indexer(df.index)
+        if self.sort_columns and (positions >= 0).all() and pd.Index(positions).is_unique:
+            ordered = self._sorted_positions(positions)
+            df = df.iloc[pd.Index(positions).get_indexer(ordered)]
+            positions = ordered
+
+        # "Has data" marks for every row, computed per column from the existence matrix
+        if self.existence_matrix.loaded and "UNH#" in df.columns:
+            has_data_values = list(zip(*[
+                self.existence_matrix.has_data_mask(df["UNH#"], key).map({True: "✓", False: ""}).tolist()
+                for key in MEASUREMENT_TABLES
+            ]))
+        else:
+            has_data_values = [()] * len(df)
+
         # Insert rows into the treeview with checkbox column
-        for _, row in df.iterrows():
+        for pos, (_, row), has_data in zip(positions, df.iterrows(), has_data_values):
             # Convert any non-string values to strings
             values = []
             for val in row:
@@ -2220,8 +6285,10 @@ class SampleTrackerApp(ctk.CTk):
                     values.append(str(val))
 
             # Add checkbox (unchecked) as first value
-            all_values = [self.UNCHECKED] + values
-            self.tree.insert("", "end", values=all_values)
+            all_values = [self.UNCHECKED] + values + list(has_data)
+            item = self.tree.insert("", "end", values=all_values)
+            if pos >= 0:
+                self._tree_item_positions[item] = int(pos)
 
         print(f"Treeview populated with {len(df)} rows.")
         self.update_selected_count()
@@ -2232,6 +6299,7 @@ class SampleTrackerApp(ctk.CTk):
 
         # Apply date filter if checkbox is checked
         filtered_data = self.apply_date_filter(all_data)
+        filtered_data = self.apply_existence_filter(filtered_data)
 
         records_count = len(filtered_data)
         total_count = len(all_data)
@@ -2261,7 +6329,7 @@ class SampleTrackerApp(ctk.CTk):
 
         description_label = ctk.CTkLabel(
             instruction_frame,
-            text="Select an Excel file format to import. You can import from either a sample submission form or a log book file.",
+            text="Select a file to import. You can import from either a sample submission form (Excel) or a log book file (Excel, CSV or Parquet).",
             wraplength=800
         )
         description_label.pack(pady=5)
@@ -2372,19 +6440,26 @@ class SampleTrackerApp(ctk.CTk):
         )
         sub_preview_button.pack(side="left", padx=10)
 
-        sub_import_button = ctk.CTkButton(
+        self.sub_import_button = ctk.CTkButton(
             sub_button_frame,
             text="Import Data",
             command=self.import_excel_data
         )
-        sub_import_button.pack(side="left", padx=10)
+        self.sub_import_button.pack(side="left", padx=10)
+
+        self.sub_import_files_button = ctk.CTkButton(
+            sub_button_frame,
+            text="Import Multiple Files...",
+            command=self.import_multiple_submission_files
+        )
+        self.sub_import_files_button.pack(side="left", padx=10)
 
         # ================ LOG BOOK TAB CONTENT ================
         logbook_file_frame = ctk.CTkFrame(self.logbook_content_frame)
         logbook_file_frame.pack(fill="x", padx=10, pady=10)
 
         # File selection for log book format
-        log_file_label = ctk.CTkLabel(logbook_file_frame, text="Select Log Book Excel File:")
+        log_file_label = ctk.CTkLabel(logbook_file_frame, text="Select Log Book File (Excel, CSV or Parquet):")
         log_file_label.grid(row=0, column=0, padx=10, pady=10, sticky="w")
 
         self.logbook_file_path_var = ctk.StringVar()
@@ -2409,12 +6484,50 @@ class SampleTrackerApp(ctk.CTk):
         )
         log_preview_button.pack(side="left", padx=10)
 
-        log_import_button = ctk.CTkButton(
+        self.log_import_button = ctk.CTkButton(
             log_button_frame,
             text="Import Data",
             command=self.import_logbook_data
         )
-        log_import_button.pack(side="left", padx=10)
+        self.log_import_button.pack(side="left", padx=10)
+
+        # ================ IMPORT OPTIONS ================
+        # Shared by both formats
+        import_options_frame = ctk.CTkFrame(import_tab)
+        import_options_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.bulk_insert_var = ctk.BooleanVar(value=True)
+        bulk_insert_checkbox = ctk.CTkCheckBox(
+            import_options_frame,
+            text="Bulk insert (write rows in batches instead of one at a time)",
+            variable=self.bulk_insert_var
+        )
+        bulk_insert_checkbox.pack(side="left", padx=10, pady=5)
+
+        self.checkpoint_import_var = ctk.BooleanVar(value=False)
+        checkpoint_import_checkbox = ctk.CTkCheckBox(
+            import_options_frame,
+            text="Resumable (commit in chunks; re-run to resume after a failure)",
+            variable=self.checkpoint_import_var
+        )
+        checkpoint_import_checkbox.pack(side="left", padx=10, pady=5)
+
+        self.import_cancel_button = ctk.CTkButton(
+            import_options_frame,
+            text="Cancel Import",
+            width=120,
+            state="disabled",
+            command=self.cancel_import
+        )
+        self.import_cancel_button.pack(side="right", padx=10, pady=5)
+
+        self.import_progress_bar = ctk.CTkProgressBar(import_options_frame)
+        self.import_progress_bar.set(0)
+        self.import_progress_bar.pack(side="right", fill="x", expand=True, padx=10, pady=5)
+
+        self.import_stage_var = ctk.StringVar(value="")
+        import_stage_label = ctk.CTkLabel(import_options_frame, textvariable=self.import_stage_var)
+        import_stage_label.pack(side="right", padx=10)
 
         # ================ PREVIEW AREA ================
         # Common preview area using notebook with tabs
@@ -2433,6 +6546,14 @@ class SampleTrackerApp(ctk.CTk):
         self.sample_preview_frame = ttk.Frame(preview_notebook)
         preview_notebook.add(self.sample_preview_frame, text="Sample Information")
 
+        # Validation report tab
+        self.validation_preview_frame = ttk.Frame(preview_notebook)
+        preview_notebook.add(self.validation_preview_frame, text="Validation")
+
+        # Per-column summary tab
+        self.summary_preview_frame = ttk.Frame(preview_notebook)
+        preview_notebook.add(self.summary_preview_frame, text="Summary")
+
         # Create treeviews for previews
         self.project_tree = ttk.Treeview(self.project_preview_frame)
         self.project_tree.pack(fill="both", expand=True)
@@ -2460,7 +6581,37 @@ class SampleTrackerApp(ctk.CTk):
                                            command=self.sample_tree.xview)
         sample_x_scrollbar.pack(side="bottom", fill="x")
 
-        self.sample_tree.configure(yscrollcommand=sample_y_scrollbar.set, xscrollcommand=sample_x_scrollbar.set)
+        self.sample_tree.configure(xscrollcommand=sample_x_scrollbar.set)
+        # Big files are shown a page at a time; scrolling to the bottom loads the next page
+        self.sample_pager = PreviewPager(self.sample_tree, sample_y_scrollbar)
+
+        # Validation tree: one row per issue found before import
+        self.validation_tree = ttk.Treeview(self.validation_preview_frame, columns=VALIDATION_REPORT_COLUMNS,
+                                            show="headings")
+        for col in VALIDATION_REPORT_COLUMNS:
+            self.validation_tree.heading(col, text=col)
+            self.validation_tree.column(col, width=320 if col == "Message" else 100, minwidth=50)
+        self.validation_tree.tag_configure("error", foreground="#c0392b")
+        self.validation_tree.tag_configure("warning", foreground="#b9770e")
+
+        validation_y_scrollbar = ttk.Scrollbar(self.validation_preview_frame, orient="vertical",
+                                               command=self.validation_tree.yview)
+        validation_y_scrollbar.pack(side="right", fill="y")
+        self.validation_tree.pack(fill="both", expand=True)
+        self.validation_tree.configure(yscrollcommand=validation_y_scrollbar.set)
+
+        # Summary tree: row count, fill rate per column and requested count per analysis
+        self.summary_tree = ttk.Treeview(self.summary_preview_frame, columns=PREVIEW_SUMMARY_COLUMNS,
+                                         show="headings")
+        for col in PREVIEW_SUMMARY_COLUMNS:
+            self.summary_tree.heading(col, text=col)
+            self.summary_tree.column(col, width=200 if col == "Column" else 100, minwidth=50)
+
+        summary_y_scrollbar = ttk.Scrollbar(self.summary_preview_frame, orient="vertical",
+                                            command=self.summary_tree.yview)
+        summary_y_scrollbar.pack(side="right", fill="y")
+        self.summary_tree.pack(fill="both", expand=True)
+        self.summary_tree.configure(yscrollcommand=summary_y_scrollbar.set)
 
         # Status label for import
         self.import_status_var = ctk.StringVar()
@@ -2475,15 +6626,20 @@ class SampleTrackerApp(ctk.CTk):
         status_label.pack(pady=5)
 
     def browse_excel_file(self, file_type="submission"):
-        """Open a file dialog to select an Excel file for the specified import type."""
+        """Open a file dialog to select a source file for the specified import type."""
         if file_type == "submission":
             title = "Select Sample Submission Excel File"
+            filetypes = [("Excel Files", "*.xls *.xlsx")]
         else:  # logbook
-            title = "Select Log Book Excel File"
+            title = "Select Log Book File"
+            filetypes = [("Log Book Files", "*.xls *.xlsx *.csv *.tsv *.txt *.parquet *.pq"),
+                         ("Excel Files", "*.xls *.xlsx"),
+                         ("CSV Files", "*.csv *.tsv *.txt"),
+                         ("Parquet Files", "*.parquet *.pq")]
 
         file_path = filedialog.askopenfilename(
             title=title,
-            filetypes=[("Excel Files", "*.xls *.xlsx")]
+            filetypes=filetypes
         )
 
         if file_path:
@@ -2496,31 +6652,46 @@ class SampleTrackerApp(ctk.CTk):
             print(f"Selected {file_type} file: {file_path}")
 
     def preview_logbook_data(self):
-        """Preview the data from the selected Log Book Excel file."""
+        """Preview the data from the selected Log Book file."""
         file_path = self.logbook_file_path_var.get()
         if not file_path:
-            messagebox.showwarning("No File Selected", "Please select a Log Book Excel file first.")
+            messagebox.showwarning("No File Selected", "Please select a Log Book file first.")
             return
 
+        self.import_session = None
         try:
-            # Load the Excel file
+            # Load the file
             self.import_status_var.set("Loading Log Book file for preview...")
+            signature = file_signature(file_path)
+            column_map = self.import_column_map()
+            preview_started = False
+
+            def show_chunk(chunk, chunk_samples, rows_read, samples_found):
+                # The first rows are shown while the rest of the file is still being read
+                nonlocal preview_started
+                if not preview_started:
+                    self.populate_logbook_preview(chunk, chunk_samples)
+                    preview_started = True
+                else:
+                    self.append_logbook_preview(chunk_samples)
+                self.import_status_var.set(f"Reading Log Book... {rows_read} rows, {samples_found} samples so far")
+                self.update_idletasks()
 
-            # Try to read the Excel file
-            log_data = self.read_logbook_excel(file_path)
+            samples, rows_read = self.read_logbook_samples(file_path, on_chunk=show_chunk, column_map=column_map)
 
-            if log_data is None or log_data.empty:
-                self.import_status_var.set("Error: Could not read the Log Book Excel file or it's empty.")
+            if rows_read == 0:
+                self.import_status_var.set("Error: Could not read the Log Book file or it's empty.")
                 return
 
-            # Extract sample data for validation
-            samples = self.extract_logbook_data(log_data)
-
             # Update the status
-            self.import_status_var.set(f"Preview ready. Found {len(samples)} samples in Log Book format.")
-
-            # Populate the preview treeviews
-            self.populate_logbook_preview(log_data, samples)
+            self._populate_logbook_project_info(samples)
+            self.populate_preview_summary(self.sample_pager.counts)
+            report = validate_samples(samples)
+            self.import_session = ImportSession("logbook", signature, samples, rows_read=rows_read,
+                                                report=report, options=column_map)
+            counts = self.populate_validation_report(report)
+            self.import_status_var.set(f"Preview ready. Found {len(samples)} samples in Log Book format."
+                                       + self._validation_status(counts))
 
         except Exception as e:
             error_message = f"Error previewing Log Book file: {str(e)}"
@@ -2529,27 +6700,29 @@ class SampleTrackerApp(ctk.CTk):
             messagebox.showerror("Preview Error", error_message)
             self.import_status_var.set("Error previewing file. See console for details.")
 
-    def read_logbook_excel(self, file_path):
-        """Read the Log Book Excel file and return a DataFrame."""
-        try:
-            # Read the Excel file
-            log_data = pd.read_excel(file_path)
-
-            # Clean up the dataframe
-            log_data = log_data.fillna("")
+    def import_column_map(self):
+        """Header renames for CSV/Parquet/Excel Log Book sources from import_column_map.json, if present."""
+        return load_column_map(get_file_path(IMPORT_COLUMN_MAP_FILE))
 
-            # Print some info about the data
-            print(f"Log Book DataFrame has {len(log_data)} rows and {len(log_data.columns)} columns")
-            print(f"Column names: {log_data.columns.tolist()}")
-
-            return log_data
-
-        except Exception as e:
-            error_message = f"Error reading Log Book Excel file: {str(e)}"
-            print(error_message)
-            print(traceback.format_exc())
-            messagebox.showerror("Excel Import Error", error_message)
-            return None
+    def read_logbook_samples(self, file_path, on_chunk=None, column_map=None):
+        """
+        Stream a Log Book file chunk by chunk and extract its samples, without ever holding the
+        whole sheet as a DataFrame. Only the raw sheet is bounded this way: the extracted samples
+        are all kept, since validation and the import need them. on_chunk(chunk_df, chunk_samples,
+        rows_read, samples_found) is called after each chunk. Returns (samples, rows_read).
+        """
+        if column_map is None:
+            column_map = self.import_column_map()
+        samples = []
+        rows_read = 0
+        for chunk in iter_logbook_chunks(file_path, column_map=column_map):
+            chunk_samples = self.extract_logbook_data(chunk)
+            samples.extend(chunk_samples)
+            rows_read += len(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk, chunk_samples, rows_read, len(samples))
+        print(f"Streamed {rows_read} Log Book rows, {len(samples)} samples")
+        return samples, rows_read
 
     def extract_logbook_data(self, log_data):
         """
@@ -2557,172 +6730,46 @@ class SampleTrackerApp(ctk.CTk):
         Returns a list of dictionaries, each containing a sample's information.
         Skip rows where only UNH# is populated.
         """
-        samples = []
-
-        # Check if DataFrame is empty
-        if log_data.empty:
-            return samples
-
-        # Print column names for debugging
-        print("Actual column names in Log Book DataFrame:")
-        for col in log_data.columns:
-            print(f"  {col}")
-
-        # Define fields we're interested in
-
-        # Define fields we're interested in, including Due_Date
-        field_mappings = {
-            'UNH#': 'unh_id',
-            'Sample_Name': 'sample_name',
-            'Collection_Date': 'collection_date',
-            'Collection_Time': 'collection_time',
-            'Project': 'project',
-            'Sub_Project': 'sub_project',
-            'Sub_ProjectA': 'sub_projecta',
-            'Sub_ProjectB': 'sub_projectb',
-            'BatchID': 'batch_id',
-            'Frozen_Received': 'frozen_received',
-            'Refrigerated_Received': 'refrigerated_received',
-            'Field_Notes': 'field_notes',
-            'Lab_Notes': 'lab_notes',
-            'Sample_Type': 'sample_type',
-            'Logger': 'logger',
-            'pH': 'ph',
-            'Cond': 'cond',
-            'Spec_Cond': 'spec_cond',
-            'DO_Conc': 'do_conc',
-            'DO%': 'do_percent',
-            'Temperature': 'temperature',
-            'Turbidity': 'turbidity',
-            'Salinity': 'salinity',
-            'DTWT': 'dtwt',
-            'Volume': 'volume',
-            'Dilution': 'dilution',
-            'Start Date/Time': 'start_datetime',
-            'Atm_Pressure_mb': 'atm_pressure',
-            'ORP_mV': 'orp_mv',
-            'Due_Date': 'due_date'  # <-- Added Due_Date to the mapping
-        }
-
-        # List of possible analysis columns
-        analysis_names = [
-            'DOC', 'TDN', 'Anions', 'Cations', 'NO3+NO2', 'NO2', 'NH4',
-            'PO4/SRP', 'SiO2', 'TN', 'TP', 'TDP', 'TSS', 'PC/PN',
-            'Chl a', 'EEMs', 'Gases - GC', 'ICPOES', 'Additional'
-        ]
-
-        # Find columns that match our field mappings
-        column_mapping = {}
-        for col in log_data.columns:
-            col_str = str(col).strip()
-            # Check for exact matches first
-            if col_str in field_mappings:
-                column_mapping[col] = field_mappings[col_str]
-                continue
-            # Then check for partial matches
-            for key, value in field_mappings.items():
-                if key.lower() in col_str.lower() or col_str.lower() in key.lower():
-                    column_mapping[col] = value
-                    break
-
-        # Find analysis columns
-        analysis_columns = {}
-        for col in log_data.columns:
-            col_str = str(col).strip()
-            for analysis in analysis_names:
-                if col_str == analysis or col_str.lower() == analysis.lower():
-                    analysis_columns[col] = analysis
-                    break
-
-        print("Column mapping for Log Book:")
-        for col, field in column_mapping.items():
-            print(f"  {col} -> {field}")
-
-        print("Analysis columns in Log Book:", list(analysis_columns.keys()))
-
-        # Process each row of data
-        for idx, row in log_data.iterrows():
-            # Skip rows that are completely empty
-            if row.isnull().all():
-                continue
+        return extract_logbook_records(log_data)
+
+    def populate_validation_report(self, report):
+        """Show a validate_samples report in the Validation preview tab; returns (errors, warnings)."""
+        for item in self.validation_tree.get_children():
+            self.validation_tree.delete(item)
+
+        shown = report.head(VALIDATION_PREVIEW_ROWS)
+        for row in shown.itertuples(index=False):
+            self.validation_tree.insert("", "end", values=[str(value) for value in row], tags=(row.Severity,))
+        if len(report) > len(shown):
+            self.validation_tree.insert("", "end", values=["", "", "", "", "", "",
+                                                           f"... {len(report) - len(shown)} more issues (see console)"])
+            print(report.iloc[len(shown):].to_string())
+        return validation_counts(report)
+
+    def _validation_status(self, counts):
+        """Status line suffix for (errors, warnings)."""
+        errors, warnings = counts
+        if not errors and not warnings:
+            return " Validation: no problems found."
+        return f" Validation: {errors} errors, {warnings} warnings (see the Validation tab)."
 
-            # Initialize a sample dictionary
-            sample = {}
-
-            # Extract UNH# first to check if it's the only field populated
-            unh_id = None
-            for col, field_name in column_mapping.items():
-                if field_name == 'unh_id':
-                    value = row[col]
-                    if pd.notna(value) and str(value).strip():
-                        unh_id = str(value).strip()
-                        sample['unh_id'] = unh_id
-                    break
-
-            # Skip rows where only UNH# is populated
-            if unh_id and len(sample) == 1:
-                has_other_data = False
-                for col, field_name in column_mapping.items():
-                    if field_name != 'unh_id':
-                        value = row[col]
-                        if pd.notna(value) and str(value).strip():
-                            has_other_data = True
-                            break
-
-                if not has_other_data:
-                    print(f"Skipping row with only UNH#: {unh_id}")
-                    continue
+    def populate_logbook_preview(self, log_data, samples):
+        """Populate the preview treeviews with data from the Log Book file."""
+        self._populate_logbook_project_info(samples)
 
-            # Extract the rest of the values
-            for col, field_name in column_mapping.items():
-                if field_name != 'unh_id':  # Already processed UNH# above
-                    value = row[col]
-                    if pd.notna(value) and str(value).strip():
-                        # Convert to string but handle special types
-                        if isinstance(value, (datetime.datetime, datetime.date)):
-                            sample[field_name] = value.strftime('%Y-%m-%d')
-                        elif isinstance(value, datetime.time):
-                            sample[field_name] = value.strftime('%H:%M:%S')
-                        else:
-                            sample[field_name] = str(value).strip()
-
-            # Extract analysis requirements
-            sample['analyses'] = {}
-            for col, analysis_name in analysis_columns.items():
-                value = row[col]
-                is_required = False
-                if pd.notna(value):
-                    value_str = str(value).upper().strip()
-                    if value_str == 'X' or value_str == 'TRUE' or value_str == '1' or value_str == 'Y':
-                        is_required = True
-                sample['analyses'][analysis_name] = is_required
-
-            # Only add samples that have at least a sample name or UNH ID
-            if ('sample_name' in sample and sample['sample_name']) or ('unh_id' in sample and sample['unh_id']):
-                samples.append(sample)
-
-        print(f"Extracted {len(samples)} valid samples from Log Book")
+        # Show the extracted samples, or the raw data if none could be extracted
         if samples:
-            print("First sample from Log Book:")
-            for key, value in samples[0].items():
-                if key != 'analyses':
-                    print(f"  {key}: {value}")
-            print("  Analyses requested:")
-            for analysis, requested in samples[0]['analyses'].items():
-                if requested:
-                    print(f"    {analysis}")
-
-        return samples
+            self.sample_pager.show(preview_frame_from_samples(samples))
+        else:
+            print("Using raw Log Book data for preview")
+            self.sample_pager.show(log_data)
+        print(f"Log Book preview: {self.sample_pager.shown} of {self.sample_pager.total_rows} rows shown")
 
-    def populate_logbook_preview(self, log_data, samples):
-        """Populate the preview treeviews with data from the Log Book Excel file."""
-        # Clear the current content of both treeviews
+    def _populate_logbook_project_info(self, samples):
+        """Show Log Book summary stats in the project preview tree."""
         for item in self.project_tree.get_children():
             self.project_tree.delete(item)
 
-        for item in self.sample_tree.get_children():
-            self.sample_tree.delete(item)
-
         # For Log Book format, we don't have separate project info
         # So we'll create a simple project info display with basic stats
         project_info = [
@@ -2753,471 +6800,24 @@ class SampleTrackerApp(ctk.CTk):
         for info in project_info:
             self.project_tree.insert("", "end", values=[info["Field"], info["Value"]])
 
-        # Configure and populate sample treeview
-        # Check if we have extracted samples
-        if samples:
-            # Create a preview DataFrame with properly extracted data
-            preview_data = []
-            for sample in samples:
-                sample_row = {}
-                # Add basic fields
-                for key, value in sample.items():
-                    if key != 'analyses':
-                        sample_row[key] = value
-
-                # Add analysis fields
-                for analysis, required in sample.get('analyses', {}).items():
-                    sample_row[analysis] = 'X' if required else ''
-
-                preview_data.append(sample_row)
-
-            # Convert to DataFrame for easier display
-            if preview_data:
-                preview_df = pd.DataFrame(preview_data)
-
-                # Get preview columns
-                preview_columns = preview_df.columns.tolist()
-
-                # Configure columns for sample tree based on extracted data
-                self.sample_tree["columns"] = preview_columns
-                self.sample_tree["show"] = "headings"
-
-                # Configure each column
-                for col in preview_columns:
-                    self.sample_tree.heading(col, text=str(col))
-                    self.sample_tree.column(col, width=100, minwidth=50)
-
-                # Add extracted data to sample tree
-                for _, row in preview_df.iterrows():
-                    values = [str(val) if pd.notna(val) else "" for val in row]
-                    self.sample_tree.insert("", "end", values=values)
-
-                print(f"Sample preview populated with {len(preview_df)} rows and {len(preview_columns)} columns")
-                return
-
-        # If we couldn't extract samples properly, show the raw data
-        print("Using raw Log Book data for preview")
-        sample_columns = log_data.columns.tolist()
+    def append_logbook_preview(self, samples):
+        """Add extracted Log Book samples to the preview tree, adding any columns not seen yet."""
+        self.sample_pager.extend(preview_frame_from_samples(samples))
 
-        self.sample_tree["columns"] = sample_columns
-        self.sample_tree["show"] = "headings"
-
-        for col in sample_columns:
-            self.sample_tree.heading(col, text=str(col))
-            self.sample_tree.column(col, width=100, minwidth=50)
-
-        for _, row in log_data.iterrows():
-            values = [str(val) if pd.notna(val) else "" for val in row]
-            self.sample_tree.insert("", "end", values=values)
-
-        print(f"Raw Log Book preview populated with {len(log_data)} rows and {len(sample_columns)} columns")
+    def populate_preview_summary(self, counts):
+        """Show preview_summary statistics for every previewed row (add_preview_counts) in the Summary tab."""
+        self.summary_tree.delete(*self.summary_tree.get_children())
+        for values in preview_row_values(preview_summary(counts)):
+            self.summary_tree.insert("", "end", values=values)
 
     def import_logbook_data(self):
-        """Import the data from the selected Log Book Excel file into the Access database."""
+        """Import the data from the selected Log Book file into the Access database."""
         file_path = self.logbook_file_path_var.get()
         if not file_path:
-            messagebox.showwarning("No File Selected", "Please select a Log Book Excel file first.")
+            messagebox.showwarning("No File Selected", "Please select a Log Book file first.")
             return
 
-        try:
-            # Read the Excel file
-            self.import_status_var.set("Loading Log Book file for import...")
-            log_data = self.read_logbook_excel(file_path)
-
-            if log_data is None or log_data.empty:
-                self.import_status_var.set("Error: Could not read the Log Book file or it's empty.")
-                return
-
-            # Confirm import
-            confirm = messagebox.askyesno(
-                "Confirm Import",
-                f"Are you sure you want to import samples from this Log Book file?"
-            )
-
-            if not confirm:
-                self.import_status_var.set("Import cancelled by user.")
-                return
-
-            # Perform the import
-            self.import_status_var.set("Importing data from Log Book...")
-            success = self.perform_logbook_import(log_data)
-
-            if success:
-                self.import_status_var.set(f"Successfully imported samples from Log Book.")
-                # Reload the main data table
-                self.data = self._load_data_from_database()
-                self.show_all()
-            else:
-                self.import_status_var.set("Error during Log Book import. See console for details.")
-
-        except Exception as e:
-            error_message = f"Error importing Log Book file: {str(e)}"
-            print(error_message)
-            print(traceback.format_exc())
-            messagebox.showerror("Import Error", error_message)
-            self.import_status_var.set("Error during import. See console for details.")
-
-    def perform_logbook_import(self, log_data):
-        """Perform the actual import of Log Book data into the Access database."""
-        conn = self._get_db_connection()
-        if not conn:
-            return False
-
-        cursor = conn.cursor()
-        imported_count = 0
-
-        try:
-            # Begin transaction
-            if conn.autocommit:
-                conn.autocommit = False
-
-            # Extract sample data
-            samples = self.extract_logbook_data(log_data)
-
-            if not samples:
-                messagebox.showwarning("No Samples", "No valid samples found in the Log Book file.")
-                return False
-
-            print(f"Found {len(samples)} samples to import from Log Book")
-
-            # Process each sample
-            success_count = 0
-            skipped_count = 0
-            for sample in samples:
-                print(f"Processing Log Book sample: {sample.get('sample_name', 'Unknown')}")
-
-                # Check if UNH# already exists
-                unh_id = sample.get('unh_id', '')
-                if unh_id:
-                    # Check if this UNH# already exists
-                    if self._check_unh_exists(cursor, unh_id):
-                        print(f"Skipping existing UNH# {unh_id}")
-                        skipped_count += 1
-                        continue
-
-                # Get project info directly from the sample
-                project_info = {
-                    'user_project_name': sample.get('project', 'Default Project'),
-                    'project_name': sample.get('project', ''),
-                    'sub_project': sample.get('sub_project', ''),
-                    'sub_projecta': sample.get('sub_projecta', '')
-                }
-
-                success = self._insert_logbook_sample(cursor, project_info, sample)
-
-                if success:
-                    # Insert into WRRC sample analysis requested
-                    self._insert_logbook_analysis(cursor, sample)
-                    success_count += 1
-
-            # Commit the transaction
-            conn.commit()
-            print(f"Successfully imported {success_count} samples, skipped {skipped_count} existing samples.")
-
-            if success_count > 0 or skipped_count > 0:
-                messagebox.showinfo("Import Result",
-                                    f"Import completed:\n- {success_count} samples imported\n- {skipped_count} samples skipped (already exist)")
-                return True
-            else:
-                messagebox.showwarning("Import Warning", "No samples were imported. Check the console for details.")
-                return False
-
-        except Exception as e:
-            # Rollback in case of error
-            conn.rollback()
-            error_message = f"Error during Log Book import: {str(e)}"
-            print(error_message)
-            print(traceback.format_exc())
-            messagebox.showerror("Import Error", error_message)
-            return False
-
-        finally:
-            cursor.close()
-            conn.close()
-
-    def _check_unh_exists(self, cursor, unh_id):
-        """Check if a UNH ID already exists in the database."""
-        try:
-            query = "SELECT COUNT(*) FROM [WRRC sample info] WHERE [UNH#] = ?"
-            cursor.execute(query, (unh_id,))
-            count = cursor.fetchone()[0]
-            return count > 0
-        except Exception as e:
-            print(f"Error checking if UNH# exists: {str(e)}")
-            return False
-
-    def _insert_logbook_sample(self, cursor, project_info, sample):
-        """Insert a sample from Log Book into the WRRC sample info table."""
-        try:
-            # Extract sample information
-            unh_id = sample.get('unh_id', '')
-            sample_name = sample.get('sample_name', '')
-            sample_type = sample.get('sample_type', '')
-            field_notes = sample.get('field_notes', '')
-
-            # Handle date and time formatting
-            collection_date = sample.get('collection_date', '')
-            collection_time = sample.get('collection_time', '')
-
-            # Convert date/time to proper format if needed
-            if collection_date:
-                try:
-                    # If it's already a datetime object
-                    if isinstance(collection_date, (datetime.datetime, datetime.date)):
-                        collection_date = collection_date.strftime('%Y-%m-%d')
-                    # If it's a string, try to parse it
-                    elif isinstance(collection_date, str):
-                        try:
-                            # Try multiple date formats
-                            date_formats = [
-                                '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y',
-                                '%m-%d-%Y', '%d-%m-%Y', '%m.%d.%Y', '%d.%m.%Y'
-                            ]
-
-                            parsed_date = None
-                            for fmt in date_formats:
-                                try:
-                                    parsed_date = datetime.datetime.strptime(collection_date, fmt)
-                                    break
-                                except:
-                                    continue
-
-                            if parsed_date:
-                                collection_date = parsed_date.strftime('%Y-%m-%d')
-                            else:
-                                print(f"Warning: Could not parse date format for {collection_date}")
-                        except Exception as date_err:
-                            print(f"Date parsing error: {date_err}")
-                except Exception as date_conv_err:
-                    print(f"Date conversion error: {date_conv_err}")
-
-            # Format collection time if needed
-            if collection_time:
-                try:
-                    # Handle different time formats
-                    if isinstance(collection_time, datetime.time):
-                        collection_time = collection_time.strftime('%H:%M:%S')
-                    elif isinstance(collection_time, str) and collection_time.strip():
-                        # Try to standardize time format
-                        time_formats = ['%H:%M:%S', '%I:%M:%S %p', '%I:%M %p', '%H:%M']
-                        for fmt in time_formats:
-                            try:
-                                parsed_time = datetime.datetime.strptime(collection_time, fmt).time()
-                                collection_time = parsed_time.strftime('%H:%M:%S')
-                                break
-                            except:
-                                continue
-                    else:
-                        collection_time = None
-                except Exception as time_err:
-                    print(f"Time parsing error: {time_err}")
-                    collection_time = None
-            else:
-                collection_time = None
-
-            # Use project info from the sample itself
-            project = project_info.get('user_project_name', '')
-            if not project:
-                project = "Default Project"
-                print(f"Warning: Using default project name because no project specified in Log Book")
-
-            # Get project-related fields from sample
-            sub_project = project_info.get('sub_project', '')
-            sub_projecta = project_info.get('sub_projecta', '')
-            sub_projectb = sample.get('sub_projectb', '')
-
-            # Get additional measurements if available
-            ph = sample.get('ph', '')
-            conductivity = sample.get('cond', '')
-            spec_cond = sample.get('spec_cond', '')
-            do_conc = sample.get('do_conc', '')
-            do_percent = sample.get('do_percent', '')
-            temperature = sample.get('temperature', '')
-            salinity = sample.get('salinity', '')
-
-            # Validate numeric fields
-            for field_name in ['ph', 'cond', 'spec_cond', 'do_conc', 'do_percent', 'temperature', 'salinity']:
-                value = sample.get(field_name)
-                if value is not None:
-                    if value == '' or (isinstance(value, str) and value.lower() in ['s', 'na', 'n/a']):
-                        sample[field_name] = None
-                    elif isinstance(value, str):
-                        try:
-                            sample[field_name] = float(value)
-                        except ValueError:
-                            print(f"Warning: Invalid {field_name} value '{value}' - setting to NULL")
-                            sample[field_name] = None
-
-            print(f"Log Book sample info: UNH ID={unh_id}, Name={sample_name}, Date={collection_date}")
-            print(f"Using project from Log Book: '{project}'")
-
-            # First check if the sample already exists (should be redundant with earlier check but safer)
-            check_query = """
-            SELECT COUNT(*) FROM [WRRC sample info] 
-            WHERE [UNH#] = ?
-            """
-            cursor.execute(check_query, (unh_id,))
-            count = cursor.fetchone()[0]
-            if count > 0:
-                print(f"Sample with UNH# {unh_id} already exists in database. Skipping.")
-                return False
-
-            # Build a field mapping from variables to database column names
-            field_mapping = {
-                'UNH#': unh_id if unh_id else None,
-                'Sample_Name': sample_name if sample_name else "Unknown Sample",
-                'Collection_Date': collection_date if collection_date else None,
-                'Project': project if project else "Default Project",
-                'Sub_Project': sub_project if sub_project else None,
-                'Sub_ProjectA': sub_projecta if sub_projecta else None,
-                'Sub_ProjectB': sub_projectb if sub_projectb else None,
-                'Sample_Type': sample_type if sample_type else None,
-                'Field_Notes': field_notes if field_notes else None,
-                'pH': sample.get('ph') if sample.get('ph') is not None else None,
-                'Cond': sample.get('cond') if sample.get('cond') is not None else None,
-                'Spec_Cond': sample.get('spec_cond') if sample.get('spec_cond') is not None else None,
-                'DO_Conc': sample.get('do_conc') if sample.get('do_conc') is not None else None,
-                'DO%': sample.get('do_percent') if sample.get('do_percent') is not None else None,
-                'Temperature': sample.get('temperature') if sample.get('temperature') is not None else None,
-                'Salinity': sample.get('salinity') if sample.get('salinity') is not None else None
-            }
-
-            # Only add Collection_Time if it's not empty
-            if collection_time:
-                field_mapping['Collection_Time'] = collection_time
-
-            # Filter out None values
-            fields = {k: v for k, v in field_mapping.items() if v is not None}
-
-            # Build columns and parameters for SQL query
-            columns = list(fields.keys())
-
-            # Handle special characters in column names
-            formatted_columns = []
-            for col in columns:
-                if col == 'DO%':
-                    formatted_columns.append('[DO%]')
-                else:
-                    formatted_columns.append(f'[{col}]')
-
-            placeholders = ['?'] * len(columns)
-            values = list(fields.values())
-
-            # Construct and execute the query
-            query = f"INSERT INTO [WRRC sample info] ({', '.join(formatted_columns)}) VALUES ({', '.join(placeholders)})"
-
-            print(f"Log Book sample insert query: {query}")
-            print(f"Parameters: {values}")
-
-            cursor.execute(query, values)
-
-            print(f"Inserted Log Book sample info for: {sample_name} (UNH# {unh_id})")
-            return True
-
-        except Exception as e:
-            print(f"Error inserting Log Book sample info: {str(e)}")
-            print(traceback.format_exc())
-            raise
-
-    def _insert_logbook_analysis(self, cursor, sample):
-        """Insert analysis data from Log Book into the WRRC sample analysis requested table."""
-        try:
-            # Get UNH ID
-            unh_id = sample.get('unh_id', '')
-
-            # Make sure we have the minimum required data
-            if not unh_id:
-                print("Cannot insert analysis request: Missing UNH ID")
-                return False
-
-            # Get analysis requirements
-            analyses = sample.get('analyses', {})
-
-            # Get additional fields for analysis
-            containers = sample.get('containers', '')
-            filtered = sample.get('filtered', '')
-            preservation = sample.get('preservation', '')
-            filter_volume = sample.get('filter_volume', '')
-            due_date = sample.get('due_date', '')
-
-            # Create mapping between Excel analysis names and database column names
-            analysis_mapping = {
-                'DOC': 'DOC',
-                'TDN': 'TDN',
-                'Anions': 'Anions',
-                'Cations': 'Cations',
-                'NO3+NO2': 'NO3AndNO2',
-                'NO2': 'NO2',
-                'NH4': 'NH4',
-                'PO4/SRP': 'PO4OrSRP',
-                'SiO2': 'SiO2',
-                'TN': 'TN',
-                'TP': 'TP',
-                'TDP': 'TDP',
-                'TSS': 'TSS',
-                'PC/PN': 'PCAndPN',
-                'Chl a': 'Chl_a',
-                'EEMs': 'EEMs',
-                'Gases - GC': 'Gases_GC',
-                'ICPOES': 'ICPOES',
-                'Additional': 'Additional'
-            }
-
-            # Log the analyses that are marked as required
-            required_analyses = [analysis for analysis, is_required in analyses.items() if is_required]
-            print(f"Required analyses for UNH# {unh_id}: {required_analyses}")
-
-            # Prepare columns and values
-            columns = ["[UNH#]"]
-            values = [str(unh_id)]
-
-            # Add additional fields if they exist
-            if containers:
-                columns.append("[Containers]")
-                values.append(str(containers))
-
-            if filtered:
-                columns.append("[Filtered]")
-                values.append(str(filtered))
-
-            if preservation:
-                columns.append("[Preservation]")
-                values.append(str(preservation))
-
-            if filter_volume:
-                columns.append("[Filter_Volume]")
-                values.append(str(filter_volume))
-            if due_date:
-                columns.append("Due_Date")
-                values.append(due_date)
-
-            # Add analysis fields (THIS LOOP IS CORRECT)
-            for analysis, is_required in analyses.items():
-                if is_required:
-                    db_column = analysis_mapping.get(analysis)
-                    if db_column:
-                        columns.append(f"[{db_column}]")
-                        values.append("required")
-
-            # The query construction and execution should be outside the loop.
-            # This is the correct indentation and placement.
-            if len(columns) > 1:
-                query = f"INSERT INTO [WRRC sample analysis requested] ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(values))})"
-                try:
-                    cursor.execute(query, values)
-                    print(f"Inserted analysis request for UNH# {unh_id} with {len(columns) - 1} fields")
-                    return True
-                except Exception as e:
-                    print(f"Error inserting analysis request for UNH# {unh_id}: {str(e)}")
-                    raise
-            else:
-                print(f"No analysis fields to insert for UNH# {unh_id}")
-                return False
-
-        except Exception as e:
-            print(f"Error inserting Log Book analysis data: {str(e)}")
-            raise
-    # Update these existing methods to work with the new dual-import system
+        self._start_import("logbook", file_path)
 
     def preview_excel_data(self):
         """Preview the data from the selected Sample Submission Excel file."""
@@ -3226,9 +6826,11 @@ class SampleTrackerApp(ctk.CTk):
             messagebox.showwarning("No File Selected", "Please select a Sample Submission Excel file first.")
             return
 
+        self.import_session = None
         try:
             # Load the Excel file
             self.import_status_var.set("Loading file for preview...")
+            signature = file_signature(file_path)
 
             # Try to read the Excel file
             project_df, sample_df = self.read_sample_submission_excel(file_path)
@@ -3248,10 +6850,16 @@ class SampleTrackerApp(ctk.CTk):
 
             # Display Excel project name in status but don't override textbox
             excel_project = self.current_project_info.get('project_name', 'Not specified')
-            self.import_status_var.set(f"Preview ready. Found {len(samples)} samples. Excel Project: {excel_project}")
+            report = validate_samples(samples)
+            self.import_session = ImportSession("submission", signature, samples,
+                                                project_info=dict(self.current_project_info),
+                                                rows_read=len(sample_df), report=report)
+            counts = self.populate_validation_report(report)
+            self.import_status_var.set(f"Preview ready. Found {len(samples)} samples. Excel Project: {excel_project}."
+                                       + self._validation_status(counts))
 
             # Populate the preview treeviews
-            self.populate_preview_treeviews(project_df, sample_df)
+            self.populate_preview_treeviews(project_df, sample_df, samples)
 
         except Exception as e:
             error_message = f"Error previewing Excel file: {str(e)}"
@@ -3267,374 +6875,379 @@ class SampleTrackerApp(ctk.CTk):
             messagebox.showwarning("No File Selected", "Please select a Sample Submission Excel file first.")
             return
 
-        try:
-            # Read the Excel file
-            self.import_status_var.set("Loading file for import...")
-            project_df, sample_df = self.read_sample_submission_excel(file_path)
-
-            if project_df is None or sample_df is None:
-                self.import_status_var.set("Error: Could not read the expected sheets from the Excel file.")
-                return
-
-            # Confirm import
-            confirm = messagebox.askyesno(
-                "Confirm Import",
-                f"Are you sure you want to import {len(sample_df)} samples from this file?"
-            )
-
-            if not confirm:
-                self.import_status_var.set("Import cancelled by user.")
-                return
-
-            # Perform the import
-            self.import_status_var.set("Importing data...")
-            success = self.perform_import(project_df, sample_df)
-
-            if success:
-                self.import_status_var.set(f"Successfully imported {len(sample_df)} samples.")
-                # Reload the main data table
-                self.data = self._load_data_from_database()
-                self.show_all()
-            else:
-                self.import_status_var.set("Error during import. See console for details.")
-
-        except Exception as e:
-            error_message = f"Error importing Excel file: {str(e)}"
-            print(error_message)
-            print(traceback.format_exc())
-            messagebox.showerror("Import Error", error_message)
-            self.import_status_var.set("Error during import. See console for details.")
-
-    def perform_import(self, project_df, sample_df):
-        """Perform the actual import of data into the Access database."""
         # Check if project name is provided
         project_name = self.project_entry.get().strip()
         if not project_name:
             messagebox.showerror("Missing Project", "Please enter a Project name.")
-            return False
+            return
 
-        conn = self._get_db_connection()
-        if not conn:
-            return False
+        self._start_import("submission", file_path, project_name)
 
-        cursor = conn.cursor()
-        imported_count = 0
-        skipped_count = 0
+    def _start_import(self, kind, file_path, project_name=None):
+        """
+        Start the import pipeline for a "submission" or "logbook" file. Parsing and validation run
+        on a worker thread; once the user confirms the sample count a second worker dedupes and
+        inserts. Progress is reported on the Import tab and the rest of the app stays usable.
+        In resumable mode the file's checkpoint is opened first, and a completed one ends the run.
+        """
+        if self.import_worker is not None and self.import_worker.is_alive():
+            messagebox.showwarning("Import Running", "An import is already running. Cancel it or wait for it to finish.")
+            return
 
+        self.import_cancel_event.clear()
+        self.import_resumable = self.checkpoint_import_var.get()
+        self._set_import_running(True)
+        self.import_status_var.set(f"Loading {os.path.basename(file_path)} for import...")
+        self.import_worker = threading.Thread(
+            target=self._run_import_parse,
+            args=(kind, file_path, project_name, self.import_resumable, self.import_session),
+            name="ImportParseWorker",
+            daemon=True
+        )
+        self.import_worker.start()
+        self.after(100, self._poll_import_worker)
+
+    def _set_import_running(self, running):
+        """Toggle the Import tab controls between idle and running."""
+        self.sub_import_button.configure(state="disabled" if running else "normal")
+        self.log_import_button.configure(state="disabled" if running else "normal")
+        self.sub_import_files_button.configure(state="disabled" if running else "normal")
+        self.import_cancel_button.configure(state="normal" if running else "disabled")
+        if running:
+            self.import_progress_bar.set(0)
+            self.import_stage_var.set("")
+
+    def cancel_import(self):
+        """Ask the running import to stop; anything it inserted is rolled back."""
+        if self.import_worker is not None and self.import_worker.is_alive():
+            self.import_cancel_event.set()
+            self.import_stage_var.set("Cancelling...")
+            self.import_cancel_button.configure(state="disabled")
+
+    def _run_import_parse(self, kind, file_path, project_name, checkpointed, session=None):
+        """
+        Worker thread: parse and validate the file, then hand the samples back for confirmation.
+        If the preview's session still matches the file on disk its samples are used instead.
+        """
         try:
-            # Begin transaction
-            if conn.autocommit:
-                conn.autocommit = False
-
-            # Extract project info from the Excel file
-            excel_project_info = self.extract_project_info(project_df)
-
-            # Create a separate dictionary for database import
-            # This preserves the user's entry for Project
-            project_info = {
-                # Copy Excel project info
-                **excel_project_info,
-                # Override with user-entered project name
-                'user_project_name': project_name
-            }
-
-            # Log what we're using
-            print(f"Using user-entered Project name: '{project_name}'")
-            if 'project_name' in excel_project_info:
-                print(f"Using Excel-derived Sub_Project name: '{excel_project_info.get('project_name', '')}'")
-
-            # Extract sample data
-            samples = self.extract_sample_data(sample_df)
-
-            if not samples:
-                messagebox.showwarning("No Samples", "No valid samples found in the Excel file.")
-                return False
-
-            print("Project information:", project_info)
-            print(f"Found {len(samples)} samples to import")
-
-            # Process each sample
-            success_count = 0
-            for sample in samples:
-                print(f"Processing sample: {sample.get('sample_name', 'Unknown')}")
-
-                # Check if sample has UNH# and if it already exists
-                unh_id = sample.get('unh_id', '')
-                if unh_id and self._check_unh_exists(cursor, unh_id):
-                    print(f"Skipping existing UNH# {unh_id}")
-                    skipped_count += 1
-                    continue
-
-                # Insert into WRRC sample info
-                success = self._insert_sample_info(cursor, project_info, sample)
-
-                if success:
-                    # Insert into WRRC sample analysis requested
-                    self._insert_sample_analysis_requested(cursor, sample)
-                    success_count += 1
-
-            # Commit the transaction
-            conn.commit()
-            print(f"Successfully imported {success_count} samples, skipped {skipped_count} existing samples.")
+            checkpoint = None
+            if checkpointed:
+                checkpoint = ImportCheckpoint(get_local_data_path(IMPORT_CHECKPOINT_DIR), file_path,
+                                              project_name if kind == "submission" else "Log Book")
+                if checkpoint.completed is not None:
+                    # Already imported: skip parsing altogether
+                    self.import_queue.put(("done", run_sample_import(None, [], checkpoint=checkpoint)))
+                    return
+
+            progress = lambda stage, done, total: self.import_queue.put(("progress", stage, done, total))
+            column_map = self.import_column_map() if kind == "logbook" else None
+            if session is not None and session.matches(kind, file_path, column_map):
+                print(f"Reusing {len(session.samples)} samples from the preview of {os.path.basename(file_path)}")
+                project_info = None
+                if kind == "submission":
+                    project_info = {**session.project_info, 'user_project_name': project_name}
+                progress("parse", 1, 1)
+                self.import_queue.put(("parsed", kind, session.take_samples(), project_info,
+                                       session.rows_read, checkpoint, session.report))
+                return
 
-            if success_count > 0 or skipped_count > 0:
-                messagebox.showinfo("Import Result",
-                                    f"Import completed:\n- {success_count} samples imported\n- {skipped_count} samples skipped (already exist)")
-                return True
+            if kind == "submission":
+                progress("parse", 0, 1)
+                project_df, sample_df = parse_cached(file_path, "submission", parse_submission_workbook)
+                # The Excel project name becomes Sub_Project; the user's entry is the Project
+                project_info = {**extract_project_info(project_df), 'user_project_name': project_name}
+                samples = extract_sample_records(sample_df)
+                progress("parse", 1, 1)
+                rows_read = len(sample_df)
             else:
-                messagebox.showwarning("Import Warning", "No samples were imported. Check the console for details.")
-                return False
+                project_info = None
+                samples = []
+                rows_read = 0
+                for chunk in iter_logbook_chunks(file_path, column_map=column_map):
+                    if self.import_cancel_event.is_set():
+                        self.import_queue.put(("cancelled",))
+                        return
+                    samples.extend(extract_logbook_records(chunk))
+                    rows_read += len(chunk)
+                    progress("parse", rows_read, None)
+            if self.import_cancel_event.is_set():
+                self.import_queue.put(("cancelled",))
+                return
 
+            # Whole-batch checks before anything is written
+            progress("validate", 0, len(samples))
+            report = validate_samples(samples)
+            progress("validate", len(samples), len(samples))
+            self.import_queue.put(("parsed", kind, samples, project_info, rows_read, checkpoint, report))
         except Exception as e:
-            # Rollback in case of error
-            conn.rollback()
-            error_message = f"Error during import: {str(e)}"
-            print(error_message)
-            print(traceback.format_exc())
-            messagebox.showerror("Import Error", error_message)
-            return False
+            self.import_queue.put(("error", e, traceback.format_exc()))
 
+    def _run_import_insert(self, samples, project_info, bulk, checkpoint):
+        """Worker thread: dedupe and insert on its own connection and report back through the queue."""
+        conn = None
+        try:
+            conn = connect_to_database(self.db_path, self.password)
+            result = run_sample_import(
+                conn, samples, project_info, bulk=bulk,
+                progress=lambda stage, done, total: self.import_queue.put(("progress", stage, done, total)),
+                cancel_event=self.import_cancel_event,
+                checkpoint=checkpoint
+            )
+            self.import_queue.put(("done", result))
+        except Exception as e:
+            self.import_queue.put(("error", e, traceback.format_exc()))
         finally:
-            cursor.close()
-            conn.close()
-
-    def _insert_sample_info(self, cursor, project_info, sample):
-        """Insert a record into the WRRC sample info table."""
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _poll_import_worker(self):
+        """Apply import progress from the worker threads on the Tk thread."""
+        stage_labels = {"parse": "Parsing", "validate": "Validating", "dedupe": "Checking duplicates",
+                        "insert": "Inserting", "files": "Files imported"}
+        finished = None
         try:
-            # Import datetime up front
-            import datetime
+            while True:
+                message = self.import_queue.get_nowait()
+                if message[0] == "progress":
+                    _, stage, done, total = message
+                    if self.import_cancel_event.is_set():
+                        continue
+                    if total:
+                        self.import_progress_bar.set(done / total)
+                        self.import_stage_var.set(f"{stage_labels[stage]}: {done} of {total}")
+                    else:
+                        self.import_stage_var.set(f"{stage_labels[stage]}: {done} rows read")
+                else:
+                    finished = message
+        except queue.Empty:
+            pass
 
-            # Extract sample information
-            unh_id = sample.get('unh_id', '')
-            sample_name = sample.get('sample_name', '')
-            sample_type = sample.get('sample_type', '')
-            field_notes = sample.get('field_notes', '')
+        if finished is None:
+            self.after(100, self._poll_import_worker)
+            return
 
-            # Handle date and time formatting to prevent data type mismatches
-            collection_date = sample.get('collection_date', '')
-            collection_time = sample.get('collection_time', '')
+        if finished[0] == "parsed":
+            self._confirm_import(*finished[1:])
+            return
 
-            # Convert date/time to proper format if needed
-            if collection_date:
-                try:
-                    # If it's already a datetime object
-                    if isinstance(collection_date, (datetime.datetime, datetime.date)):
-                        collection_date = collection_date.strftime('%Y-%m-%d')
-                    # If it's a string, try to parse it
-                    elif isinstance(collection_date, str):
-                        try:
-                            # Try multiple date formats
-                            date_formats = [
-                                '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y',
-                                '%m-%d-%Y', '%d-%m-%Y', '%m.%d.%Y', '%d.%m.%Y'
-                            ]
-
-                            parsed_date = None
-                            for fmt in date_formats:
-                                try:
-                                    parsed_date = datetime.datetime.strptime(collection_date, fmt)
-                                    break
-                                except:
-                                    continue
-
-                            if parsed_date:
-                                # Convert to Access-compatible date format (yyyy-mm-dd)
-                                collection_date = parsed_date.strftime('%Y-%m-%d')
-                            else:
-                                # If parsing fails, keep as is but print warning
-                                print(f"Warning: Could not parse date format for {collection_date}")
-                        except Exception as date_err:
-                            print(f"Date parsing error: {date_err}")
-                            # Keep original value if conversion fails
-                except Exception as date_conv_err:
-                    print(f"Date conversion error: {date_conv_err}")
-                    # Keep original value if conversion fails
-
-            # Format collection time if needed
-            if collection_time:
-                try:
-                    # Handle different time formats
-                    if isinstance(collection_time, datetime.time):
-                        collection_time = collection_time.strftime('%H:%M:%S')
-                    elif isinstance(collection_time, str) and collection_time.strip():
-                        # Try to standardize time format
-                        time_formats = ['%H:%M:%S', '%I:%M:%S %p', '%I:%M %p', '%H:%M']
-                        for fmt in time_formats:
-                            try:
-                                parsed_time = datetime.datetime.strptime(collection_time, fmt).time()
-                                collection_time = parsed_time.strftime('%H:%M:%S')
-                                break
-                            except:
-                                continue
-                    else:
-                        collection_time = None  # Empty or non-string time value
-                except Exception as time_err:
-                    print(f"Time parsing error: {time_err}")
-                    collection_time = None
-            else:
-                collection_time = None
+        self.import_worker = None
+        self._set_import_running(False)
 
-            # IMPORTANT: Use the user-entered project name for the Project field
-            # Get it directly from project_info['user_project_name']
-            project = project_info.get('user_project_name', '')
+        if finished[0] == "cancelled":
+            self.import_stage_var.set("")
+            self.import_status_var.set("Import cancelled by user.")
+            return
 
-            # Make sure we have a valid project name or use a default
-            if not project or project.strip() == '':
-                project = "Default Project"
-                print(f"Warning: Using default project name because user entry is empty")
+        if finished[0] == "files_done":
+            self._show_multi_import_report(finished[1], finished[2])
+            return
+
+        if finished[0] == "error":
+            _, error, details = finished
+            print(f"Import error: {error}")
+            print(details)
+            self.import_stage_var.set("")
+            if isinstance(error, ValueError):
+                # Missing sheets, a bad column map or a missing optional reader
+                self.import_status_var.set(f"Error: Could not read the file. {error}")
+                messagebox.showerror("Invalid File", str(error))
+            elif self.import_resumable:
+                self.import_status_var.set("Error during import; completed chunks were kept. "
+                                           "Run the import again to resume.")
+                messagebox.showerror("Import Error", f"Error during import: {str(error)}\n\n"
+                                                     f"Chunks committed before the error were kept. "
+                                                     f"Run the import again to resume from the last checkpoint.")
             else:
-                print(f"Using user-entered project name: '{project}'")
-
-            # Use the Excel project name for Sub_Project
-            sub_project = project_info.get('project_name', '')
-            print(f"Using Excel project name for Sub_Project: '{sub_project}'")
-
-            # If no sub_project found, use a default value to avoid empty string error
-            if not sub_project or sub_project.strip() == '':
-                sub_project = "Default Sub Project"
-
-            # Get contact name for Sub_ProjectA
-            proj_manager = project_info.get('contact_name', '')
-
-            # Make sure proj_manager is not empty
-            if not proj_manager or proj_manager.strip() == '':
-                proj_manager = "Unknown"  # Set a default value
-
-            # Get additional measurements if available
-            ph = sample.get('ph', '')
-            conductivity = sample.get('cond', '')
-            spec_cond = sample.get('spec_cond', '')
-            do_conc = sample.get('do_conc', '')
-            do_percent = sample.get('do_percent', '')
-            temperature = sample.get('temperature', '')
-            salinity = sample.get('salinity', '')
-
-            # Validate numeric fields to prevent type errors
-            if salinity is not None:
-                if salinity == '' or (isinstance(salinity, str) and salinity.lower() == 's'):
-                    salinity = None  # Handle special case
-                elif isinstance(salinity, str):
-                    try:
-                        salinity = float(salinity)
-                    except ValueError:
-                        print(f"Warning: Invalid salinity value '{salinity}' - setting to NULL")
-                        salinity = None
+                self.import_status_var.set("Error during import; nothing was saved. See console for details.")
+                messagebox.showerror("Import Error", f"Error during import: {str(error)}")
+            return
 
-            print(f"Sample info: UNH ID={unh_id}, Name={sample_name}, Date={collection_date}, Time={collection_time}")
-            print(f"Project info: Project={project}, Sub_Project={sub_project}, Manager={proj_manager}")
+        result = finished[1]
+        if result["already_completed"]:
+            self.import_progress_bar.set(1)
+            self.import_stage_var.set("")
+            self.import_status_var.set("This file was already imported into this project; nothing to do.")
+            return
 
-            # First check if the sample already exists to avoid duplicate key error
-            try:
-                check_query = """
-                SELECT COUNT(*) FROM [WRRC sample info] 
-                WHERE Sample_Name = ? AND Collection_Date = ?
-                """
-                cursor.execute(check_query, (
-                    str(sample_name) if sample_name else "Unknown Sample",
-                    str(collection_date) if collection_date else None
-                ))
-
-                count = cursor.fetchone()[0]
-                if count > 0:
-                    print(
-                        f"Warning: Sample {sample_name} with date {collection_date} already exists in database. Skipping.")
-                    return False
-            except Exception as check_err:
-                print(f"Error checking for existing sample: {str(check_err)}")
-                # Continue with insert attempt
-
-            # Build a field mapping from our variables to the actual database column names
-            field_mapping = {
-                'UNH#': unh_id if unh_id else None,
-                'Sample_Name': sample_name if sample_name else "Unknown Sample",
-                'Collection_Date': collection_date if collection_date else None,
-                'Project': project if project else "Default Project",
-                'Sub_Project': sub_project if sub_project else "Default Sub Project",
-                'Sub_ProjectA': proj_manager if proj_manager else "Unknown",
-                'Sample_Type': sample_type if sample_type else None,
-                'Field_Notes': field_notes if field_notes else None,
-                'pH': ph if ph else None,
-                'Cond': conductivity if conductivity else None,
-                'Spec_Cond': spec_cond if spec_cond else None,
-                'DO_Conc': do_conc if do_conc else None,
-                'DO%': do_percent if do_percent else None,
-                'Temperature': temperature if temperature else None,
-                'Salinity': salinity if salinity is not None else None
-            }
+        if result["cancelled"]:
+            self.import_stage_var.set("")
+            if self.import_resumable:
+                self.import_status_var.set(f"Import cancelled after {result['imported']} samples were committed. "
+                                           f"Run the import again to resume.")
+            else:
+                self.import_status_var.set("Import cancelled; all inserted rows were rolled back.")
+            if result["imported"]:
+                self.after_batch_update(result["imported_ids"])
+                self._reload_data()
+            return
 
-            # Only add Collection_Time if it's not empty
-            if collection_time:
-                field_mapping['Collection_Time'] = collection_time
+        self.import_progress_bar.set(1)
+        self.import_stage_var.set(f"Done in {result['seconds']:.2f} s ({result['rows_per_second']:.0f} samples/s)")
+        summary = f"{result['imported']} samples imported, {result['skipped']} skipped (already exist)"
+        if result["duplicates"]:
+            summary += f", {result['duplicates']} skipped (same name and date already exist)"
+        if result["resumed"]:
+            summary += f", {result['resumed']} already imported by an earlier run"
+        self.import_status_var.set(f"Import completed: {summary}.")
+        if result["imported"]:
+            self.after_batch_update(result["imported_ids"])
+            # Reload the main data table
+            self._reload_data()
+            self.show_all()
 
-            # Filter out None values to avoid issues
-            fields = {k: v for k, v in field_mapping.items() if v is not None}
+    def import_multiple_submission_files(self):
+        """Pick several Sample Submission workbooks and import them all into the entered project."""
+        if self.import_worker is not None and self.import_worker.is_alive():
+            messagebox.showwarning("Import Running", "An import is already running. Cancel it or wait for it to finish.")
+            return
 
-            # Build columns and parameters for SQL query
-            columns = list(fields.keys())
+        project_name = self.project_entry.get().strip()
+        if not project_name:
+            messagebox.showerror("Missing Project", "Please enter a Project name.")
+            return
 
-            # Fix special characters in column names for SQL
-            # In Access SQL, brackets are used to escape special characters and reserved words
-            formatted_columns = []
-            for col in columns:
-                if col == 'DO%':
-                    # Special handling for column names with special characters
-                    formatted_columns.append('[DO%]')
-                else:
-                    formatted_columns.append(f'[{col}]')
+        file_paths = filedialog.askopenfilenames(
+            title="Select Sample Submission Excel Files",
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+        )
+        if not file_paths:
+            return
 
-            placeholders = ['?'] * len(columns)
-            values = list(fields.values())
+        confirm = messagebox.askyesno(
+            "Confirm Import",
+            f"Are you sure you want to import {len(file_paths)} files into project '{project_name}'?"
+        )
+        if not confirm:
+            return
 
-            # Construct the query with proper column escaping
-            query = f"INSERT INTO [WRRC sample info] ({', '.join(formatted_columns)}) VALUES ({', '.join(placeholders)})"
+        self.import_cancel_event.clear()
+        self.import_resumable = self.checkpoint_import_var.get()
+        self._set_import_running(True)
+        self.import_status_var.set(f"Importing {len(file_paths)} files...")
+        self.import_worker = threading.Thread(
+            target=self._run_multi_import,
+            args=(list(file_paths), project_name, self.bulk_insert_var.get(), self.import_resumable),
+            name="MultiImportWorker",
+            daemon=True
+        )
+        self.import_worker.start()
+        self.after(100, self._poll_import_worker)
 
-            # Log the query and parameters for debugging
-            print(f"Query: {query}")
-            print(f"Parameters: {values}")
+    def _run_multi_import(self, file_paths, project_name, bulk, checkpointed):
+        """Worker thread: drive the process pool and the single writer for a multi-file import."""
+        try:
+            reports = import_submission_files(
+                file_paths,
+                lambda: connect_to_database(self.db_path, self.password),
+                project_name,
+                bulk=bulk,
+                progress=lambda done, total: self.import_queue.put(("progress", "files", done, total)),
+                cancel_event=self.import_cancel_event,
+                checkpoint_dir=get_local_data_path(IMPORT_CHECKPOINT_DIR) if checkpointed else None
+            )
+            self.import_queue.put(("files_done", reports, len(file_paths)))
+        except Exception as e:
+            self.import_queue.put(("error", e, traceback.format_exc()))
+
+    def _show_multi_import_report(self, reports, total):
+        """Summarise a multi-file import on the status line and in a per-file report."""
+        imported = sum(report["imported"] for report in reports)
+        failed = [report for report in reports if report["error"]]
+        not_run = total - len([report for report in reports if not report["cancelled"]])
+        already = [report for report in reports
+                   if report["already_completed"] and not report["error"] and not report["cancelled"]]
+        completed = [report for report in reports
+                     if not report["error"] and not report["cancelled"] and not report["already_completed"]]
+
+        summary = f"{imported} samples imported from {len(completed)} of {total} files"
+        if already:
+            summary += f", {len(already)} files already imported"
+        if failed:
+            summary += f", {len(failed)} files failed"
+        if not_run:
+            summary += f", {not_run} files cancelled"
+        self.import_stage_var.set("")
+        self.import_progress_bar.set(1)
+        self.import_status_var.set(f"Import completed: {summary}.")
+
+        lines = []
+        for report in reports:
+            name = os.path.basename(report["file"])
+            if report["error"]:
+                lines.append(f"{name}: FAILED - {report['error']}")
+            elif report["already_completed"]:
+                lines.append(f"{name}: already imported, skipped")
+            elif report["cancelled"]:
+                lines.append(f"{name}: cancelled")
+            else:
+                line = f"{name}: {report['imported']} imported, {report['skipped']} skipped"
+                if report["duplicates"]:
+                    line += f", {report['duplicates']} duplicates"
+                if report["resumed"]:
+                    line += f", {report['resumed']} from an earlier run"
+                if report["validation_errors"] or report["validation_warnings"]:
+                    line += (f" ({report['validation_errors']} validation errors, "
+                             f"{report['validation_warnings']} warnings)")
+                lines.append(line)
+        print("Multi-file import report:\n" + "\n".join(lines))
+
+        # Keep the dialog a sensible size; the full report is on the console
+        shown = lines[:25]
+        if len(lines) > len(shown):
+            shown.append(f"... and {len(lines) - len(shown)} more (see console)")
+        messagebox.showinfo("Import Report", summary + "\n\n" + "\n".join(shown))
+
+        imported_ids = [unh for report in reports for unh in report["imported_ids"]]
+        if imported_ids:
+            self.after_batch_update(imported_ids)
+            # Reload the main data table
+            self._reload_data()
+            self.show_all()
 
-            # Execute the query
-            cursor.execute(query, values)
+    def _confirm_import(self, kind, samples, project_info, rows_read, checkpoint, report):
+        """Ask before writing the parsed samples; the insert stage then runs on a second worker."""
+        errors, warnings = self.populate_validation_report(report)
+        if not samples:
+            self.import_worker = None
+            self._set_import_running(False)
+            if kind == "logbook" and rows_read == 0:
+                self.import_status_var.set("Error: Could not read the Log Book file or it's empty.")
+            else:
+                self.import_status_var.set("No valid samples found in the file.")
+            return
 
-            print(f"Inserted sample info for: {sample_name}")
-            return True
+        confirm_msg = f"Are you sure you want to import {len(samples)} samples from this file?"
+        if errors or warnings:
+            confirm_msg += (f"\n\nValidation found {errors} errors and {warnings} warnings (see the Validation tab)."
+                            f"{' Values with errors may make the import fail.' if errors else ''}")
+        if checkpoint is not None and checkpoint.done_keys:
+            resumed = sum(1 for key in import_row_keys(samples) if key in checkpoint.done_keys)
+            confirm_msg += f"\n\nResuming: {resumed} samples were already imported by an earlier run and will be skipped."
+        confirm = messagebox.askyesno("Confirm Import", confirm_msg)
+        if not confirm or self.import_cancel_event.is_set():
+            self.import_worker = None
+            self._set_import_running(False)
+            self.import_stage_var.set("")
+            self.import_status_var.set("Import cancelled by user.")
+            return
 
-        except Exception as e:
-            print(f"Error inserting sample info: {str(e)}")
-            raise
+        self.import_status_var.set(f"Importing {len(samples)} samples...")
+        self.import_worker = threading.Thread(
+            target=self._run_import_insert,
+            args=(samples, project_info, self.bulk_insert_var.get(), checkpoint),
+            name="ImportInsertWorker",
+            daemon=True
+        )
+        self.import_worker.start()
+        self.after(100, self._poll_import_worker)
 
     def read_sample_submission_excel(self, file_path):
         """Read the sample submission Excel file and return two DataFrames for Project and Sample info."""
         try:
-            # Check if both sheets exist in the Excel file
-            xls = pd.ExcelFile(file_path)
-            required_sheets = ["Project Information", "Sample Information"]
-
-            if not all(sheet in xls.sheet_names for sheet in required_sheets):
-                missing_sheets = [sheet for sheet in required_sheets if sheet not in xls.sheet_names]
-                print(f"Missing sheets in Excel file: {missing_sheets}")
-                messagebox.showerror(
-                    "Invalid Excel File",
-                    f"The Excel file is missing the following required sheets: {', '.join(missing_sheets)}"
-                )
-                return None, None
-
-            # Read the Project Information sheet
-            project_df = pd.read_excel(file_path, sheet_name="Project Information")
-
-            # For Sample Information, we need to handle the multi-row header structure
-            # First read without headers to see the structure
-            raw_df = pd.read_excel(file_path, sheet_name="Sample Information", header=None)
-
-            print("Raw Sample DataFrame first few rows (to debug header structure):")
-            print(raw_df.head(5))
-
-            # Now read the file with the correct header row
-            # This uses row index 1 (second row) as the header
-            sample_df = pd.read_excel(file_path, sheet_name="Sample Information", header=1)
-
-            # Clean up the dataframes
-            project_df = project_df.fillna("")
-            sample_df = sample_df.fillna("")
+            project_df, sample_df = parse_cached(file_path, "submission", parse_submission_workbook)
 
             print("Sample DataFrame columns with correct header:")
             print(sample_df.columns.tolist())
@@ -3646,6 +7259,12 @@ class SampleTrackerApp(ctk.CTk):
 
             return project_df, sample_df
 
+        except ValueError as e:
+            # Missing sheets
+            print(str(e))
+            messagebox.showerror("Invalid Excel File", str(e))
+            return None, None
+
         except Exception as e:
             error_message = f"Error reading Excel file: {str(e)}"
             print(error_message)
@@ -3658,317 +7277,20 @@ class SampleTrackerApp(ctk.CTk):
         Extract sample information from the DataFrame.
         Returns a list of dictionaries, each containing a sample's information.
         """
-        samples = []
-
-        # Check if DataFrame is empty
-        if sample_df.empty:
-            return samples
-
-        print(f"Sample DataFrame has {len(sample_df)} rows and {len(sample_df.columns)} columns")
-
-        # Print column names to understand structure
-        print("Actual column names in DataFrame:")
-        for col in sample_df.columns:
-            print(f"  {col}")
-
-        # Define fields we're looking for
-        field_mappings = {
-            'UNH ID': 'unh_id',
-            'Sample_Name': 'sample_name',
-            'Collection_Date': 'collection_date',
-            'Collection_Time': 'collection_time',
-            'Sample_Type': 'sample_type',
-            'Field_Notes': 'field_notes',
-            'pH': 'ph',
-            'Cond µS/cm': 'cond',
-            'Spec_Cond µS/cm': 'spec_cond',
-            'DO_Conc mg/L': 'do_conc',
-            'DO%': 'do_percent',
-            'Temperature degrees C': 'temperature',
-            'Salinity (ppt)': 'salinity',
-            'Number of containers': 'containers',
-            'Filtered/unfiltered?': 'filtered',
-            'Preservation': 'preservation',
-            'Filter - Volume Filtered mL': 'filter_volume'
-        }
-
-        # List of possible analysis columns
-        analysis_names = [
-            'DOC', 'TDN', 'Anions', 'Cations', 'NO3+NO2', 'NO2', 'NH4',
-            'PO4/SRP', 'SiO2', 'TN', 'TP', 'TDP', 'TSS', 'PC/PN',
-            'Chl a', 'EEMs', 'Gases - GC', 'Additional'
-        ]
-
-        # Find columns that match our field mappings
-        column_mapping = {}
-        for col in sample_df.columns:
-            col_str = str(col).strip()
-            # Check for exact matches first
-            if col_str in field_mappings:
-                column_mapping[col] = field_mappings[col_str]
-                continue
-            # Then check for partial matches
-            for key, value in field_mappings.items():
-                if key.lower() in col_str.lower() or col_str.lower() in key.lower():
-                    column_mapping[col] = value
-                    break
-
-        # Find analysis columns
-        analysis_columns = {}
-        for col in sample_df.columns:
-            col_str = str(col).strip()
-            for analysis in analysis_names:
-                if col_str == analysis or col_str.lower() == analysis.lower():
-                    analysis_columns[col] = analysis
-                    break
-
-        print("Column mapping:")
-        for col, field in column_mapping.items():
-            print(f"  {col} -> {field}")
-
-        print("Analysis columns:", list(analysis_columns.keys()))
-
-        # Process each row of data
-        for idx, row in sample_df.iterrows():
-            # Skip rows that are completely empty
-            if row.isnull().all():
-                continue
-
-            # Skip header rows if they accidentally got included
-            first_value = row.iloc[0] if len(row) > 0 else None
-            if isinstance(first_value, str) and (
-                    'UNH' in first_value or 'Sample' in first_value or 'ID' in first_value):
-                print(f"Skipping header-like row: {first_value}")
-                continue
-
-            sample = {}
-
-            # Extract values using our mapping
-            for col, field_name in column_mapping.items():
-                value = row[col]
-                if pd.notna(value):
-                    # Convert to string but handle special types
-                    if isinstance(value, (datetime.datetime, datetime.date)):
-                        sample[field_name] = value.strftime('%Y-%m-%d')
-                    elif isinstance(value, datetime.time):
-                        sample[field_name] = value.strftime('%H:%M:%S')
-                    else:
-                        sample[field_name] = str(value).strip()
-
-            # Extract analysis requirements
-            sample['analyses'] = {}
-            for col, analysis_name in analysis_columns.items():
-                value = row[col]
-                is_required = False
-                if pd.notna(value):
-                    value_str = str(value).upper().strip()
-                    if value_str == 'X' or value_str == 'TRUE' or value_str == '1' or value_str == 'Y':
-                        is_required = True
-                sample['analyses'][analysis_name] = is_required
-
-            # Only add samples that have at least a sample name or UNH ID
-            if ('sample_name' in sample and sample['sample_name']) or ('unh_id' in sample and sample['unh_id']):
-                samples.append(sample)
-
-        print(f"Extracted {len(samples)} valid samples")
-        if samples:
-            print("First sample:")
-            for key, value in samples[0].items():
-                if key != 'analyses':
-                    print(f"  {key}: {value}")
-            print("  Analyses requested:")
-            for analysis, requested in samples[0]['analyses'].items():
-                if requested:
-                    print(f"    {analysis}")
-
-        return samples
+        return extract_sample_records(sample_df)
 
     def extract_project_info(self, project_df):
         """
         Extract project information by finding field names in the first column
         and their values in the second column.
         """
-        project_info = {}
-
-        # Check if the DataFrame is not empty
-        if project_df.empty:
-            print("Project DataFrame is empty")
-            return project_info
-
-        # Print DataFrame shape and columns for debugging
-        print(f"Project DataFrame shape: {project_df.shape}")
-        print(f"Project DataFrame columns: {project_df.columns.tolist()}")
-        print("First few rows:")
-        print(project_df.head().to_string())
-
-        # Extract field names and values by searching for labels in the first column
-        # and their corresponding values in the second column
-        field_mapping = {
-            "Contact Name": "contact_name",
-            "Contact Address": "contact_address",
-            "Contact Email": "contact_email",
-            "Project Name": "project_name",
-            "Project Location/Area": "project_location",
-            "Brief Project Description": "project_description",
-            "Date samples shipped": "shipment_date"
-        }
-
-        # Find the column names (they might vary)
-        first_col = project_df.columns[0] if len(project_df.columns) > 0 else None
-        second_col = project_df.columns[1] if len(project_df.columns) > 1 else None
-
-        if first_col is None or second_col is None:
-            print("Error: DataFrame doesn't have enough columns")
-            return project_info
-
-        # Iterate through each row to find the fields
-        for i in range(len(project_df)):
-            field_label = project_df.iloc[i][first_col]
-            field_value = project_df.iloc[i][second_col] if i < len(project_df) else ""
-
-            # Skip if the field label is not a string
-            if not isinstance(field_label, str):
-                continue
-
-            # Clean up the field label by removing : and whitespace
-            clean_label = field_label.strip().rstrip(':')
-
-            # Print each label for debugging
-            print(f"Checking label: '{field_label}' -> cleaned to -> '{clean_label}'")
-
-            # Match with our field mapping
-            for key, mapped_name in field_mapping.items():
-                if clean_label.lower() == key.lower():
-                    project_info[mapped_name] = str(field_value).strip()
-                    print(f"✅ Matched '{clean_label}' -> '{mapped_name}' with value: '{field_value}'")
-                    break
-
-        # Print what we found for debugging
-        print("Extracted project info:")
-        for k, v in project_info.items():
-            print(f"  {k}: {v}")
-
-        return project_info
-
-    def _insert_sample_analysis_requested(self, cursor, sample):
-        """Insert a record into the WRRC sample analysis requested table."""
-        try:
-            # Get basic sample information
-            unh_id = sample.get('unh_id', '')  # We'll now use UNH# instead of Sample_Name
-
-            # Make sure we have the minimum required data
-            if not unh_id:
-                print("Cannot insert analysis request: Missing UNH ID")
-                return False
-
-            # Get analysis requirements
-            analyses = sample.get('analyses', {})
-
-            # Get additional fields
-            containers = sample.get('containers', '')
-            filtered = sample.get('filtered', '')
-            preservation = sample.get('preservation', '')
-            filter_volume = sample.get('filter_volume', '')
-            field_notes = sample.get('field_notes', '')
-            sample_type = sample.get('sample_type', '')
-            collection_date = sample.get('collection_date', '')
-            collection_time = sample.get('collection_time', '')
-            due_date = sample.get('due_date', '')
-
-            # Create mapping between Excel analysis names and database column names
-            analysis_mapping = {
-                'DOC': 'DOC',
-                'TDN': 'TDN',
-                'Anions': 'Anions',
-                'Cations': 'Cations',
-                'NO3+NO2': 'NO3AndNO2',
-                'NO2': 'NO2',
-                'NH4': 'NH4',
-                'PO4/SRP': 'PO4OrSRP',
-                'SiO2': 'SiO2',
-                'TN': 'TN',
-                'TP': 'TP',
-                'TDP': 'TDP',
-                'TSS': 'TSS',
-                'PC/PN': 'PCAndPN',
-                'Chl a': 'Chl_a',
-                'EEMs': 'EEMs',
-                'Gases - GC': 'Gases_GC',
-                'Additional': 'Additional'
-            }
-
-            # Log the analyses that are marked as required
-            required_analyses = [analysis for analysis, is_required in analyses.items() if is_required]
-            print(f"Required analyses for UNH# {unh_id}: {required_analyses}")
-
-            # Prepare columns and values
-            columns = ["[UNH#]"]
-            values = [str(unh_id)]
-
-            # Add additional fields if they exist
-            if containers:
-                columns.append("[Containers]")
-                values.append(str(containers))
-            if due_date:
-                columns.append("Due_Date")
-                values.append(due_date)
-
-            if filtered:
-                columns.append("[Filtered]")
-                values.append(str(filtered))
-
-            if preservation:
-                columns.append("[Preservation]")
-                values.append(str(preservation))
-
-            if filter_volume:
-                columns.append("[Filter_Volume]")
-                values.append(str(filter_volume))
-
-            if field_notes:
-                columns.append("[Field_Notes]")
-                values.append(str(field_notes))
-
-            if sample_type:
-                columns.append("[Sample_Type]")
-                values.append(str(sample_type))
-
-            if collection_date:
-                columns.append("[Collection_Date]")
-                values.append(str(collection_date))
-
-            if collection_time:
-                columns.append("[Collection_Time]")
-                values.append(str(collection_time))
-
-            # Add analysis fields
-            for analysis, is_required in analyses.items():
-                if is_required:
-                    db_column = analysis_mapping.get(analysis)
-                    if db_column:
-                        columns.append(f"[{db_column}]")
-                        values.append("required")
-
-            # If we have any data to insert
-            if len(columns) > 1:
-                query = f"INSERT INTO [WRRC sample analysis requested] ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(values))})"
-                try:
-                    cursor.execute(query, values)
-                    print(f"Inserted analysis request for UNH# {unh_id} with {len(columns) - 1} fields")
-                    return True
-                except Exception as e:
-                    print(f"Error inserting analysis request for UNH# {unh_id}: {str(e)}")
-                    raise
-            else:
-                print(f"No analysis fields to insert for UNH# {unh_id}")
-                return False
-
-        except Exception as e:
-            print(f"Error inserting Log Book analysis data: {str(e)}")
-            raise
+        return extract_project_info(project_df)
 
-    def populate_preview_treeviews(self, project_df, sample_df):
-        """Populate the preview treeviews with data from the Excel file."""
+    def populate_preview_treeviews(self, project_df, sample_df, samples=None):
+        """
+        Populate the preview treeviews with data from the Excel file. `samples` are the records
+        already extracted from sample_df, if the caller has them.
+        """
         # Configure and populate project treeview
         for item in self.project_tree.get_children():
             self.project_tree.delete(item)
@@ -3994,79 +7316,26 @@ class SampleTrackerApp(ctk.CTk):
         print(f"Project preview populated with {len(project_df)} rows and {len(project_columns)} columns")
         print(f"Project columns: {project_columns}")
 
-        # Configure and populate sample treeview
-        for item in self.sample_tree.get_children():
-            self.sample_tree.delete(item)
-
-        # Get column names for sample dataframe
-        sample_columns = sample_df.columns.tolist()
-
-        # Configure columns for sample tree
-        self.sample_tree["columns"] = sample_columns
-
-        # Create the column configuration - including the first column
-        self.sample_tree["show"] = "headings"  # This was likely the issue - default is "tree headings"
-
-        for col in sample_columns:
-            self.sample_tree.heading(col, text=str(col))
-            self.sample_tree.column(col, width=100, minwidth=50)
-
-        # Extract samples for preview
-        samples = self.extract_sample_data(sample_df)
-
-        # Check if we have extracted samples
+        # Show the extracted samples, or the raw sheet if none could be extracted
+        if samples is None:
+            samples = self.extract_sample_data(sample_df)
         if samples:
             print(f"Extracted {len(samples)} samples for preview")
+            self.sample_pager.show(preview_frame_from_samples(samples))
+        else:
+            print("Using raw sample data for preview")
+            self.sample_pager.show(sample_df)
+        self.populate_preview_summary(self.sample_pager.counts)
 
-            # Create a special preview DataFrame for the treeview with properly extracted data
-            preview_data = []
-            for sample in samples:
-                sample_row = {}
-                # Add basic fields
-                for key, value in sample.items():
-                    if key != 'analyses':
-                        sample_row[key] = value
-
-                # Add analysis fields
-                for analysis, required in sample.get('analyses', {}).items():
-                    sample_row[analysis] = 'X' if required else ''
-
-                preview_data.append(sample_row)
-
-            # Convert to DataFrame for easier display
-            if preview_data:
-                preview_df = pd.DataFrame(preview_data)
-
-                # Get preview columns
-                preview_columns = preview_df.columns.tolist()
-
-                # Configure columns for sample tree based on extracted data
-                self.sample_tree["columns"] = preview_columns
-                self.sample_tree["show"] = "headings"
-
-                # Configure each column
-                for col in preview_columns:
-                    self.sample_tree.heading(col, text=str(col))
-                    self.sample_tree.column(col, width=100, minwidth=50)
-
-                # Add extracted data to sample tree
-                for _, row in preview_df.iterrows():
-                    values = [str(val) if pd.notna(val) else "" for val in row]
-                    self.sample_tree.insert("", "end", values=values)
-
-                print(f"Preview populated with {len(preview_df)} rows and {len(preview_columns)} columns")
-                print(f"Preview columns: {preview_columns}")
-                return
-
-        # If we couldn't extract samples properly, show the raw data
-        print("Using raw sample data for preview")
-        for _, row in sample_df.iterrows():
-            values = [str(val) if pd.notna(val) else "" for val in row]
-            self.sample_tree.insert("", "end", values=values)
-
-        print(f"Raw sample preview populated with {len(sample_df)} rows and {len(sample_columns)} columns")
+        print(f"Sample preview: {self.sample_pager.shown} of {self.sample_pager.total_rows} rows shown, "
+              f"{len(self.sample_pager.counts['filled'])} columns")
 
 if __name__ == "__main__":
+    # Needed for the multi-file import process pool in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+    if "--watch" in sys.argv[1:]:
+        # Headless hot-folder import, no window
+        sys.exit(run_hot_folder(sys.argv[1:]))
     print("Starting the Sample Tracker App using Access database")
     app = SampleTrackerApp()
     app.mainloop()